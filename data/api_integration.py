@@ -25,11 +25,13 @@ Integrating with financial APIs is vital for:
 
 4. **Fetch Data from CryptoCompare**:
    - The function `get_cryptocompare_data(symbol, start_date, end_date)` takes a cryptocurrency symbol (e.g., "BTC") and date range as input and retrieves the corresponding historical data from CryptoCompare.
-   - It constructs the API request URL, adds the necessary headers, and processes the response.
+   - The range is fetched in pages by `fetch_cryptocompare_range` from `scripts/fetcher.py`, so ranges longer than the 2000 days of one call are returned in full.
 
 5. **Helper Function for API Requests**:
-   - The helper function `fetch_api_data(url, headers)` is used by `get_coinbase_data`, `get_alpha_vantage_data`, and `get_cryptocompare_data` to handle the actual API requests.
+   - The helper function `fetch_api_data(url, headers)` is used by `get_coinbase_data` and `get_alpha_vantage_data` to handle the actual API requests.
    - This function manages the HTTP request, checks for successful responses, and handles any errors that may occur during the request.
+   - Requests go through the provider's shared limiter from `scripts/rate_limit.py`, so they stay within its rate limit, and rate-limit responses, server errors and dropped connections are retried with backoff, honouring `Retry-After`.
+   - Responses are kept in the on-disk cache of `scripts/http_cache.py`, so reruns reuse them instead of sending the request again: spot prices for `REALTIME_TTL` seconds and Alpha Vantage's daily history, whose last bar is still open, for `OPEN_RANGE_TTL`.
 
 6. **Save Data to CSV**:
    - The function `save_data_to_csv(data, filename)` takes the data fetched from the APIs and saves it into a CSV file using the `pandas` library.
@@ -69,10 +71,17 @@ if __name__ == "__main__":
 
 
 import os
+import sys
 from dotenv import load_dotenv
 import requests
 import pandas as pd
 
+# The paged CryptoCompare fetcher lives in scripts/, whose modules import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from fetcher import fetch_cryptocompare_range, make_providers
+from http_cache import REALTIME_TTL, get_cache, historical_ttl
+from rate_limit import get_limiter
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -83,15 +92,15 @@ COINBASE_API_SECRET = os.getenv("COINBASE_API_SECRET")
 # Alpha Vantage API details
 ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
 
-# CryptoCompare API details
-CRYPTOCOMPARE_API_KEY = os.getenv("CRYPTOCOMPARE_API_KEY")
-
-def fetch_api_data(url, headers=None, params=None):
+def fetch_api_data(url, headers=None, params=None, provider=None, ttl=0):
     """
     Helper function to fetch data from an API endpoint.
+    The request goes through the rate limiter and retry policy of `provider` (e.g. 'alpha_vantage'), if given,
+    and the response is cached for `ttl` seconds (None forever, 0 not at all; see `http_cache.ResponseCache.get`).
     """
+    limiter = get_limiter(provider) if provider is not None else None
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = get_cache().get(requests, url, params, headers, ttl=ttl, limiter=limiter)
         response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -108,7 +117,7 @@ def get_coinbase_data(currency_pair):
         "CB-ACCESS-KEY": COINBASE_API_KEY,
         "CB-ACCESS-SIGN": COINBASE_API_SECRET
     }
-    data = fetch_api_data(url, headers)
+    data = fetch_api_data(url, headers, provider='coinbase', ttl=REALTIME_TTL)
     if data and 'data' in data:
         df = pd.DataFrame([data['data']])
         df['time'] = pd.Timestamp.now()
@@ -130,67 +139,58 @@ def get_alpha_vantage_data(symbol):
         "market": "USD",
         "apikey": ALPHA_VANTAGE_API_KEY
     }
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if 'Time Series (Digital Currency Daily)' in data:
-            time_series = data['Time Series (Digital Currency Daily)']
-            df = pd.DataFrame.from_dict(time_series, orient='index')
-            df = df.rename(columns={
-                '1a. open (USD)': 'open',
-                '2a. high (USD)': 'high',
-                '3a. low (USD)': 'low',
-                '4a. close (USD)': 'close',
-                '5. volume': 'volume'
-            })
-            df.index = pd.to_datetime(df.index)
-            df.reset_index(inplace=True)
-            df = df.rename(columns={'index': 'time'})
-            return df
-        else:
-            print(f"No 'Time Series (Digital Currency Daily)' data found for {symbol}")
-            return None
-    except requests.exceptions.RequestException as e:
-        print(f"API request failed: {e}")
+    # The daily history is open-ended: its last bar changes until the day is over
+    data = fetch_api_data(base_url, params=params, provider='alpha_vantage', ttl=historical_ttl(None))
+    if data and 'Time Series (Digital Currency Daily)' in data:
+        time_series = data['Time Series (Digital Currency Daily)']
+        df = pd.DataFrame.from_dict(time_series, orient='index')
+        df = df.rename(columns={
+            '1a. open (USD)': 'open',
+            '2a. high (USD)': 'high',
+            '3a. low (USD)': 'low',
+            '4a. close (USD)': 'close',
+            '5. volume': 'volume'
+        })
+        df.index = pd.to_datetime(df.index)
+        df.reset_index(inplace=True)
+        df = df.rename(columns={'index': 'time'})
+        return df
+    else:
+        print(f"No 'Time Series (Digital Currency Daily)' data found for {symbol}")
         return None
 
 def get_cryptocompare_data(symbol, start_date, end_date):
     """
     Fetches cryptocurrency data from CryptoCompare for the given symbol and date range.
+    Both dates are included; ranges longer than one call allows are fetched in pages.
     """
-    base_url = f"https://min-api.cryptocompare.com/data/v2/histoday"
-    params = {
-        "fsym": symbol,
-        "tsym": "USD",
-        "toTs": int(pd.Timestamp(end_date).timestamp()),
-        "limit": 2000,  # CryptoCompare allows fetching up to 2000 days in one call
-        "api_key": CRYPTOCOMPARE_API_KEY
-    }
+    provider = make_providers()['cryptocompare']
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if 'Data' in data and 'Data' in data['Data']:
-            data = data['Data']['Data']
-            df = pd.DataFrame(data)
-            df['time'] = pd.to_datetime(df['time'], unit='s')
-            df = df.rename(columns={'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'volumeto': 'volume'})
-            df = df[['time', 'open', 'high', 'low', 'close', 'volume']]
-            return df
-        else:
+        end = pd.Timestamp(end_date).normalize() + pd.Timedelta('1D')
+        df = fetch_cryptocompare_range(provider, symbol, start_date, end)
+        if df.empty:
             print(f"No data available for {symbol} from CryptoCompare")
             return None
+        df = df.rename(columns={'Date': 'time', 'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Volume': 'volume'})
+        return df[['time', 'open', 'high', 'low', 'close', 'volume']]
+    except ValueError as e:
+        print(f"No data available for {symbol} from CryptoCompare: {e}")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"API request failed: {e}")
         return None
+    finally:
+        provider.close()
 
 def save_data_to_csv(data, filename):
     """
     Saves data to a CSV file.
+    Writes to a temporary file first, so an interrupted save never leaves a truncated file behind.
     """
     if data is not None and not data.empty:
-        data.to_csv(filename, index=False)
+        temporary = filename + ".tmp"
+        data.to_csv(temporary, index=False)
+        os.replace(temporary, filename)
         print(f"Data saved to {filename}")
     else:
         print(f"No data to save for {filename}")
@@ -32,14 +32,16 @@ cleaned_data = data_preparation.clean_data(historical_data)
 
 
 from .api_integration import fetch_historical_data, fetch_real_time_data
-from .backtesting import run_backtest, example_strategy
+from .backtesting import run_backtest, run_vectorized_backtest, example_strategy, columnar_strategy
 from .data_preparation import clean_data, preprocess_data
 
 __all__ = [
     'fetch_historical_data',
     'fetch_real_time_data',
     'run_backtest',
+    'run_vectorized_backtest',
     'example_strategy',
+    'columnar_strategy',
     'clean_data',
     'preprocess_data'
 ]
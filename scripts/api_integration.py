@@ -19,9 +19,12 @@ API integration is a critical aspect of algorithmic trading, providing several k
 2. **Fetch Real-Time Data**:
    - Functions for fetching real-time market data are also included, providing the latest prices and market conditions.
    - This real-time data is used by our trading algorithms to make timely trading decisions.
+   - These functions return one snapshot per call; for continuous data, `quote_stream.py` streams every trade and builds 1m/5m/1h bars from them.
 
 3. **Error Handling and Logging**:
    - The script includes error handling mechanisms to manage API rate limits and connection issues.
+   - Requests go through the shared per-provider limiters of `rate_limit.py`, which throttle them to each provider's allowed rate and retry rate-limit responses, server errors and dropped connections with backoff.
+   - Responses are cached on disk by `http_cache.py`: historical ranges that have ended are never requested twice, and real-time quotes are reused for a few seconds.
    - Logging functionality ensures that any issues during data retrieval are recorded for troubleshooting.
 
 4. **API Key Management**:
@@ -50,6 +53,9 @@ import pandas as pd
 import logging
 import os
 
+from http_cache import REALTIME_TTL, get_cache, historical_ttl
+from rate_limit import get_limiter
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -99,22 +105,31 @@ def fetch_historical_data_alpaca(symbol, start_date, end_date):
     params = {
         'start': start_date,
         'end': end_date,
-        'limit': 1000,  # adjust as needed
+        'limit': 10000,  # largest page Alpaca returns
         'timeframe': 'day'
     }
-    response = requests.get(url, headers=headers, params=params)
-
-    if response.status_code == 200:
+    bars = []
+    # Longer ranges come in several pages linked by 'next_page_token'
+    while True:
+        response = get_cache().get(requests, url, params, headers, ttl=historical_ttl(end_date), limiter=get_limiter('alpaca'))
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch data from Alpaca: {response.status_code}")
+            return None
         data = response.json()
-        df = pd.DataFrame(data['bars'])
-        df['time'] = pd.to_datetime(df['t'], unit='s')
-        df.set_index('time', inplace=True)
-        df.drop(columns=['t'], inplace=True)
-        return df
-    else:
-        logger.error(f"Failed to fetch data from Alpaca: {response.status_code}")
+        bars.extend(data.get('bars') or [])
+        if not data.get('next_page_token'):
+            break
+        params = {**params, 'page_token': data['next_page_token']}
+    if not bars:
+        logger.error(f"Alpaca returned no bars for {symbol} between {start_date} and {end_date}")
         return None
 
+    df = pd.DataFrame(bars)
+    df['time'] = pd.to_datetime(df['t'], unit='s')
+    df.set_index('time', inplace=True)
+    df.drop(columns=['t'], inplace=True)
+    return df
+
 def fetch_historical_data_yahoo(symbol, start_date, end_date):
     """
     Fetch historical data from Yahoo Finance API.
@@ -132,7 +147,7 @@ def fetch_historical_data_yahoo(symbol, start_date, end_date):
         'period2': int(pd.Timestamp(end_date).timestamp()),
         'interval': '1d'
     }
-    response = requests.get(url, headers=headers, params=params)
+    response = get_cache().get(requests, url, params, headers, ttl=historical_ttl(end_date), limiter=get_limiter('yahoo'))
 
     if response.status_code == 200:
         data = response.json()
@@ -172,7 +187,7 @@ def fetch_real_time_data_alpaca(symbol):
         'APCA-API-KEY-ID': API_KEYS['ALPACA'],
         'APCA-API-SECRET-KEY': API_KEYS['ALPACA_SECRET']
     }
-    response = requests.get(url, headers=headers)
+    response = get_cache().get(requests, url, headers=headers, ttl=REALTIME_TTL, limiter=get_limiter('alpaca'))
 
     if response.status_code == 200:
         return response.json()
@@ -189,7 +204,7 @@ def fetch_real_time_data_yahoo(symbol):
     """
     url = f"{YAHOO_FINANCE_URL}{symbol}USD"
     headers = {'x-api-key': API_KEYS['YAHOO_FINANCE']}
-    response = requests.get(url, headers=headers)
+    response = get_cache().get(requests, url, headers=headers, ttl=REALTIME_TTL, limiter=get_limiter('yahoo'))
 
     if response.status_code == 200:
         return response.json()
@@ -17,11 +17,27 @@ Backtesting is an essential step in developing and validating trading strategies
    - The function simulates trades based on the strategy's signals (buy, sell, hold) and tracks the performance of the portfolio over time.
    - It calculates key performance metrics such as portfolio value, cash balance, and position size.
 
-2. **Strategy Definition**:
+2. **Vectorized Backtest**:
+   - `run_vectorized_backtest` takes a precomputed signal array (`BUY`, `SELL`, `HOLD` as int8) instead of a row-wise strategy.
+   - It reproduces the all-in/all-out semantics of `run_backtest` bar for bar, but works out cash, position and portfolio value with NumPy array operations rather than a Python loop over `data.iterrows()`.
+   - The array-level core, `simulate_signals`, can be reused by anything that already has close prices and signals as NumPy arrays. It agrees with the loop to within rounding; `simulate_signals_loop` takes the same arrays and repeats the loop's arithmetic bar by bar when results must match `run_backtest` to the last digit.
+
+3. **Result Container**:
+   - Both engines write their results into a `BacktestResult`, which holds the cash, position and portfolio value in preallocated NumPy arrays.
+   - Pass `as_frame=False` to get the `BacktestResult` itself: summary accessors such as `final_value`, `total_return`, `max_drawdown` and `trades` read the arrays directly, and `to_frame()` / `to_csv()` build the usual DataFrame or CSV only when asked for.
+
+4. **Strategy Definition**:
    - The script includes an example strategy function, `example_strategy`, which generates trading signals based on a simple moving average crossover.
    - Users can define their own strategies by modifying this function or adding new strategy functions.
+   - `add_strategy_columns` adds the moving average, returns and z-score columns the bundled strategies read, as defined in `feature_pipeline.py`.
+
+5. **Columnar Strategies**:
+   - A columnar strategy takes the whole DataFrame (or a dict of NumPy columns) and returns the full signal vector in one call. Functions are marked as columnar with the `columnar_strategy` decorator.
+   - `example_strategy_columnar`, `momentum_strategy_columnar` and `mean_reversion_strategy_columnar` are the columnar versions of the bundled strategies and produce the same signals.
+   - `run_backtest` sends columnar strategies straight to the vectorized engine, skipping per-row dispatch. Row-wise strategies keep working unchanged, and `row_strategy_adapter` wraps one so it can be passed anywhere a columnar strategy is expected.
+   - `moving_average_crossover_signals`, `momentum_signals` and `mean_reversion_signals` compute the same signals straight from an array of close prices, with the windows and thresholds exposed as parameters. These are what `parameter_sweep.py` tunes.
 
-3. **Automating Notebooks**:
+6. **Automating Notebooks**:
    - This script complements the interactive Jupyter notebooks by automating the backtesting process.
    - While the notebook `05_backtesting.ipynb` allows for interactive exploration and visualization, `backtesting.py` provides a streamlined, repeatable approach to running backtests programmatically.
    - This automation ensures that our backtests are consistent and can be easily rerun with different parameters or datasets.
@@ -44,50 +60,385 @@ results.to_csv('results/backtest_results.csv')
 # Display backtest results
 results.head()
 
+# Run the columnar version of the strategy, which skips per-row dispatch
+data = add_strategy_columns(data)
+fast_results = run_backtest(data, example_strategy_columnar)
+
 """
 
 
 
+import functools
 import pandas as pd
 import numpy as np
 
-def run_backtest(data, strategy, initial_cash=10000):
+from feature_pipeline import add_features
+
+# Integer signal codes used by the vectorized engine
+BUY = 1
+HOLD = 0
+SELL = -1
+
+class BacktestResult:
+    """
+    Backtest results held in preallocated NumPy arrays.
+    
+    The arrays are filled in place while the backtest runs, and a DataFrame is
+    only built when `to_frame` or `to_csv` is called. Summary accessors work
+    directly on the arrays.
+    
+    Parameters:
+    dates (pd.Index): Date of each bar.
+    cash (np.ndarray): Cash held after each bar.
+    position (np.ndarray): Position held after each bar.
+    portfolio_value (np.ndarray): Portfolio value after each bar.
+    """
+    __slots__ = ('dates', 'cash', 'position', 'portfolio_value')
+
+    def __init__(self, dates, cash, position, portfolio_value):
+        self.dates = dates
+        self.cash = cash
+        self.position = position
+        self.portfolio_value = portfolio_value
+
+    @classmethod
+    def allocate(cls, dates):
+        """
+        Create a result with uninitialised float64 arrays, one entry per date.
+        """
+        n = len(dates)
+        return cls(dates, np.empty(n), np.empty(n), np.empty(n))
+
+    def __len__(self):
+        return len(self.portfolio_value)
+
+    @property
+    def final_value(self):
+        """Portfolio value after the last bar."""
+        return self.portfolio_value[-1]
+
+    @property
+    def total_return(self):
+        """Return over the whole backtest, relative to the first bar."""
+        return self.portfolio_value[-1] / self.portfolio_value[0] - 1
+
+    @property
+    def max_drawdown(self):
+        """Largest fall from a running peak of the portfolio value, as a negative fraction."""
+        return (self.portfolio_value / np.maximum.accumulate(self.portfolio_value)).min() - 1
+
+    @property
+    def trades(self):
+        """Number of buys and sells made during the backtest."""
+        invested = self.position > 0
+        return int(np.count_nonzero(invested[1:] != invested[:-1]) + invested[:1].sum())
+
+    def to_frame(self):
+        """
+        Build the results DataFrame with 'Date', 'Cash', 'Position' and 'Portfolio Value' columns.
+        """
+        return pd.DataFrame({
+            'Date': self.dates,
+            'Cash': self.cash,
+            'Position': self.position,
+            'Portfolio Value': self.portfolio_value
+        })
+
+    def to_csv(self, path, **kwargs):
+        """
+        Save the results in the layout of `results/*_backtest_results.csv`.
+        """
+        kwargs.setdefault('index', False)
+        return self.to_frame().to_csv(path, **kwargs)
+
+def run_backtest(data, strategy, initial_cash=10000, as_frame=True):
     """
     Run a backtest for a given trading strategy.
     
+    Columnar strategies (see `columnar_strategy`) are evaluated once over the
+    whole frame and simulated by the vectorized engine. Row-wise strategies
+    are called on every row.
+    
     Parameters:
     data (pd.DataFrame): Historical price data.
     strategy (function): Trading strategy function.
     initial_cash (float): Initial amount of cash for backtesting.
+    as_frame (bool): Return a DataFrame; if False, return the `BacktestResult` arrays.
     
     Returns:
-    pd.DataFrame: DataFrame with backtesting results.
+    pd.DataFrame or BacktestResult: Backtesting results.
     """
+    if is_columnar_strategy(strategy):
+        return run_vectorized_backtest(data, strategy(data), initial_cash, as_frame)
+
     cash = initial_cash
     position = 0
     portfolio_value = initial_cash
     
-    results = []
+    results = BacktestResult.allocate(data.index)
     
-    for index, row in data.iterrows():
+    for i, (index, row) in enumerate(data.iterrows()):
         signal = strategy(row)
+        price = row['Close']
         
-        if signal == 'buy' and cash > 0:
-            position = cash / row['Close']
+        # No trade can be made at a missing, zero or infinite price
+        tradable = 0 < price < np.inf
+        
+        if signal == 'buy' and cash > 0 and tradable:
+            position = cash / price
             cash = 0
-        elif signal == 'sell' and position > 0:
-            cash = position * row['Close']
+        elif signal == 'sell' and position > 0 and tradable:
+            cash = position * price
             position = 0
         
-        portfolio_value = cash + (position * row['Close'])
-        results.append({
-            'Date': index,
-            'Cash': cash,
-            'Position': position,
-            'Portfolio Value': portfolio_value
-        })
+        portfolio_value = cash + (position * price)
+        results.cash[i] = cash
+        results.position[i] = position
+        results.portfolio_value[i] = portfolio_value
     
-    return pd.DataFrame(results)
+    return results.to_frame() if as_frame else results
+
+def encode_signals(signals):
+    """
+    Convert trading signals to the int8 codes used by the vectorized engine.
+    
+    Parameters:
+    signals (array-like): 'buy', 'sell' or 'hold' labels, or integer codes.
+    
+    Returns:
+    np.ndarray: int8 array of `BUY`, `SELL` and `HOLD` codes.
+    """
+    signals = np.asarray(signals)
+    if signals.dtype.kind in 'OUS':
+        codes = np.full(len(signals), HOLD, dtype=np.int8)
+        codes[signals == 'buy'] = BUY
+        codes[signals == 'sell'] = SELL
+        return codes
+    return np.sign(signals).astype(np.int8)
+
+def simulate_signals(close, signals, initial_cash=10000, initial_position=0):
+    """
+    Simulate the all-in/all-out trading rules of `run_backtest` on NumPy arrays.
+    
+    A 'buy' moves all cash into the asset when there is cash to spend, a 'sell'
+    moves the whole position back to cash when a position is held, and every
+    other signal is ignored. The account is therefore either fully in cash or
+    fully invested, and its state on each bar is given by the last buy or sell
+    signal seen so far. Cash and position only change on the bars where that
+    state flips, so they are worked out once per trade and then broadcast to
+    the bars in between.
+    
+    As in `run_backtest`, no trade is made on a bar whose close is missing,
+    zero, negative or infinite: its signal counts as a hold, and only that
+    bar's portfolio value is affected by the price.
+    
+    Parameters:
+    close (np.ndarray): Close prices.
+    signals (np.ndarray): Signal codes (`BUY`, `SELL`, `HOLD`), one per bar.
+    initial_cash (float): Cash held before the first bar.
+    initial_position (float): Position held before the first bar.
+    
+    Returns:
+    tuple: Arrays of cash, position and portfolio value, one entry per bar.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.asarray(signals, dtype=np.int8)
+    if close.shape != signals.shape:
+        raise ValueError("close and signals must have the same length")
+    if initial_cash > 0 and initial_position > 0:
+        raise ValueError("The account must start either in cash or fully invested")
+    tradable = (close > 0) & (close < np.inf)
+    if not tradable.all():
+        signals = np.where(tradable, signals, np.int8(HOLD))
+
+    n = len(close)
+    if n == 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+    start_long = initial_position > 0
+    if not start_long and initial_cash <= 0:
+        # Nothing to trade with, so every signal is a no-op
+        cash = np.full(n, float(initial_cash))
+        position = np.full(n, float(initial_position))
+        return cash, position, cash + position * close
+
+    # Invested/flat state per bar: the last non-hold signal wins
+    last = np.where(signals != HOLD, np.arange(n), -1)
+    np.maximum.accumulate(last, out=last)
+    in_market = np.where(last >= 0, signals[np.maximum(last, 0)] == BUY, start_long)
+
+    # Bars where the state flips are the trades
+    previous = np.empty(n, dtype=bool)
+    previous[0] = start_long
+    previous[1:] = in_market[:-1]
+    trades = in_market != previous
+
+    # The amount held (cash when flat, units when invested) is divided by the
+    # price on entries and multiplied by it on exits, in trade order
+    trade_prices = close[trades]
+    factors = np.where(in_market[trades], 1.0 / trade_prices, trade_prices)
+    amounts = np.empty(len(factors) + 1)
+    amounts[0] = initial_position if start_long else initial_cash
+    amounts[1:] = factors
+    np.multiply.accumulate(amounts, out=amounts)
+
+    held = amounts[np.cumsum(trades)]
+    cash = np.where(in_market, 0.0, held)
+    position = np.where(in_market, held, 0.0)
+    return cash, position, cash + position * close
+
+def simulate_signals_loop(close, signals, initial_cash=10000, initial_position=0):
+    """
+    Simulate signals bar by bar with the same arithmetic as `run_backtest`.
+    
+    Slower than `simulate_signals`, but the results are identical to the
+    row-by-row loop to the last digit instead of within rounding.
+    
+    Parameters:
+    close (np.ndarray): Close prices.
+    signals (np.ndarray): Signal codes (`BUY`, `SELL`, `HOLD`), one per bar.
+    initial_cash (float): Cash held before the first bar.
+    initial_position (float): Position held before the first bar.
+    
+    Returns:
+    tuple: Arrays of cash, position and portfolio value, one entry per bar.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.asarray(signals, dtype=np.int8)
+    if close.shape != signals.shape:
+        raise ValueError("close and signals must have the same length")
+
+    n = len(close)
+    cash_values, position_values, portfolio_values = np.empty(n), np.empty(n), np.empty(n)
+    cash = initial_cash
+    position = initial_position
+    for i, (price, signal) in enumerate(zip(close, signals)):
+        tradable = 0 < price < np.inf
+        if signal == BUY and cash > 0 and tradable:
+            position = cash / price
+            cash = 0
+        elif signal == SELL and position > 0 and tradable:
+            cash = position * price
+            position = 0
+        cash_values[i] = cash
+        position_values[i] = position
+        portfolio_values[i] = cash + (position * price)
+    return cash_values, position_values, portfolio_values
+
+def run_vectorized_backtest(data, signals, initial_cash=10000, as_frame=True):
+    """
+    Run a backtest from precomputed signals using array operations.
+    
+    Produces the same results as `run_backtest`, bar for bar, without calling a
+    strategy on each row.
+    
+    Parameters:
+    data (pd.DataFrame): Historical price data with a 'Close' column.
+    signals (array-like): One signal per row of `data`, as labels or codes.
+    initial_cash (float): Initial amount of cash for backtesting.
+    as_frame (bool): Return a DataFrame; if False, return the `BacktestResult` arrays.
+    
+    Returns:
+    pd.DataFrame or BacktestResult: Backtesting results.
+    """
+    close = data['Close'].to_numpy(dtype=np.float64)
+    results = BacktestResult(data.index, *simulate_signals(close, encode_signals(signals), initial_cash))
+    return results.to_frame() if as_frame else results
+
+def columnar_strategy(strategy):
+    """
+    Mark a function as a columnar strategy.
+    
+    A columnar strategy takes a DataFrame, or a dict of NumPy columns, and
+    returns one signal per row as an int8 array of `BUY`, `SELL` and `HOLD`.
+    
+    Parameters:
+    strategy (function): Strategy function taking all columns at once.
+    
+    Returns:
+    function: The same function, marked as columnar.
+    """
+    strategy.columnar = True
+    return strategy
+
+def is_columnar_strategy(strategy):
+    """
+    Check whether a strategy takes whole columns rather than single rows.
+    
+    Parameters:
+    strategy (function): Trading strategy function.
+    
+    Returns:
+    bool: True if the strategy is columnar.
+    """
+    return getattr(strategy, 'columnar', False)
+
+def row_strategy_adapter(strategy):
+    """
+    Wrap a row-wise strategy so it can be used as a columnar strategy.
+    
+    The wrapped strategy is still called once per row, so this only provides
+    compatibility, not speed.
+    
+    Parameters:
+    strategy (function): Strategy function taking one row (pd.Series).
+    
+    Returns:
+    function: Columnar strategy returning the encoded signals.
+    """
+    @functools.wraps(strategy)
+    def adapted(data):
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(data)
+        return encode_signals([strategy(row) for _, row in data.iterrows()])
+    return columnar_strategy(adapted)
+
+def generate_signals(data, strategy):
+    """
+    Generate the full signal vector for a strategy of either kind.
+    
+    Parameters:
+    data (pd.DataFrame or dict): Historical price data.
+    strategy (function): Columnar or row-wise trading strategy function.
+    
+    Returns:
+    np.ndarray: int8 array of signal codes, one per row.
+    """
+    if not is_columnar_strategy(strategy):
+        strategy = row_strategy_adapter(strategy)
+    return strategy(data)
+
+# Indicator columns read by the bundled strategies
+STRATEGY_COLUMNS = ['short_mavg', 'long_mavg', 'returns', 'rolling_mean', 'rolling_std', 'z_score']
+
+def add_strategy_columns(data):
+    """
+    Add the indicator columns read by the bundled strategies.
+    
+    Parameters:
+    data (pd.DataFrame): Historical price data with a 'Close' column.
+    
+    Returns:
+    pd.DataFrame: Data with 'short_mavg', 'long_mavg', 'returns', 'rolling_mean', 'rolling_std' and 'z_score' columns.
+    """
+    # Defined in feature_pipeline.py; the z-score's rolling mean is shared with SMA_20
+    return add_features(data, STRATEGY_COLUMNS)
+
+def _column_length(data):
+    """
+    Number of rows in a DataFrame or a dict of equal-length columns.
+    """
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    return len(next(iter(data.values()))) if len(data) else 0
+
+def _compare_signals(buy_mask, sell_mask):
+    """
+    Build a signal vector from boolean buy and sell masks.
+    """
+    signals = np.full(len(buy_mask), HOLD, dtype=np.int8)
+    signals[buy_mask] = BUY
+    signals[sell_mask] = SELL
+    return signals
 
 def example_strategy(row):
     """
@@ -155,22 +506,124 @@ def mean_reversion_strategy(row):
     else:
         return 'hold'
 
+@columnar_strategy
+def example_strategy_columnar(data):
+    """
+    Columnar version of `example_strategy`.
+    
+    Parameters:
+    data (pd.DataFrame or dict): Historical price data.
+    
+    Returns:
+    np.ndarray: int8 array of signal codes, one per row.
+    """
+    if 'short_mavg' not in data or 'long_mavg' not in data:
+        return np.full(_column_length(data), HOLD, dtype=np.int8)
+
+    short_mavg = np.asarray(data['short_mavg'], dtype=np.float64)
+    long_mavg = np.asarray(data['long_mavg'], dtype=np.float64)
+    return _compare_signals(short_mavg > long_mavg, short_mavg < long_mavg)
+
+@columnar_strategy
+def momentum_strategy_columnar(data):
+    """
+    Columnar version of `momentum_strategy`.
+    
+    Parameters:
+    data (pd.DataFrame or dict): Historical price data.
+    
+    Returns:
+    np.ndarray: int8 array of signal codes, one per row.
+    """
+    if 'returns' not in data:
+        return np.full(_column_length(data), HOLD, dtype=np.int8)
+
+    returns = np.asarray(data['returns'], dtype=np.float64)
+    return _compare_signals(returns > 0, returns < 0)
+
+@columnar_strategy
+def mean_reversion_strategy_columnar(data):
+    """
+    Columnar version of `mean_reversion_strategy`.
+    
+    Parameters:
+    data (pd.DataFrame or dict): Historical price data.
+    
+    Returns:
+    np.ndarray: int8 array of signal codes, one per row.
+    """
+    if 'z_score' not in data:
+        return np.full(_column_length(data), HOLD, dtype=np.int8)
+
+    z_score = np.asarray(data['z_score'], dtype=np.float64)
+    return _compare_signals(z_score < -1, z_score > 1)
+
+def moving_average_crossover_signals(close, short_window=40, long_window=100):
+    """
+    Moving average crossover signals computed from close prices.
+    
+    With the default windows this matches `example_strategy_columnar` on data
+    prepared by `add_strategy_columns`.
+    
+    Parameters:
+    close (np.ndarray): Close prices.
+    short_window (int): Window of the short moving average.
+    long_window (int): Window of the long moving average.
+    
+    Returns:
+    np.ndarray: int8 array of signal codes, one per bar.
+    """
+    close = pd.Series(close, copy=False)
+    short_mavg = close.rolling(window=short_window, min_periods=1).mean().to_numpy()
+    long_mavg = close.rolling(window=long_window, min_periods=1).mean().to_numpy()
+    return _compare_signals(short_mavg > long_mavg, short_mavg < long_mavg)
+
+def momentum_signals(close, threshold=0.0):
+    """
+    Momentum signals computed from close prices.
+    
+    With the default threshold this matches `momentum_strategy_columnar` on
+    data prepared by `add_strategy_columns`.
+    
+    Parameters:
+    close (np.ndarray): Close prices.
+    threshold (float): Absolute one-bar return needed to trade.
+    
+    Returns:
+    np.ndarray: int8 array of signal codes, one per bar.
+    """
+    returns = pd.Series(close, copy=False).pct_change().fillna(0).to_numpy()
+    return _compare_signals(returns > threshold, returns < -threshold)
+
+def mean_reversion_signals(close, window=20, lower=-1.0, upper=1.0):
+    """
+    Mean reversion signals computed from close prices.
+    
+    With the default parameters this matches `mean_reversion_strategy_columnar`
+    on data prepared by `add_strategy_columns`.
+    
+    Parameters:
+    close (np.ndarray): Close prices.
+    window (int): Window of the rolling mean and standard deviation.
+    lower (float): Buy when the z-score falls below this level.
+    upper (float): Sell when the z-score rises above this level.
+    
+    Returns:
+    np.ndarray: int8 array of signal codes, one per bar.
+    """
+    close = pd.Series(close, copy=False)
+    rolling_mean = close.rolling(window=window).mean()
+    rolling_std = close.rolling(window=window).std()
+    z_score = ((close - rolling_mean) / rolling_std).to_numpy()
+    return _compare_signals(z_score < lower, z_score > upper)
+
 if __name__ == "__main__":
     # Example usage
-    data = pd.read_csv('data/historical_data/btc_usd.csv', parse_dates=['Date'], index_col='Date')
+    data = pd.read_csv('data/cleaned_data/BTC_cleaned.csv', parse_dates=['Date'], index_col='Date')
     data.sort_values('Date', inplace=True)
 
-    # Calculate moving averages for example strategy
-    data['short_mavg'] = data['Close'].rolling(window=40, min_periods=1).mean()
-    data['long_mavg'] = data['Close'].rolling(window=100, min_periods=1).mean()
-
-    # Calculate returns for momentum strategy
-    data['returns'] = data['Close'].pct_change().fillna(0)
-
-    # Calculate z-score for mean reversion strategy
-    data['rolling_mean'] = data['Close'].rolling(window=20).mean()
-    data['rolling_std'] = data['Close'].rolling(window=20).std()
-    data['z_score'] = (data['Close'] - data['rolling_mean']) / data['rolling_std']
+    # Calculate the indicator columns used by the strategies
+    data = add_strategy_columns(data)
 
     # Choose a strategy to run the backtest
     strategy = example_strategy  # Replace with momentum_strategy or mean_reversion_strategy as needed
@@ -178,3 +631,20 @@ if __name__ == "__main__":
     results = run_backtest(data, strategy)
     results.to_csv('results/backtest_results.csv', index=False)
     print(results.head())
+
+    # The vectorized engine must reproduce the row-by-row loop exactly
+    signals = generate_signals(data, strategy)
+    fast_results = run_vectorized_backtest(data, signals)
+    for column in ['Cash', 'Position', 'Portfolio Value']:
+        np.testing.assert_allclose(fast_results[column], results[column], rtol=1e-9)
+    print("Vectorized backtest matches the row-by-row backtest.")
+
+    # Columnar strategies must produce the same signals as their row-wise versions
+    columnar_strategies = {
+        example_strategy: example_strategy_columnar,
+        momentum_strategy: momentum_strategy_columnar,
+        mean_reversion_strategy: mean_reversion_strategy_columnar
+    }
+    for row_strategy, strategy_columnar in columnar_strategies.items():
+        assert np.array_equal(generate_signals(data, row_strategy), strategy_columnar(data))
+    print("Columnar strategies match the row-wise strategies.")
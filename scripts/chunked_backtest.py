@@ -0,0 +1,119 @@
+"""
+chunked_backtest.py
+
+## Purpose
+The `chunked_backtest.py` file runs backtests over price histories that are too large to hold in memory together with their indicator columns, such as years of minute bars. The price file is streamed in fixed-size blocks; each block gets its indicators, signals and trades, its results are appended to the output file, and only the state needed by the next block is kept.
+
+## Importance
+Out-of-core backtesting lets us use our full production histories:
+1. **Flat Memory**: Peak memory depends on the block size, not on the length of the history.
+2. **Exact Results**: Rolling-window inputs (the 100-bar long average, the 20-bar standard deviation, the previous close) and the cash and position are carried across block boundaries, so the output matches a full in-memory `run_backtest` run. Each kind of strategy is simulated with the same engine `run_backtest` uses for it, so results are identical to the last digit.
+3. **Same Strategies**: Any strategy that works with `run_backtest`, columnar or row-wise, works here unchanged.
+
+## Functionality
+1. **Chunked Backtest**:
+   - `run_chunked_backtest` reads a CSV in blocks of `chunksize` rows. Before computing indicators on a block it prepends the last `lookback` rows of the data seen so far, and drops them again afterwards.
+   - Signals for the block are simulated starting from the cash and position left by the previous block: with the vectorized engine for columnar strategies, and bar by bar with the arithmetic of the row-by-row loop for row-wise ones.
+   - Results are appended to a temporary file that replaces `output_path` once the whole history has been processed, so a failed run leaves earlier results in place. The layout is that of `results/*_backtest_results.csv`.
+
+## Example Usage
+```python
+from scripts.backtesting import mean_reversion_strategy_columnar
+from scripts.chunked_backtest import run_chunked_backtest
+
+summary = run_chunked_backtest(
+    'data/cleaned_data/BTC_cleaned.csv',
+    mean_reversion_strategy_columnar,
+    output_path='results/BTC_mean_reversion_strategy_backtest_results.csv',
+    chunksize=100000
+)
+print(summary)
+
+"""
+
+
+
+import os
+import pandas as pd
+
+from backtesting import (BacktestResult, add_strategy_columns, generate_signals, is_columnar_strategy,
+                         simulate_signals, simulate_signals_loop)
+
+def run_chunked_backtest(file_path, strategy, output_path=None, chunksize=100000, initial_cash=10000,
+                         prepare=add_strategy_columns, lookback=100):
+    """
+    Run a backtest over a CSV price history, one block of rows at a time.
+
+    Parameters:
+    file_path (str): Path to a CSV file with a 'Date' column and the price columns used by `prepare`.
+    strategy (function): Columnar or row-wise trading strategy function.
+    output_path (str): CSV file the results are written to; it is replaced once the run completes. Results are discarded if omitted.
+    chunksize (int): Number of rows read per block.
+    initial_cash (float): Initial amount of cash for backtesting.
+    prepare (function): Adds the indicator columns the strategy needs to a DataFrame.
+    lookback (int): Rows of history `prepare` needs before a row to compute its indicators, i.e. the longest rolling window.
+
+    Returns:
+    dict: Number of bars, and the cash, position and portfolio value after the last bar.
+    """
+    # Written next to the output and moved into place only once every block is done
+    temporary = output_path + '.tmp' if output_path is not None else None
+    if temporary is not None and os.path.exists(temporary):
+        os.remove(temporary)
+    simulate = simulate_signals if is_columnar_strategy(strategy) else simulate_signals_loop
+
+    cash = initial_cash
+    position = 0.0
+    portfolio_value = initial_cash
+    bars = 0
+    history = None
+
+    # Dates are passed through as text: each block would otherwise be
+    # formatted on its own when written back out
+    try:
+        for chunk in pd.read_csv(file_path, index_col='Date', chunksize=chunksize):
+            frame = chunk if history is None else pd.concat([history, chunk])
+            warmup = len(frame) - len(chunk)
+
+            prepared = prepare(frame.copy()).iloc[warmup:]
+            signals = generate_signals(prepared, strategy)
+            results = BacktestResult(
+                prepared.index,
+                *simulate(prepared['Close'].to_numpy(dtype='float64'), signals, cash, position)
+            )
+            if temporary is not None:
+                results.to_csv(temporary, mode='a', header=bars == 0)
+
+            cash = results.cash[-1]
+            position = results.position[-1]
+            portfolio_value = results.portfolio_value[-1]
+            bars += len(results)
+            history = frame.iloc[-lookback:]
+        if temporary is not None:
+            if bars == 0:
+                # An empty history still replaces the previous results, with just the header
+                BacktestResult.allocate([]).to_csv(temporary)
+            os.replace(temporary, output_path)
+    except BaseException:
+        if temporary is not None and os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    return {
+        'Bars': bars,
+        'Cash': cash,
+        'Position': position,
+        'Portfolio Value': portfolio_value
+    }
+
+if __name__ == "__main__":
+    from backtesting import example_strategy_columnar
+
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        summary = run_chunked_backtest(
+            f'data/cleaned_data/{crypto}_cleaned.csv',
+            example_strategy_columnar,
+            output_path=f'results/{crypto}_example_strategy_chunked_backtest_results.csv',
+            chunksize=1000
+        )
+        print(f"{crypto}: {summary}")
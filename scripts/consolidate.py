@@ -0,0 +1,222 @@
+"""
+consolidate.py
+
+## Purpose
+The `consolidate.py` file merges every source of price history we hold for a symbol into one canonical daily series. The yearly CryptoCompare shards, the Yahoo Finance downloads, the Alpha Vantage dumps and the Coinbase spot snapshots use different column names, date formats and coverage. They are normalised to one layout, merged with a source-priority rule, deduplicated, flagged for gaps and written to `data/consolidated/` together with a binary price store.
+
+## Importance
+Downstream stages should read one clean file instead of re-merging raw files on every run:
+1. **One Series per Symbol**: Each bar comes from the highest-priority source that has it, and lower-priority sources only fill the dates the others miss.
+2. **Visible Gaps**: Every bar records how many bars are missing before it and which source it came from, so gaps and source changes can be checked instead of silently interpolated.
+3. **Throughput**: Sources are merged by sorting int64 timestamps once and keeping the first bar of each timestamp, rather than by repeated `concat` and `drop_duplicates` calls.
+
+## Functionality
+1. **Normalisation**:
+   - `normalize_columns` maps source-specific names (`close`, `4. close`, `amount`, `volumefrom`, `volumeto`, ...) to 'Date', 'Open', 'High', 'Low', 'Close' and 'Volume', parses the dates and drops rows without a positive close price (e.g. the zero rows before a coin was listed).
+
+2. **Sources**:
+   - `SOURCE_PRIORITY` lists the sources from most to least trusted, and `source_files` finds a symbol's files for each source.
+
+3. **Merging**:
+   - `consolidate_sources` sort-merges the normalised sources into one series. Timestamps are floored to the bar frequency, and for each bar the source with the best priority wins.
+   - The 'Gap' column holds the number of missing bars before each bar, and 'Source' the position of its source in the priority list.
+
+4. **Output**:
+   - `consolidate_symbol` writes `data/consolidated/{symbol}_consolidated.csv` and its price store, so `utils.load_data` reads it without parsing.
+
+## Example Usage
+```python
+from scripts.consolidate import consolidate_symbol
+from scripts.utils import load_data
+
+csv_path = consolidate_symbol('BTC')
+data = load_data(csv_path)
+print(data[data['Gap'] > 0])
+
+```
+
+Volumes are taken from the winning source as they are. CryptoCompare and Yahoo Finance report volume in USD, and Alpha Vantage and Coinbase in units of the coin, so use 'Source' when comparing volumes across sources.
+
+"""
+
+
+
+import glob
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+from price_store import convert_csv
+
+# Sources from most to least trusted, with the glob patterns of their files
+SOURCE_PRIORITY = [
+    ('cryptocompare', 'data/historical_data/cryptocompare/{symbol}_cryptocompare_*.csv'),
+    ('yahoo', 'data/historical_data/{symbol}-USD.csv'),
+    ('alpha_vantage', 'data/historical_data/alpha_vantage/{symbol}_alpha_vantage.csv'),
+    ('coinbase', 'data/historical_data/coinbase/{symbol}_coinbase.csv')
+]
+
+# Source column names (lower case) mapped to the canonical ones
+COLUMN_ALIASES = {
+    'date': 'Date', 'time': 'Date', 'timestamp': 'Date',
+    'open': 'Open', '1. open': 'Open', '1a. open (usd)': 'Open',
+    'high': 'High', '2. high': 'High', '2a. high (usd)': 'High',
+    'low': 'Low', '3. low': 'Low', '3a. low (usd)': 'Low',
+    'close': 'Close', '4. close': 'Close', '4a. close (usd)': 'Close', 'amount': 'Close',
+    'volume': 'Volume', '5. volume': 'Volume', 'volumefrom': 'Volume'
+}
+
+VALUE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+logger = logging.getLogger(__name__)
+
+def normalize_columns(frame):
+    """
+    Bring one source file to the canonical column layout.
+
+    Parameters:
+    frame (pd.DataFrame): Data as read from a source file.
+
+    Returns:
+    pd.DataFrame: 'Date' and the 'Open', 'High', 'Low', 'Close' and 'Volume' columns (NaN where the source has none), sorted by date, keeping only rows with a valid date and a positive close.
+    """
+    renames = {}
+    for column in frame.columns:
+        canonical = COLUMN_ALIASES.get(str(column).strip().lower())
+        if canonical is not None and canonical not in renames.values():
+            renames[column] = canonical
+    # Quote-currency volume is only used when the source has no other volume
+    if 'Volume' not in renames.values():
+        for column in frame.columns:
+            if str(column).strip().lower() == 'volumeto':
+                renames[column] = 'Volume'
+    frame = frame.rename(columns=renames)
+    if 'Date' not in frame.columns or 'Close' not in frame.columns:
+        raise ValueError(f"No date or close column among {list(frame.columns)}")
+
+    dates = frame['Date']
+    if pd.api.types.is_numeric_dtype(dates):
+        dates = pd.to_datetime(dates, unit='s', errors='coerce')
+    else:
+        try:
+            dates = pd.to_datetime(dates, format='ISO8601')
+        except (ValueError, TypeError):
+            dates = pd.to_datetime(dates, format='mixed', errors='coerce')
+
+    normalized = pd.DataFrame({'Date': dates})
+    for column in VALUE_COLUMNS:
+        if column in frame.columns:
+            normalized[column] = pd.to_numeric(frame[column], errors='coerce').astype(np.float64)
+        else:
+            normalized[column] = np.nan
+
+    normalized = normalized[normalized['Date'].notna() & (normalized['Close'] > 0)]
+    # Zero open, high or low prices are placeholders, not prices
+    for column in ['Open', 'High', 'Low']:
+        normalized.loc[normalized[column] <= 0, column] = np.nan
+    return normalized.sort_values('Date', kind='stable', ignore_index=True)
+
+def source_files(symbol, sources=SOURCE_PRIORITY):
+    """
+    Files of each source for a symbol.
+
+    Parameters:
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+    sources (list): (name, glob pattern) pairs in priority order; '{symbol}' in a pattern is replaced by the symbol.
+
+    Returns:
+    list: (name, sorted list of file paths) pairs in priority order.
+    """
+    return [(name, sorted(glob.glob(pattern.format(symbol=symbol)))) for name, pattern in sources]
+
+def consolidate_sources(sources, frequency='1D'):
+    """
+    Merge normalised sources into one deduplicated, gap-flagged series.
+
+    Parameters:
+    sources (list): (name, list of DataFrames) pairs in priority order; the DataFrames come from `normalize_columns`.
+    frequency (str): Bar frequency timestamps are floored to, e.g. '1D' or '1h'.
+
+    Returns:
+    pd.DataFrame: 'Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Gap' and 'Source' columns, one row per bar.
+    """
+    step = pd.Timedelta(frequency).value
+    timestamps = []
+    values = []
+    ranks = []
+    for rank, (_, frames) in enumerate(sources):
+        for frame in frames:
+            if frame.empty:
+                continue
+            timestamps.append(frame['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64))
+            values.append(frame[VALUE_COLUMNS].to_numpy(dtype=np.float64))
+            ranks.append(np.full(len(frame), rank, dtype=np.int64))
+    if not timestamps:
+        raise ValueError("No source has any bars")
+
+    timestamps = np.concatenate(timestamps)
+    values = np.concatenate(values)
+    ranks = np.concatenate(ranks)
+    timestamps = timestamps - timestamps % step
+
+    # One sort by (timestamp, priority); the first row of each timestamp wins
+    order = np.lexsort((ranks, timestamps))
+    timestamps = timestamps[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = timestamps[1:] != timestamps[:-1]
+    keep = order[first]
+    timestamps = timestamps[first]
+
+    gaps = np.zeros(len(timestamps), dtype=np.int64)
+    gaps[1:] = np.diff(timestamps) // step - 1
+
+    merged = pd.DataFrame(values[keep], columns=VALUE_COLUMNS)
+    merged.insert(0, 'Date', timestamps.view('datetime64[ns]'))
+    merged['Gap'] = gaps
+    merged['Source'] = ranks[keep]
+    return merged
+
+def consolidate_symbol(symbol, output_dir='data/consolidated', sources=SOURCE_PRIORITY, frequency='1D'):
+    """
+    Consolidate every source of a symbol into one CSV file and its price store.
+
+    Files that cannot be read as price tables (e.g. saved API error
+    messages) are skipped with a warning.
+
+    Parameters:
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+    output_dir (str): Directory the consolidated file is written to.
+    sources (list): (name, glob pattern) pairs in priority order.
+    frequency (str): Bar frequency timestamps are floored to.
+
+    Returns:
+    str: Path of the consolidated CSV file.
+    """
+    frames = []
+    for name, paths in source_files(symbol, sources):
+        source_frames = []
+        for path in paths:
+            try:
+                source_frames.append(normalize_columns(pd.read_csv(path)))
+            except (ValueError, pd.errors.ParserError) as e:
+                logger.warning(f"Skipping {path} ({name}): {e}")
+        frames.append((name, source_frames))
+
+    merged = consolidate_sources(frames, frequency)
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, f'{symbol}_consolidated.csv')
+    temporary = csv_path + '.tmp'
+    merged.to_csv(temporary, index=False)
+    os.replace(temporary, csv_path)
+    convert_csv(csv_path)
+
+    counts = merged['Source'].value_counts().sort_index()
+    summary = ', '.join(f"{sources[rank][0]}: {count}" for rank, count in counts.items())
+    logger.info(f"{symbol}: {len(merged)} bars ({summary}), {int((merged['Gap'] > 0).sum())} gaps, written to {csv_path}")
+    return csv_path
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        consolidate_symbol(crypto)
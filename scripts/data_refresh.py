@@ -0,0 +1,277 @@
+"""
+data_refresh.py
+
+## Purpose
+The `data_refresh.py` file keeps our local price histories up to date without downloading them again. It reads the timestamp of the last bar stored in a CSV file, requests only the bars after it, validates them and appends them to the file. A daily refresh therefore moves a handful of rows instead of the whole history.
+
+## Importance
+Re-downloading and overwriting a full history on every run is slow and fragile:
+1. **Less Traffic**: Only new bars are requested, which keeps us well inside API rate limits.
+2. **Data Safety**: A failed or malformed API response never reaches the file. New bars are validated first, and appends are written to a copy of the file that replaces it only once complete, so the existing history survives even a crash or power loss mid-write (`btc_usd.csv` was once overwritten with an error message this way).
+3. **Compatibility**: Appended rows use the columns and date format already in the file, so `utils.load_data`, the price stores and the notebooks read refreshed files unchanged.
+
+## Functionality
+1. **Last Stored Bar**:
+   - `last_timestamp` reads the date of the last row of a CSV file from its end, without parsing the rest of the file.
+
+2. **Fetching New Bars**:
+   - `fetch_cryptocompare_daily` requests the completed daily bars after a given time from CryptoCompare through `fetcher.fetch_cryptocompare_range`, in pages of at most 2000 bars however long the gap, with volume in USD as in the fetched files. Today's unfinished bar is never stored, since appended bars are never revised.
+
+3. **Validation**:
+   - `validate_bars` rejects bars with missing or non-numeric prices, inconsistent highs and lows, unordered or duplicate dates, dates that are not after the last stored bar, or a first bar that leaves a gap after it.
+
+4. **Appending**:
+   - `append_bars` appends validated bars to a copy of a CSV file, syncs it to disk and renames it over the original.
+   - `refresh_csv` ties the steps together for one file and returns the number of bars added.
+
+## Example Usage
+```python
+from scripts.data_refresh import refresh_csv
+
+added = refresh_csv('data/cleaned_data/BTC_cleaned.csv', 'BTC')
+print(f"{added} new bars")
+
+```
+
+The script can also be run from the command line:
+```
+python scripts/data_refresh.py --crypto ALL
+```
+
+"""
+
+
+
+import argparse
+import logging
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import requests
+
+from fetcher import fetch_cryptocompare_range, make_providers
+
+# Bars fetched for a file that has no bars yet
+CRYPTOCOMPARE_LIMIT = 2000
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+logger = logging.getLogger(__name__)
+
+def _read_last_line(file_path, block_size=4096):
+    """
+    Last non-empty line of a text file, read backwards from the end.
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        tail = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            file.seek(position)
+            tail = file.read(step) + tail
+            lines = tail.rstrip(b'\r\n').split(b'\n')
+            if len(lines) > 1 or position == 0:
+                return lines[-1].decode().strip()
+    return ''
+
+def _date_format(text):
+    """
+    strftime format matching a date string stored in a CSV file.
+    """
+    if len(text) == 10:
+        return '%Y-%m-%d'
+    if '.' in text:
+        return '%Y-%m-%d %H:%M:%S.%f'
+    return '%Y-%m-%d %H:%M:%S'
+
+def last_timestamp(file_path):
+    """
+    Date of the last row of a CSV file with a leading 'Date' column.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+
+    Returns:
+    pd.Timestamp: Date of the last row, or None if the file does not exist or has no rows.
+    """
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path) as file:
+        header = file.readline().strip()
+    if not header.startswith('Date,'):
+        raise ValueError(f"{file_path} is not a price CSV with a leading 'Date' column")
+    line = _read_last_line(file_path)
+    if line == header:
+        return None
+    return pd.Timestamp(line.split(',', 1)[0])
+
+def fetch_cryptocompare_daily(symbol, since=None, until=None, provider=None):
+    """
+    Fetch completed daily bars from CryptoCompare.
+
+    The range is fetched by `fetcher.fetch_cryptocompare_range`, in pages
+    of at most 2000 bars however long the gap.
+
+    Parameters:
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+    since (pd.Timestamp): Only bars after this time are returned (None for the last `CRYPTOCOMPARE_LIMIT` bars).
+    until (pd.Timestamp): End of the range, exclusive (defaults to midnight UTC today, which leaves out today's unfinished bar).
+    provider (Provider): CryptoCompare provider to fetch through (defaults to a new one from `fetcher.make_providers`).
+
+    Returns:
+    pd.DataFrame: 'Date', 'Open', 'High', 'Low', 'Close' and 'Volume' columns, with volume in USD like `fetcher`'s CryptoCompare files.
+    """
+    end = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize() if until is None else pd.Timestamp(until)
+    step = pd.Timedelta('1D')
+    start = end - CRYPTOCOMPARE_LIMIT * step if since is None else pd.Timestamp(since).floor(step) + step
+    if start >= end:
+        return pd.DataFrame(columns=['Date'] + PRICE_COLUMNS + ['Volume'])
+
+    own_provider = provider is None
+    provider = make_providers()['cryptocompare'] if own_provider else provider
+    try:
+        bars = fetch_cryptocompare_range(provider, symbol, start, end, frequency='1D')
+    finally:
+        if own_provider:
+            provider.close()
+    if since is not None:
+        bars = bars[bars['Date'] > pd.Timestamp(since)]
+    return bars.reset_index(drop=True)
+
+def validate_bars(bars, after=None, frequency='1D'):
+    """
+    Check new bars before they are stored.
+
+    Parameters:
+    bars (pd.DataFrame): Bars with 'Date', 'Open', 'High', 'Low', 'Close' and 'Volume' columns.
+    after (pd.Timestamp): Date of the last stored bar; every new bar must be later, and the first one at most one bar later.
+    frequency (str): Bar frequency, used to check that the first new bar follows the last stored one.
+
+    Returns:
+    pd.DataFrame: The bars with numeric columns converted to float.
+    """
+    missing = [column for column in ['Date'] + PRICE_COLUMNS + ['Volume'] if column not in bars.columns]
+    if missing:
+        raise ValueError(f"Bars are missing columns {missing}")
+
+    bars = bars.copy()
+    bars['Date'] = pd.to_datetime(bars['Date'])
+    for column in PRICE_COLUMNS + ['Volume']:
+        bars[column] = pd.to_numeric(bars[column], errors='coerce').astype(np.float64)
+
+    prices = bars[PRICE_COLUMNS].to_numpy()
+    if bars['Date'].isna().any():
+        raise ValueError("Bars contain missing dates")
+    if not np.isfinite(prices).all() or (prices <= 0).any():
+        raise ValueError("Bars contain missing, non-numeric or non-positive prices")
+    if not np.isfinite(bars['Volume'].to_numpy()).all() or (bars['Volume'] < 0).any():
+        raise ValueError("Bars contain missing or negative volumes")
+    if (bars['High'] < bars[['Open', 'Close', 'Low']].max(axis=1)).any() or \
+            (bars['Low'] > bars[['Open', 'Close']].min(axis=1)).any():
+        raise ValueError("Bars have highs or lows inconsistent with their open and close")
+    if not bars['Date'].is_monotonic_increasing or bars['Date'].duplicated().any():
+        raise ValueError("Bar dates are not strictly increasing")
+    if after is not None and len(bars) and bars['Date'].iloc[0] <= pd.Timestamp(after):
+        raise ValueError(f"Bars start at {bars['Date'].iloc[0]}, not after the last stored bar {after}")
+    if after is not None and len(bars) and bars['Date'].iloc[0] - pd.Timestamp(after) > pd.Timedelta(frequency):
+        raise ValueError(f"Bars start at {bars['Date'].iloc[0]}, leaving a gap after the last stored bar {after}")
+    return bars
+
+def append_bars(file_path, bars):
+    """
+    Append bars to a CSV file, leaving it unchanged if anything fails.
+
+    The bars are written in the file's column order and date format. The
+    file is copied to a temporary path, the bars are appended to the copy,
+    which is synced to disk and renamed over the original, so even a crash
+    mid-write leaves either the old or the new file in place.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    bars (pd.DataFrame): Validated bars to append.
+
+    Returns:
+    int: Number of bars appended.
+    """
+    if bars.empty:
+        return 0
+
+    if not os.path.exists(file_path):
+        temporary = file_path + '.tmp'
+        bars.to_csv(temporary, index=False, date_format='%Y-%m-%d %H:%M:%S.%f')
+        os.replace(temporary, file_path)
+        return len(bars)
+
+    with open(file_path) as file:
+        columns = file.readline().strip().split(',')
+    missing = [column for column in columns if column not in bars.columns]
+    if missing:
+        raise ValueError(f"Bars are missing columns {missing} of {file_path}")
+    last_line = _read_last_line(file_path)
+    date_format = _date_format(last_line.split(',', 1)[0]) if last_line != ','.join(columns) else '%Y-%m-%d'
+    text = bars[columns].to_csv(index=False, header=False, date_format=date_format)
+
+    temporary = file_path + '.tmp'
+    try:
+        shutil.copyfile(file_path, temporary)
+        shutil.copymode(file_path, temporary)
+        with open(temporary, 'rb+') as file:
+            # Start on a new line even if the file lacks a trailing newline
+            size = file.seek(0, os.SEEK_END)
+            newline = b''
+            if size:
+                file.seek(size - 1)
+                newline = b'' if file.read(1) == b'\n' else b'\n'
+            file.seek(size)
+            file.write(newline + text.encode())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, file_path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return len(bars)
+
+def refresh_csv(file_path, symbol, fetch=fetch_cryptocompare_daily):
+    """
+    Append the daily bars completed since the last stored bar of a CSV file.
+
+    Bars starting at or after midnight UTC today are still forming and are
+    left out, since appended bars are never revised.
+
+    Parameters:
+    file_path (str): Path to a price CSV file with 'Date', 'Open', 'High', 'Low', 'Close' and 'Volume' columns.
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+    fetch (function): Called as `fetch(symbol, since)`, returns bars after `since`.
+
+    Returns:
+    int: Number of bars appended.
+    """
+    last = last_timestamp(file_path)
+    bars = fetch(symbol, last)
+    dates = pd.to_datetime(bars['Date'])
+    keep = dates < pd.Timestamp.now(tz='UTC').tz_localize(None).normalize()
+    if last is not None:
+        keep &= dates > last
+    bars = validate_bars(bars[keep], after=last)
+    added = append_bars(file_path, bars)
+    logger.info(f"{symbol}: {added} new bars appended to {file_path} (last stored bar was {last})")
+    return added
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='Append new daily bars to the cleaned price histories.')
+    parser.add_argument('--crypto', type=str, required=True, choices=['BTC', 'ETH', 'SOL', 'ALL'], help='The cryptocurrency symbol (e.g., BTC, ETH, SOL, ALL).')
+    args = parser.parse_args()
+
+    cryptos = ['BTC', 'ETH', 'SOL'] if args.crypto == 'ALL' else [args.crypto]
+    for crypto in cryptos:
+        try:
+            refresh_csv(f'data/cleaned_data/{crypto}_cleaned.csv', crypto)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error(f"Refresh of {crypto} failed, stored data left unchanged: {e}")
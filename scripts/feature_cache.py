@@ -0,0 +1,248 @@
+"""
+feature_cache.py
+
+## Purpose
+The `feature_cache.py` file keeps computed indicators and features (rolling means and standard deviations, returns, lags, moving averages, RSI) on disk so they are computed once per version of the underlying data. Each cached feature is identified by the symbol, a content hash of the source series, the feature name and its parameters.
+
+## Importance
+The notebooks and scripts derive the same features from `data/cleaned_data/*_cleaned.csv` on every run:
+1. **No Repeated Work**: A repeated pipeline run whose inputs have not changed loads every feature from disk instead of recomputing it.
+2. **Cheap Appends**: When new bars are appended to a series, only the new tail of each feature is computed, from the last few rows of history the feature depends on.
+3. **Bounded Disk Use**: The cache has a size limit and evicts the least recently used features when it is exceeded.
+
+## Functionality
+1. **Fingerprints**:
+   - `series_fingerprint` hashes the values of a series; a feature is reused only when the values it was computed from are unchanged.
+
+2. **Cached Features**:
+   - `FeatureCache.get` returns a cached feature, extends a cached feature computed on a prefix of the series, or computes and stores it. Storing a new version of a feature deletes the versions computed on a prefix of its series; versions of other series, such as the same symbol with edited history, are left to eviction.
+   - Features with a finite `lookback` (e.g. a 20-bar rolling mean) are extended on append from the last rows of history. Recursive features such as `ewm(adjust=False)` averages are extended with `seed=True`, starting from their last cached value; other features with unbounded memory are recomputed when the data changes.
+
+3. **Eviction**:
+   - Entries are stored as `.npy` values with a `.json` metadata file. Every hit refreshes an entry's modification time, and the oldest entries are deleted once the cache grows beyond `max_bytes`.
+
+## Example Usage
+```python
+import pandas as pd
+from scripts.feature_cache import FeatureCache
+
+cache = FeatureCache('data/feature_cache')
+data = pd.read_csv('data/cleaned_data/BTC_cleaned.csv', parse_dates=['Date'], index_col='Date')
+
+rolling_mean = cache.get(
+    'BTC', data['Close'], 'rolling_mean',
+    lambda close, window: close.rolling(window=window).mean(),
+    {'window': 20},
+    lookback=20
+)
+print(cache.stats)
+
+"""
+
+
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+def series_fingerprint(values):
+    """
+    Content hash of a series of numbers.
+
+    Parameters:
+    values (array-like): Values of the series.
+
+    Returns:
+    str: Hex digest of the values stored as float64.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return hashlib.sha256(values.tobytes()).hexdigest()
+
+def _params_digest(params):
+    """
+    Short, stable digest of a dict of feature parameters.
+    """
+    text = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+class FeatureCache:
+    """
+    On-disk cache of features computed from price series.
+
+    Parameters:
+    cache_dir (str): Directory holding the cached features.
+    max_bytes (int): Size limit of the cache; least recently used features are evicted beyond it.
+    """
+
+    def __init__(self, cache_dir='data/feature_cache', max_bytes=512 * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'appends': 0, 'misses': 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_prefix(self, symbol, name, params):
+        return f'{symbol}__{name}__{_params_digest(params)}__'
+
+    def _entries(self, prefix):
+        """
+        Metadata of the cached versions of one feature.
+        """
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.startswith(prefix) and file_name.endswith('.json'):
+                try:
+                    with open(os.path.join(self.cache_dir, file_name)) as file:
+                        entries.append(json.load(file))
+                except (OSError, ValueError):
+                    continue
+        return entries
+
+    def _path(self, entry, extension):
+        return os.path.join(self.cache_dir, entry['file'] + extension)
+
+    def _load(self, entry):
+        values = np.load(self._path(entry, '.npy'))
+        os.utime(self._path(entry, '.npy'))
+        os.utime(self._path(entry, '.json'))
+        return values
+
+    def _remove(self, entry):
+        for extension in ('.npy', '.json'):
+            try:
+                os.remove(self._path(entry, extension))
+            except FileNotFoundError:
+                pass
+
+    def _store(self, prefix, symbol, name, params, fingerprint, values, superseded=()):
+        entry = {
+            'file': prefix + fingerprint[:16],
+            'symbol': symbol,
+            'name': name,
+            'params': params,
+            'fingerprint': fingerprint,
+            'length': len(values)
+        }
+        # Values are written before the metadata, so a crash never leaves an entry pointing at missing data
+        temporary = self._path(entry, '.tmp.npy')
+        np.save(temporary, values)
+        os.replace(temporary, self._path(entry, '.npy'))
+        temporary = self._path(entry, '.json.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(entry, file, default=str)
+        os.replace(temporary, self._path(entry, '.json'))
+        # Older versions of the feature are only removed once the new one is in place
+        for old in superseded:
+            if old['file'] != entry['file']:
+                self._remove(old)
+        self.evict()
+
+    def get(self, symbol, series, name, function, params=None, lookback=None, seed=False):
+        """
+        Return a feature of a series, computing only what is not cached yet.
+
+        Parameters:
+        symbol (str): Symbol the series belongs to, e.g. 'BTC'.
+        series (pd.Series): Source series, e.g. closing prices.
+        name (str): Feature name; together with `params` it must identify the computation.
+        function (function): Called as `function(series, **params)`, returns a series or array of the same length.
+        params (dict): Parameters of the feature.
+        lookback (int): Rows of history before a bar that its feature value depends on, e.g. the window of a rolling mean. None for features that depend on the whole history; these are only extended with `seed`.
+        seed (bool): Extend the feature by computing it on its last cached value followed by the new rows. For recursive features whose first value is their first input and whose later values depend only on the previous value and the new input, such as `ewm(adjust=False).mean()`.
+
+        Returns:
+        pd.Series: Feature values aligned with `series`.
+        """
+        params = params or {}
+        series = pd.Series(series, copy=False)
+        values = series.to_numpy(dtype=np.float64)
+        fingerprint = series_fingerprint(values)
+        prefix = self._entry_prefix(symbol, name, params)
+        entries = self._entries(prefix)
+
+        for entry in entries:
+            if entry['fingerprint'] == fingerprint:
+                self.stats['hits'] += 1
+                return pd.Series(self._load(entry), index=series.index, name=name)
+
+        # Versions computed on a prefix of this series are superseded by it; others stay until evicted
+        prefixes = [
+            entry for entry in entries
+            if entry['length'] <= len(values) and series_fingerprint(values[:entry['length']]) == entry['fingerprint']
+        ]
+
+        feature = None
+        if lookback is not None or seed:
+            # The longest cached version computed on a prefix of this series can be extended
+            for entry in sorted(prefixes, key=lambda cached: cached['length'], reverse=True):
+                length = entry['length']
+                cached = self._load(entry)
+                if lookback is not None:
+                    start = max(length - lookback, 0)
+                    tail = np.asarray(function(series.iloc[start:], **params), dtype=np.float64)[length - start:]
+                elif length and not np.isnan(values[length - 1]):
+                    seeded = pd.Series(np.concatenate([cached[-1:], values[length:]]))
+                    tail = np.asarray(function(seeded, **params), dtype=np.float64)[1:]
+                else:
+                    # A missing last input would change how the seed decays, so start over
+                    continue
+                feature = np.concatenate([cached, tail])
+                self.stats['appends'] += 1
+                break
+
+        if feature is None:
+            feature = np.asarray(function(series, **params), dtype=np.float64)
+            self.stats['misses'] += 1
+
+        self._store(prefix, symbol, name, params, fingerprint, feature, superseded=prefixes)
+        return pd.Series(feature, index=series.index, name=name)
+
+    def size(self):
+        """
+        Total size of the cached features in bytes.
+        """
+        return sum(
+            os.path.getsize(os.path.join(self.cache_dir, file_name))
+            for file_name in os.listdir(self.cache_dir)
+        )
+
+    def evict(self):
+        """
+        Delete least recently used features until the cache fits in `max_bytes`.
+        """
+        files = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith('.npy') and not file_name.endswith('.tmp.npy'):
+                path = os.path.join(self.cache_dir, file_name)
+                stat = os.stat(path)
+                metadata_path = path[:-len('.npy')] + '.json'
+                metadata_size = os.path.getsize(metadata_path) if os.path.exists(metadata_path) else 0
+                files.append((stat.st_mtime, stat.st_size + metadata_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove({'file': os.path.basename(path)[:-len('.npy')]})
+            total -= size
+
+    def clear(self):
+        """
+        Delete every cached feature.
+        """
+        for file_name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, file_name))
+
+if __name__ == "__main__":
+    cache = FeatureCache('data/feature_cache')
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        data = pd.read_csv(f'data/cleaned_data/{crypto}_cleaned.csv', parse_dates=['Date'], index_col='Date')
+        for window in [20, 40, 100]:
+            cache.get(
+                crypto, data['Close'], 'rolling_mean',
+                lambda close, window: close.rolling(window=window).mean(),
+                {'window': window},
+                lookback=window
+            )
+    print(cache.stats)
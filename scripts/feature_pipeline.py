@@ -0,0 +1,268 @@
+"""
+feature_pipeline.py
+
+## Purpose
+The `feature_pipeline.py` file is the single place where the features used by our strategies and models are defined. Each feature is registered with the features or data columns it is computed from, forming a dependency graph. A strategy or model asks for the columns it needs, and only those columns and the intermediates they depend on are computed, each once.
+
+## Importance
+Feature code used to be repeated across `utils.py`, `backtesting.py` and the notebooks:
+1. **One Definition**: The 20-bar moving average behind `SMA_20` and the z-score's `rolling_mean` is defined once and shared, and the `Close_Lag1..7` features of the random forest model live next to the indicators.
+2. **Lazy Evaluation**: Requesting `z_score` computes the rolling mean and standard deviation it needs and nothing else, however many features are registered.
+3. **Bounded Memory**: Intermediates that were not requested are released as soon as the last feature depending on them has been computed.
+
+## Functionality
+1. **Feature Registry**:
+   - `FeatureRegistry.register` is a decorator that adds a feature and declares its dependencies; the decorated function receives the dependency columns in order and returns the feature column.
+   - `FEATURES` is the registry of the project's features: moving averages, RSI (`calculate_rsi`), returns, the z-score inputs and lagged closes. `INDICATORS` lists the columns added by `utils.calculate_indicators`.
+
+2. **Evaluation**:
+   - `FeatureRegistry.plan` resolves the requested columns into the features to compute, in dependency order.
+   - `compute_features` returns the requested columns as a new DataFrame, and `add_features` adds them to the data.
+   - Given a `FeatureCache` from `feature_cache.py`, features computed from a single column are loaded from the cache, or extended after an append, instead of recomputed. Each feature declares how much history its values depend on for this. Features of the same bar only, such as the `rolling_mean` alias of `SMA_20`, are not cached.
+
+## Example Usage
+```python
+import pandas as pd
+from scripts.feature_pipeline import FEATURES, compute_features
+
+data = pd.read_csv('data/cleaned_data/BTC_cleaned.csv', parse_dates=['Date'], index_col='Date')
+print(FEATURES.plan(['z_score', 'SMA_20'], data.columns))
+features = compute_features(data, ['z_score', 'SMA_20'] + [f'Close_Lag{i}' for i in range(1, 8)])
+print(features.tail())
+
+"""
+
+
+
+import pandas as pd
+
+def calculate_rsi(series, period=14):
+    """
+    Calculate the Relative Strength Index (RSI) for a series.
+    
+    Parameters:
+    series (pd.Series): Time series data.
+    period (int): Lookback period for RSI calculation.
+    
+    Returns:
+    pd.Series: RSI values.
+    """
+    delta = series.diff(1)
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+class Feature:
+    """
+    A registered feature: how it is computed and what it is computed from.
+
+    Parameters:
+    name (str): Column name of the feature.
+    function (function): Called with the dependency columns in order, returns the feature column.
+    dependencies (tuple): Names of the features or data columns the feature is computed from.
+    lookback (int): Rows of history before a bar that its value depends on, or None if it depends on the whole history (see `FeatureCache.get`).
+    seed (bool): The feature can be extended from its last value, like an `ewm(adjust=False)` average (see `FeatureCache.get`).
+    """
+
+    def __init__(self, name, function, dependencies, lookback=None, seed=False):
+        self.name = name
+        self.function = function
+        self.dependencies = tuple(dependencies)
+        self.lookback = lookback
+        self.seed = seed
+
+    def __repr__(self):
+        return f"Feature({self.name!r}, dependencies={list(self.dependencies)})"
+
+class FeatureRegistry:
+    """
+    Named features and the dependencies between them.
+    """
+
+    def __init__(self):
+        self.features = {}
+
+    def register(self, name, dependencies=('Close',), lookback=None, seed=False):
+        """
+        Decorator that registers a feature function.
+
+        Parameters:
+        name (str): Column name of the feature.
+        dependencies (iterable): Names of the features or data columns passed to the function, in order.
+        lookback (int): Rows of history before a bar that its value depends on (None for the whole history).
+        seed (bool): The feature can be extended from its last value.
+
+        Returns:
+        function: Decorator returning the function unchanged.
+        """
+        def decorator(function):
+            self.add(name, function, dependencies, lookback, seed)
+            return function
+        return decorator
+
+    def add(self, name, function, dependencies=('Close',), lookback=None, seed=False):
+        """
+        Register a feature function.
+
+        Parameters:
+        name (str): Column name of the feature.
+        function (function): Called with the dependency columns in order, returns the feature column.
+        dependencies (iterable): Names of the features or data columns passed to the function, in order.
+        lookback (int): Rows of history before a bar that its value depends on (None for the whole history).
+        seed (bool): The feature can be extended from its last value.
+        """
+        if name in self.features:
+            raise ValueError(f"Feature '{name}' is already registered")
+        self.features[name] = Feature(name, function, dependencies, lookback, seed)
+
+    def plan(self, columns, available=()):
+        """
+        Features needed for a set of columns, in the order they must be computed.
+
+        Parameters:
+        columns (iterable): Requested feature or data column names.
+        available (iterable): Columns already present in the data; registered features are always computed from their definition.
+
+        Returns:
+        list: Names of the registered features to compute, each after its dependencies.
+        """
+        available = set(available)
+        order = []
+        state = {}
+
+        def visit(name, path):
+            if name in self.features:
+                if state.get(name) == 'done':
+                    return
+                if state.get(name) == 'visiting':
+                    raise ValueError(f"Circular feature dependency: {' -> '.join(path + [name])}")
+                state[name] = 'visiting'
+                for dependency in self.features[name].dependencies:
+                    visit(dependency, path + [name])
+                state[name] = 'done'
+                order.append(name)
+            elif name not in available:
+                raise KeyError(f"Unknown feature or column '{name}'")
+
+        for column in columns:
+            visit(column, [])
+        return order
+
+    def compute(self, data, columns, cache=None, symbol=None):
+        """
+        Compute the requested columns and the intermediates they depend on.
+
+        Parameters:
+        data (pd.DataFrame): Historical price data.
+        columns (iterable): Requested feature or data column names.
+        cache (FeatureCache): Optional feature cache; features computed from a single column with a lookback other than 0 are served from it.
+        symbol (str): Symbol of the data, required with `cache`.
+
+        Returns:
+        pd.DataFrame: The requested columns, indexed like `data`.
+        """
+        if cache is not None and symbol is None:
+            raise ValueError("A symbol is required to use the feature cache")
+        columns = list(dict.fromkeys(columns))
+        order = self.plan(columns, data.columns)
+
+        # Number of planned features still to read each value, so intermediates can be released early
+        consumers = {}
+        for name in order:
+            for dependency in self.features[name].dependencies:
+                consumers[dependency] = consumers.get(dependency, 0) + 1
+
+        values = {}
+        for name in order:
+            feature = self.features[name]
+            inputs = [values[dependency] if dependency in values else data[dependency]
+                      for dependency in feature.dependencies]
+            # Features of the same bar only (lookback 0), such as aliases, cost less to compute than to load
+            if cache is not None and len(inputs) == 1 and feature.lookback != 0:
+                values[name] = cache.get(symbol, inputs[0], name, feature.function,
+                                         lookback=feature.lookback, seed=feature.seed)
+            else:
+                values[name] = pd.Series(feature.function(*inputs), index=data.index, name=name)
+            for dependency in feature.dependencies:
+                consumers[dependency] -= 1
+                if consumers[dependency] == 0 and dependency in values and dependency not in columns:
+                    del values[dependency]
+
+        return pd.DataFrame(
+            {column: values[column] if column in values else data[column] for column in columns},
+            index=data.index
+        )
+
+FEATURES = FeatureRegistry()
+
+# Moving averages and RSI, the columns of `utils.calculate_indicators`
+INDICATORS = ['SMA_20', 'SMA_50', 'EMA_20', 'EMA_50', 'RSI']
+for window in (20, 50):
+    FEATURES.add(f'SMA_{window}', lambda close, window=window: close.rolling(window=window).mean(), lookback=window)
+for span in (20, 50):
+    FEATURES.add(f'EMA_{span}', lambda close, span=span: close.ewm(span=span, adjust=False).mean(), seed=True)
+FEATURES.add('RSI', calculate_rsi, lookback=14)
+
+# Moving averages for the moving average crossover strategy
+FEATURES.add('short_mavg', lambda close: close.rolling(window=40, min_periods=1).mean(), lookback=40)
+FEATURES.add('long_mavg', lambda close: close.rolling(window=100, min_periods=1).mean(), lookback=100)
+
+# Returns for the momentum strategy
+FEATURES.add('returns', lambda close: close.pct_change().fillna(0), lookback=1)
+
+# Z-score for the mean reversion strategy; its rolling mean is SMA_20
+FEATURES.add('rolling_mean', lambda sma: sma, dependencies=('SMA_20',), lookback=0)
+FEATURES.add('rolling_std', lambda close: close.rolling(window=20).std(), lookback=20)
+FEATURES.add(
+    'z_score',
+    lambda close, mean, std: (close - mean) / std,
+    dependencies=('Close', 'rolling_mean', 'rolling_std')
+)
+
+# Lagged closes for the random forest model
+for lag in range(1, 8):
+    FEATURES.add(f'Close_Lag{lag}', lambda close, lag=lag: close.shift(lag), lookback=lag)
+
+def compute_features(data, columns, registry=FEATURES, cache=None, symbol=None):
+    """
+    Compute features without modifying the data.
+
+    Parameters:
+    data (pd.DataFrame): Historical price data.
+    columns (iterable): Requested feature or data column names.
+    registry (FeatureRegistry): Registry the features are looked up in.
+    cache (FeatureCache): Optional feature cache the features are loaded from and stored in.
+    symbol (str): Symbol of the data, required with `cache`.
+
+    Returns:
+    pd.DataFrame: The requested columns, indexed like `data`.
+    """
+    return registry.compute(data, columns, cache, symbol)
+
+def add_features(data, columns, registry=FEATURES, cache=None, symbol=None):
+    """
+    Compute features and add them to the data as columns.
+
+    Parameters:
+    data (pd.DataFrame): Historical price data.
+    columns (iterable): Requested feature names.
+    registry (FeatureRegistry): Registry the features are looked up in.
+    cache (FeatureCache): Optional feature cache the features are loaded from and stored in.
+    symbol (str): Symbol of the data, required with `cache`.
+
+    Returns:
+    pd.DataFrame: The data with the feature columns added.
+    """
+    features = registry.compute(data, columns, cache, symbol)
+    for column in features.columns:
+        data[column] = features[column]
+    return data
+
+if __name__ == "__main__":
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        data = pd.read_csv(f'data/cleaned_data/{crypto}_cleaned.csv', parse_dates=['Date'], index_col='Date')
+        columns = ['z_score', 'SMA_20', 'RSI'] + [f'Close_Lag{lag}' for lag in range(1, 8)]
+        print(f"Features for {crypto}, computed as {FEATURES.plan(columns, data.columns)}:")
+        print(compute_features(data, columns).tail())
@@ -0,0 +1,477 @@
+"""
+fetcher.py
+
+## Purpose
+The `fetcher.py` file downloads price data for many symbols from several providers at once. Every (symbol, source) pair is a job, the jobs run concurrently on a bounded thread pool, and each provider keeps one pooled keep-alive HTTP session, so connections are reused instead of paying a new TCP and TLS handshake per call. Results are written to `data/historical_data/` as each job completes.
+
+## Importance
+`api_integration.py` and `select_crypto_and_pull_data.py` fetch Coinbase, Alpha Vantage and CryptoCompare one symbol and one call after another:
+1. **Wall-Clock Time**: With the calls running concurrently, refreshing many symbols across three providers takes about as long as the slowest few calls instead of the sum of all of them.
+2. **Connection Reuse**: Each provider's session holds a pool of open connections sized to the number of workers, so repeated calls to one host skip the connection setup.
+3. **Isolation**: A failing provider or symbol is logged and reported in the results without stopping the other jobs, and files are replaced atomically, so a failed call never leaves a truncated file.
+4. **Testability**: Provider base URLs can be overridden (e.g. with `CRYPTOCOMPARE_BASE_URL`), so the whole fetch layer can be exercised against a local stub HTTP server.
+
+## Functionality
+1. **Providers**:
+   - `Provider` holds a provider's base URL, credentials and pooled `requests.Session`; `Provider.get` requests a path below the base URL and returns the response.
+   - Requests go through the provider's shared limiter from `rate_limit.py`, so concurrent jobs stay within the provider's rate and concurrency limits and throttled or failed requests are retried with backoff.
+   - Responses are cached on disk by `http_cache.py`: closed historical ranges are never requested twice, and spot prices and open-ended histories are reused for a short time.
+   - `BASE_URLS` maps each provider to its base URL, read from the `*_BASE_URL` environment variables with the public APIs as defaults.
+
+2. **Sources**:
+   - `fetch_coinbase_spot`, `fetch_alpha_vantage_daily` and `fetch_cryptocompare_daily` fetch one symbol through a provider and return a DataFrame in the layout of the files in `data/historical_data/`. `fetch_cryptocompare_daily` fetches the whole daily history by default, in pages.
+   - `SOURCES` maps each source name to its provider, fetch function and output path.
+
+3. **Concurrent Fetching**:
+   - `fetch_all` runs every (symbol, source) job on a thread pool and saves each result as soon as it arrives, returning the saved path or the error of every job.
+
+4. **Long Ranges**:
+   - `fetch_cryptocompare_range` and `fetch_alpaca_range` fetch any [start, end) range, e.g. a multi-year minute-bar backfill, in one call. `page_ranges` splits the range into provider-sized pages, `fetch_range` fetches the pages concurrently within the rate limits, and the pages are put back in order with duplicate boundary bars removed.
+   - Alpaca pages also follow `next_page_token`, so no bar is dropped when a slice holds more bars than one response.
+
+## Example Usage
+```python
+from scripts.fetcher import fetch_all
+
+results = fetch_all(['BTC', 'ETH', 'SOL'], sources=['coinbase', 'alpha_vantage', 'cryptocompare'])
+for (symbol, source), result in results.items():
+    print(symbol, source, result)
+
+from scripts.fetcher import fetch_cryptocompare_range, make_providers
+
+providers = make_providers()
+hourly = fetch_cryptocompare_range(providers['cryptocompare'], 'BTC', '2018-01-01', '2023-01-01', frequency='1h')
+
+```
+
+The script can also be run from the command line:
+```
+python scripts/fetcher.py --crypto ALL
+```
+
+"""
+
+
+
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+import requests
+from dotenv import load_dotenv
+
+from http_cache import OPEN_RANGE_TTL, REALTIME_TTL, get_cache, historical_ttl
+from rate_limit import get_limiter
+
+# Load environment variables from .env file
+load_dotenv()
+
+COINBASE_API_KEY = os.getenv("COINBASE_API_KEY")
+COINBASE_API_SECRET = os.getenv("COINBASE_API_SECRET")
+ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+CRYPTOCOMPARE_API_KEY = os.getenv("CRYPTOCOMPARE_API_KEY")
+ALPACA_API_KEY = os.getenv("ALPACA_API_KEY")
+ALPACA_SECRET_KEY = os.getenv("ALPACA_SECRET_KEY")
+
+BASE_URLS = {
+    'coinbase': os.getenv("COINBASE_BASE_URL", "https://api.coinbase.com"),
+    'alpha_vantage': os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co"),
+    'cryptocompare': os.getenv("CRYPTOCOMPARE_BASE_URL", "https://min-api.cryptocompare.com"),
+    'alpaca': os.getenv("ALPACA_DATA_BASE_URL", "https://data.alpaca.markets")
+}
+
+# Bars per request: CryptoCompare returns at most 2001 bars per call, Alpaca 10000 per page
+CRYPTOCOMPARE_PAGE_BARS = 2000
+# First bar of CryptoCompare's daily history; it pads earlier bars with zeros
+CRYPTOCOMPARE_HISTORY_START = '2010-07-17'
+ALPACA_PAGE_BARS = 10000
+
+# CryptoCompare endpoint and Alpaca timeframe of each bar frequency
+CRYPTOCOMPARE_ENDPOINTS = {'1D': '/data/v2/histoday', '1h': '/data/v2/histohour', '1min': '/data/v2/histominute'}
+ALPACA_TIMEFRAMES = {'1D': '1Day', '1h': '1Hour', '1min': '1Min'}
+
+BAR_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+# Seconds to wait for a connection and for each read
+REQUEST_TIMEOUT = (5, 30)
+
+logger = logging.getLogger(__name__)
+
+class Provider:
+    """
+    A data provider reached through one pooled keep-alive HTTP session.
+
+    The session is shared by all worker threads. It is only used for GET
+    requests, and its connection pool (from urllib3) is thread-safe.
+
+    Parameters:
+    name (str): Name of the provider (e.g., 'cryptocompare').
+    base_url (str): URL that request paths are appended to.
+    headers (dict): Headers sent with every request (e.g., API keys).
+    params (dict): Query parameters sent with every request (e.g., API keys).
+    pool_size (int): Number of connections kept open to the provider.
+    limiter (RateLimiter): Limiter the requests go through (None to send them unthrottled).
+    cache (ResponseCache): Cache the responses are kept in (None to always send requests).
+    """
+
+    def __init__(self, name, base_url, headers=None, params=None, pool_size=10, limiter=None, cache=None):
+        self.name = name
+        self.limiter = limiter
+        self.cache = cache
+        self.base_url = base_url.rstrip('/')
+        self.params = {key: value for key, value in (params or {}).items() if value is not None}
+        self.session = requests.Session()
+        self.session.headers.update({key: value for key, value in (headers or {}).items() if value is not None})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, path, params=None, ttl=0):
+        """
+        Request a path below the provider's base URL.
+
+        Parameters:
+        path (str): Path of the endpoint (e.g., '/data/v2/histoday').
+        params (dict): Query parameters of the request.
+        ttl (float): Seconds a cached response may be reused; None forever and 0 never.
+
+        Returns:
+        requests.Response: The response, after raising for HTTP error statuses left after retries.
+        """
+        url = self.base_url + path
+        params = {**self.params, **(params or {})}
+        if self.cache is not None and ttl != 0:
+            response = self.cache.get(self.session, url, params, ttl=ttl, limiter=self.limiter, timeout=REQUEST_TIMEOUT)
+        else:
+            def send():
+                return self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+            response = self.limiter.request(send) if self.limiter is not None else send()
+        response.raise_for_status()
+        return response
+
+    def close(self):
+        self.session.close()
+
+def make_providers(base_urls=None, pool_size=10, limiters=None, cache=None):
+    """
+    Create the providers used by `SOURCES`.
+
+    Parameters:
+    base_urls (dict): Base URLs overriding `BASE_URLS`, by provider name.
+    pool_size (int): Connections kept open to each provider.
+    limiters (dict): Rate limiters by provider name, overriding the shared ones from `rate_limit.get_limiter`.
+    cache (ResponseCache): Response cache (defaults to the shared one from `http_cache.get_cache`; False disables caching).
+
+    Returns:
+    dict: Provider name mapped to its `Provider`.
+    """
+    base_urls = {**BASE_URLS, **(base_urls or {})}
+    limiters = {name: (limiters or {}).get(name) or get_limiter(name) for name in BASE_URLS}
+    cache = get_cache() if cache is None else (cache or None)
+    return {
+        'coinbase': Provider('coinbase', base_urls['coinbase'], pool_size=pool_size, limiter=limiters['coinbase'], cache=cache, headers={
+            "CB-ACCESS-KEY": COINBASE_API_KEY,
+            "CB-ACCESS-SIGN": COINBASE_API_SECRET
+        }),
+        'alpha_vantage': Provider('alpha_vantage', base_urls['alpha_vantage'], pool_size=pool_size,
+                                  limiter=limiters['alpha_vantage'], cache=cache, params={"apikey": ALPHA_VANTAGE_API_KEY}),
+        'cryptocompare': Provider('cryptocompare', base_urls['cryptocompare'], pool_size=pool_size,
+                                  limiter=limiters['cryptocompare'], cache=cache, params={"api_key": CRYPTOCOMPARE_API_KEY}),
+        'alpaca': Provider('alpaca', base_urls['alpaca'], pool_size=pool_size, limiter=limiters['alpaca'], cache=cache, headers={
+            "APCA-API-KEY-ID": ALPACA_API_KEY,
+            "APCA-API-SECRET-KEY": ALPACA_SECRET_KEY
+        })
+    }
+
+def fetch_coinbase_spot(provider, symbol):
+    """
+    Fetch the current spot price of a symbol from Coinbase.
+
+    Parameters:
+    provider (Provider): The Coinbase provider.
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+
+    Returns:
+    pd.DataFrame: One row with 'Date' (time of the request) and 'Close'.
+    """
+    payload = provider.get(f"/v2/prices/{symbol}-USD/spot", ttl=REALTIME_TTL).json()
+    if 'data' not in payload or 'amount' not in payload['data']:
+        raise ValueError(f"Coinbase returned no spot price for {symbol}: {payload}")
+    return pd.DataFrame({'Date': [pd.Timestamp.now()], 'Close': [float(payload['data']['amount'])]})
+
+def fetch_alpha_vantage_daily(provider, symbol):
+    """
+    Fetch the daily history of a symbol from Alpha Vantage.
+
+    Parameters:
+    provider (Provider): The Alpha Vantage provider.
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+
+    Returns:
+    pd.DataFrame: 'Date' and Alpha Vantage's price columns ('1. open', ...) with 'Volume', newest bar first.
+    """
+    payload = provider.get("/query", params={
+        "function": "DIGITAL_CURRENCY_DAILY",
+        "symbol": symbol,
+        "market": "USD"
+    }, ttl=OPEN_RANGE_TTL).json()
+    time_series = payload.get('Time Series (Digital Currency Daily)')
+    if not time_series:
+        raise ValueError(f"Alpha Vantage returned no daily data for {symbol}: {payload}")
+    bars = pd.DataFrame.from_dict(time_series, orient='index').rename(columns={'5. volume': 'Volume'})
+    bars.index = pd.to_datetime(bars.index)
+    bars.index.name = 'Date'
+    return bars.sort_index(ascending=False).reset_index()
+
+def fetch_cryptocompare_daily(provider, symbol, start_date=CRYPTOCOMPARE_HISTORY_START, end_date=None):
+    """
+    Fetch daily bars of a symbol from CryptoCompare.
+
+    The range is fetched in pages by `fetch_cryptocompare_range`, so it is
+    not cut off at the 2000 bars one call returns.
+
+    Parameters:
+    provider (Provider): The CryptoCompare provider.
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+    start_date (str): Date of the first bar (defaults to the start of CryptoCompare's daily history).
+    end_date (str): Date of the last bar (defaults to today).
+
+    Returns:
+    pd.DataFrame: 'Date', 'Open', 'High', 'Low', 'Close' and 'Volume' columns, with volume in USD.
+    """
+    end = pd.Timestamp.now(tz='UTC').tz_localize(None).normalize() if end_date is None else pd.Timestamp(end_date).normalize()
+    return fetch_cryptocompare_range(provider, symbol, start_date, end + pd.Timedelta('1D'))
+
+def page_ranges(start, end, frequency, page_bars):
+    """
+    Split a time range into consecutive pages of at most `page_bars` bars.
+
+    Parameters:
+    start (str or pd.Timestamp): Start of the range (inclusive).
+    end (str or pd.Timestamp): End of the range (exclusive).
+    frequency (str): Bar frequency, e.g. '1D', '1h' or '1min'.
+    page_bars (int): Largest number of bars per page.
+
+    Returns:
+    list: (page start, page end) pairs of timestamps covering [start, end), in order.
+    """
+    step = pd.Timedelta(frequency)
+    start = pd.Timestamp(start).floor(step)
+    end = pd.Timestamp(end)
+    if end <= start:
+        raise ValueError(f"Empty range [{start}, {end})")
+    edges = list(pd.date_range(start, end, freq=step * page_bars, inclusive='left')) + [end]
+    return list(zip(edges[:-1], edges[1:]))
+
+def fetch_range(fetch_page, start, end, frequency, page_bars, max_workers=8):
+    """
+    Fetch a time range page by page, concurrently, and reassemble it.
+
+    Pages are independent requests, so they run on a thread pool; the
+    providers' rate limiters keep them within the allowed request rate.
+
+    Parameters:
+    fetch_page (function): Called as `fetch_page(page_start, page_end)`, returns the bars of [page_start, page_end) with a 'Date' column.
+    start (str or pd.Timestamp): Start of the range (inclusive).
+    end (str or pd.Timestamp): End of the range (exclusive).
+    frequency (str): Bar frequency, e.g. '1D', '1h' or '1min'.
+    page_bars (int): Largest number of bars per page.
+    max_workers (int): Pages fetched at once.
+
+    Returns:
+    pd.DataFrame: The bars of [start, end) in date order, one row per date.
+    """
+    pages = page_ranges(start, end, frequency, page_bars)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pages))) as executor:
+        frames = list(executor.map(lambda page: fetch_page(*page), pages))
+
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    bars = pd.concat(frames, ignore_index=True)
+    # Providers may return bars just outside a page or repeat a bar at page boundaries
+    bars = bars[(bars['Date'] >= pd.Timestamp(start)) & (bars['Date'] < pd.Timestamp(end))]
+    bars = bars.sort_values('Date', kind='stable').drop_duplicates('Date', keep='first')
+    return bars.reset_index(drop=True)
+
+def fetch_cryptocompare_range(provider, symbol, start, end, frequency='1D', max_workers=8):
+    """
+    Fetch all CryptoCompare bars of a symbol in a time range, however long.
+
+    Parameters:
+    provider (Provider): The CryptoCompare provider.
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+    start (str or pd.Timestamp): Start of the range (inclusive).
+    end (str or pd.Timestamp): End of the range (exclusive).
+    frequency (str): '1D', '1h' or '1min'.
+    max_workers (int): Pages fetched at once.
+
+    Returns:
+    pd.DataFrame: 'Date', 'Open', 'High', 'Low', 'Close' and 'Volume' columns, with volume in USD.
+    """
+    if frequency not in CRYPTOCOMPARE_ENDPOINTS:
+        raise ValueError(f"Unsupported frequency {frequency}, expected one of {list(CRYPTOCOMPARE_ENDPOINTS)}")
+    step = pd.Timedelta(frequency)
+
+    def fetch_page(page_start, page_end):
+        # Rounded up, so a bar starting before an `end` off the bar grid is included
+        bars_in_page = -(-(page_end - page_start) // step)
+        # A call returns `limit + 1` bars ending with the bar at `toTs`
+        last_bar = page_start + (bars_in_page - 1) * step
+        payload = provider.get(CRYPTOCOMPARE_ENDPOINTS[frequency], params={
+            "fsym": symbol,
+            "tsym": "USD",
+            "toTs": int(last_bar.timestamp()),
+            "limit": max(bars_in_page - 1, 1)
+        }, ttl=historical_ttl(page_end)).json()
+        if payload.get('Response') != 'Success' or not isinstance(payload.get('Data', {}).get('Data'), list):
+            raise ValueError(f"CryptoCompare returned no data for {symbol} up to {last_bar}: {payload.get('Message', payload)}")
+        bars = pd.DataFrame(payload['Data']['Data'])
+        if bars.empty:
+            return bars
+        bars['Date'] = pd.to_datetime(bars['time'], unit='s')
+        bars = bars.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volumeto': 'Volume'})
+        # Bars before a symbol was listed are all zeros
+        return bars.loc[(bars[['Open', 'High', 'Low', 'Close']] != 0).any(axis=1), BAR_COLUMNS]
+
+    return fetch_range(fetch_page, start, end, frequency, CRYPTOCOMPARE_PAGE_BARS, max_workers)
+
+def fetch_alpaca_range(provider, symbol, start, end, frequency='1D', max_workers=4):
+    """
+    Fetch all Alpaca crypto bars of a symbol in a time range, however long.
+
+    The range is split into time slices fetched concurrently, and each slice
+    follows `next_page_token` until Alpaca has returned all of its bars.
+
+    Parameters:
+    provider (Provider): The Alpaca market data provider.
+    symbol (str): Cryptocurrency symbol (e.g., 'BTC').
+    start (str or pd.Timestamp): Start of the range (inclusive).
+    end (str or pd.Timestamp): End of the range (exclusive).
+    frequency (str): '1D', '1h' or '1min'.
+    max_workers (int): Slices fetched at once.
+
+    Returns:
+    pd.DataFrame: 'Date', 'Open', 'High', 'Low', 'Close' and 'Volume' columns, with volume in units of the cryptocurrency.
+    """
+    if frequency not in ALPACA_TIMEFRAMES:
+        raise ValueError(f"Unsupported frequency {frequency}, expected one of {list(ALPACA_TIMEFRAMES)}")
+    pair = f"{symbol}/USD"
+
+    def fetch_page(page_start, page_end):
+        params = {
+            "symbols": pair,
+            "timeframe": ALPACA_TIMEFRAMES[frequency],
+            "start": page_start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "end": page_end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "limit": ALPACA_PAGE_BARS
+        }
+        rows = []
+        while True:
+            payload = provider.get("/v1beta3/crypto/us/bars", params=params, ttl=historical_ttl(page_end)).json()
+            rows.extend((payload.get('bars') or {}).get(pair) or [])
+            token = payload.get('next_page_token')
+            if not token:
+                break
+            params = {**params, "page_token": token}
+        if not rows:
+            return None
+        bars = pd.DataFrame(rows)
+        bars['Date'] = pd.to_datetime(bars['t'], utc=True).dt.tz_localize(None)
+        bars = bars.rename(columns={'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume'})
+        return bars[BAR_COLUMNS]
+
+    return fetch_range(fetch_page, start, end, frequency, ALPACA_PAGE_BARS, max_workers)
+
+# Source name mapped to its provider, fetch function and output path
+SOURCES = {
+    'coinbase': ('coinbase', fetch_coinbase_spot, 'data/historical_data/coinbase/{symbol}_coinbase.csv'),
+    'alpha_vantage': ('alpha_vantage', fetch_alpha_vantage_daily, 'data/historical_data/alpha_vantage/{symbol}_alpha_vantage.csv'),
+    'cryptocompare': ('cryptocompare', fetch_cryptocompare_daily, 'data/historical_data/cryptocompare/{symbol}_cryptocompare_latest.csv')
+}
+
+def save_frame(frame, file_path):
+    """
+    Write a DataFrame to CSV through a temporary file, so the target is never left truncated.
+
+    Parameters:
+    frame (pd.DataFrame): Data to save.
+    file_path (str): Path of the CSV file.
+
+    Returns:
+    str: The path written.
+    """
+    if frame is None or frame.empty:
+        raise ValueError(f"No data to save for {file_path}")
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    temporary = f"{file_path}.{threading.get_ident()}.tmp"
+    frame.to_csv(temporary, index=False)
+    os.replace(temporary, file_path)
+    return file_path
+
+def fetch_all(symbols, sources=tuple(SOURCES), max_workers=16, base_urls=None, providers=None, limiters=None, cache=None, save=save_frame):
+    """
+    Fetch every source for every symbol concurrently and save the results as they arrive.
+
+    Parameters:
+    symbols (list): Cryptocurrency symbols (e.g., ['BTC', 'ETH']).
+    sources (iterable): Names of the sources in `SOURCES` to fetch.
+    max_workers (int): Number of requests in flight at once.
+    base_urls (dict): Base URLs overriding `BASE_URLS`, by provider name (e.g., a local stub server).
+    providers (dict): Providers to use instead of creating new ones; they are left open.
+    limiters (dict): Rate limiters by provider name, overriding the shared ones (e.g., for a stub server).
+    cache (ResponseCache): Response cache (defaults to the shared one; False disables caching).
+    save (function): Called as `save(frame, path)` for each result, in the calling thread.
+
+    Returns:
+    dict: (symbol, source) mapped to the saved path, or to the exception raised by the job.
+    """
+    unknown = [source for source in sources if source not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown sources {unknown}, expected some of {list(SOURCES)}")
+    own_providers = providers is None
+    if own_providers:
+        providers = make_providers(base_urls, pool_size=max_workers, limiters=limiters, cache=cache)
+
+    start = time.perf_counter()
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            jobs = {}
+            for symbol in symbols:
+                for source in sources:
+                    provider_name, fetch, _ = SOURCES[source]
+                    jobs[executor.submit(fetch, providers[provider_name], symbol)] = (symbol, source)
+
+            for future in as_completed(jobs):
+                symbol, source = jobs[future]
+                try:
+                    path = SOURCES[source][2].format(symbol=symbol)
+                    results[(symbol, source)] = save(future.result(), path)
+                    logger.info(f"{symbol} from {source} saved to {path}")
+                except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                    results[(symbol, source)] = e
+                    logger.error(f"Fetching {symbol} from {source} failed: {e}")
+    finally:
+        if own_providers:
+            for provider in providers.values():
+                provider.close()
+
+    failed = sum(isinstance(result, Exception) for result in results.values())
+    logger.info(f"Fetched {len(results) - failed} of {len(results)} jobs in {time.perf_counter() - start:.2f}s")
+    return results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='Fetch cryptocurrency data from all providers concurrently.')
+    parser.add_argument('--crypto', type=str, nargs='+', default=['ALL'], help='Cryptocurrency symbols (e.g., BTC ETH), or ALL for BTC, ETH and SOL.')
+    parser.add_argument('--sources', type=str, nargs='+', default=list(SOURCES), choices=list(SOURCES), help='Sources to fetch.')
+    parser.add_argument('--workers', type=int, default=16, help='Number of requests in flight at once.')
+    args = parser.parse_args()
+
+    symbols = ['BTC', 'ETH', 'SOL'] if args.crypto == ['ALL'] else args.crypto
+    fetch_all(symbols, args.sources, max_workers=args.workers)
@@ -16,6 +16,7 @@ Automated report generation is crucial for several reasons:
    
 2. **Report Generation**:
    - Generates a report in a specified format (e.g., PDF, HTML) that includes key metrics, visualizations, and analysis results.
+   - Performance metrics of the backtest (CAGR, Sharpe and Sortino ratios, maximum drawdown and its duration, hit rate) are computed with `metrics.py`.
    
 3. **Automation**:
    - Automates the entire process, from data collection to report generation, ensuring that the latest information is always included in the reports.
@@ -39,6 +40,8 @@ import matplotlib.pyplot as plt
 from fpdf import FPDF
 import os
 
+from metrics import compute_metrics
+
 def generate_report(crypto):
     try:
         # Paths to required data and results
@@ -92,6 +95,13 @@ def generate_report(crypto):
         pdf.set_font('Arial', '', 12)
         pdf.multi_cell(0, 10, backtest_results.describe().to_string())
 
+        # Performance Metrics
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 10, 'Performance Metrics', 0, 1)
+        pdf.set_font('Arial', '', 12)
+        metrics = compute_metrics(backtest_results[['Portfolio Value']])
+        pdf.multi_cell(0, 10, metrics.T.to_string())
+
         # Prediction Plot
         pdf.set_font('Arial', 'B', 12)
         pdf.cell(0, 10, 'Prediction Plot', 0, 1)
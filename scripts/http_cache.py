@@ -0,0 +1,324 @@
+"""
+http_cache.py
+
+## Purpose
+The `http_cache.py` file keeps provider responses on disk, so a request we have already answered is not sent again. Responses are keyed by the normalised URL and query parameters, with API keys left out. Each entry has a time to live: closed historical ranges never expire, real-time quotes expire after seconds, and expired entries carrying an `ETag` or `Last-Modified` header are revalidated with a conditional request instead of downloaded again.
+
+## Importance
+Re-running `01_data_preparation.ipynb` or the fetch scripts asks CryptoCompare, Alpha Vantage and Yahoo Finance for the same closed date ranges again and again:
+1. **Zero Round Trips on Reruns**: Data we already hold is served from disk without touching the network or the provider's rate limit.
+2. **Fresh Where It Matters**: Quotes and open-ended ranges get short lifetimes, so caching never hides new bars or prices for long.
+3. **Safe Keys**: API keys are removed from cache keys and never written to disk, so entries survive key rotation and can be shared.
+4. **Bounded Disk Use**: The cache evicts the least recently used responses once it grows beyond its size limit, and `stats` reports hits, misses and revalidations.
+
+## Functionality
+1. **Keys and Lifetimes**:
+   - `cache_key` builds the key of a request from its URL and its sorted parameters without `SECRET_PARAMS`.
+   - `historical_ttl` gives the lifetime of a range ending at a date: forever if the range is closed, `OPEN_RANGE_TTL` otherwise. `REALTIME_TTL` is used for quotes.
+
+2. **Cached Requests**:
+   - `ResponseCache.get` returns a stored response while it is fresh, revalidates it when it has expired, or sends the request (through a rate limiter, if given) and stores the response if it holds data.
+   - Stored responses are returned as `requests.Response` objects with `from_cache` set, so callers handle them like live ones.
+
+3. **Eviction**:
+   - Each response is stored as a body file and a `.json` metadata file named by the hash of its key. Every hit refreshes the entry's modification time, and the oldest entries are deleted once the cache grows beyond `max_bytes`.
+   - `get_cache` returns the process-wide cache in `data/http_cache/`.
+
+## Example Usage
+```python
+import requests
+from scripts.http_cache import get_cache, historical_ttl
+
+cache = get_cache()
+params = {'fsym': 'BTC', 'tsym': 'USD', 'toTs': 1672531200, 'limit': 2000, 'api_key': '...'}
+response = cache.get(requests, 'https://min-api.cryptocompare.com/data/v2/histoday', params, ttl=historical_ttl('2023-01-01'))
+print(response.from_cache, cache.stats)
+
+```
+
+"""
+
+
+
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import pandas as pd
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Query parameters holding credentials; they are never part of a cache key
+SECRET_PARAMS = {'api_key', 'apikey', 'key', 'token', 'access_token', 'secret'}
+
+# Lifetimes in seconds; None never expires and 0 disables caching
+REALTIME_TTL = 15
+OPEN_RANGE_TTL = 60 * 60
+
+# Response headers kept with a cached response
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date')
+
+def cache_key(url, params=None):
+    """
+    Normalised key of a GET request.
+
+    Parameters:
+    url (str): URL of the request, possibly with a query string.
+    params (dict): Query parameters of the request.
+
+    Returns:
+    str: Lower-case scheme and host, path, and the sorted query parameters without credentials.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(str(key), str(value)) for key, value in (params or {}).items() if value is not None]
+    query = sorted((key, value) for key, value in query if key.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', urlencode(query), ''))
+
+def historical_ttl(end_date, now=None):
+    """
+    Lifetime of a cached historical range.
+
+    Parameters:
+    end_date (str or pd.Timestamp): Last date of the range, in UTC like the providers' bars (None for an open-ended range).
+    now (pd.Timestamp): Current time (defaults to now).
+
+    Returns:
+    float: None (never expires) if the range ended before today (UTC), otherwise `OPEN_RANGE_TTL`.
+    """
+    if end_date is None:
+        return OPEN_RANGE_TTL
+
+    def utc(timestamp):
+        timestamp = pd.Timestamp(timestamp)
+        return timestamp if timestamp.tzinfo is None else timestamp.tz_convert('UTC').tz_localize(None)
+
+    now = pd.Timestamp.now(tz='UTC') if now is None else now
+    return None if utc(end_date).normalize() < utc(now).normalize() else OPEN_RANGE_TTL
+
+def holds_data(response):
+    """
+    Tell whether a response is worth caching.
+
+    Providers report many errors with status 200, e.g. Alpha Vantage's
+    'Error Message' and 'Note' bodies and CryptoCompare's 'Response': 'Error'.
+    """
+    if response.status_code != 200 or not response.content:
+        return False
+    if not response.content.lstrip().startswith(b'{'):
+        return True
+    try:
+        payload = response.json()
+    except ValueError:
+        return False
+    if not isinstance(payload, dict):
+        return True
+    return not (payload.get('Response') == 'Error' or any(key in payload for key in ('Error Message', 'Note', 'Information')))
+
+class ResponseCache:
+    """
+    On-disk cache of HTTP GET responses.
+
+    Parameters:
+    cache_dir (str): Directory holding the cached responses.
+    max_bytes (int): Size limit of the cache; least recently used responses are evicted beyond it.
+    """
+
+    def __init__(self, cache_dir='data/http_cache', max_bytes=256 * 1024 ** 2):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = self.size()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _paths(self, key):
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + '.body'), os.path.join(self.cache_dir, name + '.json')
+
+    def _read(self, key):
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as file:
+                meta = json.load(file)
+            with open(body_path, 'rb') as file:
+                body = file.read()
+        except (OSError, ValueError):
+            return None, None
+        if meta.get('key') != key:
+            return None, None
+        return meta, body
+
+    def _write(self, key, response, meta=None):
+        body_path, meta_path = self._paths(key)
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        meta = meta or {
+            'key': key,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            'encoding': response.encoding
+        }
+        meta['stored'] = time.time()
+        meta['ttl'] = getattr(response, 'cache_ttl', meta.get('ttl'))
+        if response is not None:
+            with open(body_path + suffix, 'wb') as file:
+                file.write(response.content)
+            os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, 'w') as file:
+            json.dump(meta, file)
+        os.replace(meta_path + suffix, meta_path)
+        return meta
+
+    @staticmethod
+    def _response(meta, body, url):
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = meta.get('encoding')
+        response.url = url
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def get(self, session, url, params=None, headers=None, ttl=None, limiter=None, validate=holds_data, timeout=30):
+        """
+        GET a URL, answering from the cache when possible.
+
+        Parameters:
+        session (requests.Session): Session (or the `requests` module) the request is sent through.
+        url (str): URL of the request.
+        params (dict): Query parameters of the request.
+        headers (dict): Headers of the request; they are not part of the cache key.
+        ttl (float): Seconds the response stays fresh; None never expires and 0 bypasses the cache.
+        limiter (RateLimiter): Rate limiter the request is sent through, if any.
+        validate (function): Called with a live response; only responses it accepts are stored.
+        timeout (float): Request timeout in seconds.
+
+        Returns:
+        requests.Response: The cached or live response; `from_cache` tells which.
+        """
+        def send(extra_headers=None):
+            def request():
+                return session.get(url, params=params, headers={**(headers or {}), **(extra_headers or {})}, timeout=timeout)
+            response = limiter.request(request) if limiter is not None else request()
+            response.from_cache = False
+            return response
+
+        if ttl == 0:
+            return send()
+
+        key = cache_key(url, params)
+        meta, body = self._read(key)
+        if meta is not None:
+            body_path, meta_path = self._paths(key)
+            if meta['ttl'] is None or time.time() - meta['stored'] < meta['ttl']:
+                self._count('hits')
+                os.utime(body_path)
+                os.utime(meta_path)
+                return self._response(meta, body, url)
+
+            conditional = {}
+            if 'ETag' in meta['headers']:
+                conditional['If-None-Match'] = meta['headers']['ETag']
+            if 'Last-Modified' in meta['headers']:
+                conditional['If-Modified-Since'] = meta['headers']['Last-Modified']
+            if conditional:
+                response = send(conditional)
+                if response.status_code == 304:
+                    self._count('revalidated')
+                    meta['ttl'] = ttl
+                    self._write(key, None, meta)
+                    os.utime(body_path)
+                    return self._response(meta, body, url)
+            else:
+                response = send()
+        else:
+            response = send()
+
+        self._count('misses')
+        if validate is None or validate(response):
+            response.cache_ttl = ttl
+            self._write(key, response)
+            self._count('stores')
+            with self._lock:
+                self._size += len(response.content)
+                over = self._size > self.max_bytes
+            if over:
+                self.evict()
+        return response
+
+    def size(self):
+        """
+        Total size of the cached responses in bytes.
+        """
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.is_file())
+
+    def evict(self, max_bytes=None):
+        """
+        Delete the least recently used responses until the cache fits its size limit.
+
+        Parameters:
+        max_bytes (int): Size to shrink to (defaults to the cache's limit).
+
+        Returns:
+        int: Number of responses deleted.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = {}
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(('.body', '.json')):
+                name, _ = os.path.splitext(entry.name)
+                stat = entry.stat()
+                size, used = entries.get(name, (0, 0))
+                entries[name] = (size + stat.st_size, max(used, stat.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        removed = 0
+        for name, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= max_bytes:
+                break
+            for extension in ('.body', '.json'):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name + extension))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+        return removed
+
+    def clear(self):
+        """
+        Delete every cached response.
+        """
+        self.evict(max_bytes=0)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """
+    The process-wide response cache in `data/http_cache/`.
+
+    Returns:
+    ResponseCache: The same cache for every caller in the process.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+if __name__ == "__main__":
+    cache = ResponseCache()
+    print(f"{cache.size() / 1024 ** 2:.1f} MB of cached responses in {cache.cache_dir}")
+    print(cache_key('https://min-api.cryptocompare.com/data/v2/histoday',
+                    {'fsym': 'BTC', 'tsym': 'USD', 'limit': 2000, 'api_key': 'secret'}))
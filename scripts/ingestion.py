@@ -0,0 +1,190 @@
+"""
+ingestion.py
+
+## Purpose
+The `ingestion.py` file is the entry point for price CSV files. Before a file is parsed, its first few kilobytes are checked to confirm it really is a CSV price table. Provider error bodies such as `{"Error Message": ...}`, HTML pages and empty downloads are rejected at once. Files that pass are read in chunks with explicit column types and the load rate is logged.
+
+## Importance
+Bad data should fail where it enters the project, not several notebooks later:
+1. **Fail Fast**: A saved API error message is rejected within milliseconds, with a message saying what the file contains, instead of crashing a notebook much later.
+2. **Predictable Types and Memory**: Prices and volumes are read as float64 (or float32) and dates as datetime64 timestamps, with no type inference. Files are read in fixed-size chunks, so parsing buffers do not grow with the file.
+3. **Visibility**: Every load reports its rows per second, which shows slow storage or pathological files.
+
+## Functionality
+1. **Payload Sniffing**:
+   - `payload_problem` describes why a response body or file header is not a CSV table, or returns None.
+   - `sniff_csv` applies it to the start of a file and returns the header columns, raising `PayloadError` for non-tabular files.
+
+2. **Typed Chunked Reading**:
+   - `iter_price_chunks` yields DataFrames of at most `chunksize` rows with the date column parsed with a fixed format and the OHLCV columns pinned to float dtypes.
+   - `load_price_csv` reads a whole file this way and logs the rows per second.
+
+## Example Usage
+```python
+from scripts.ingestion import PayloadError, load_price_csv
+
+try:
+    data = load_price_csv('data/historical_data/btc_usd.csv')
+except PayloadError as e:
+    print(f"Rejected: {e}")
+
+data = load_price_csv('data/cleaned_data/BTC_cleaned.csv', float_dtype='float32')
+
+```
+
+"""
+
+
+
+import logging
+import time
+import numpy as np
+import pandas as pd
+
+# Bytes read from the start of a file to decide whether it is a CSV table
+SNIFF_BYTES = 4096
+
+DATE_COLUMNS = ('date', 'time', 'timestamp')
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume')
+
+logger = logging.getLogger(__name__)
+
+class PayloadError(ValueError):
+    """
+    Raised when a file or response body is not a usable CSV price table.
+    """
+
+def payload_problem(content):
+    """
+    Describe why a response body or the start of a file is not a CSV table.
+
+    Alpha Vantage answers failed calls with status 200 and a JSON error
+    message, so a successful download alone does not mean the data is usable.
+
+    Parameters:
+    content (bytes): Response body or the first bytes of a file.
+
+    Returns:
+    str: Description of the problem, or None if the content looks like a CSV table.
+    """
+    text = content.lstrip(b'\xef\xbb\xbf').strip()
+    if not text:
+        return "empty payload"
+    if text[:1] in (b'{', b'['):
+        return f"JSON instead of CSV: {text[:200].decode(errors='replace')}"
+    if text[:1] == b'<':
+        return "HTML or XML instead of CSV"
+    lines = text.splitlines()
+    header = lines[0].decode(errors='replace')
+    names = [name.strip().strip('"').lower() for name in header.split(',')]
+    if len(names) < 2 or not any(name in DATE_COLUMNS for name in names):
+        return f"no date column in header: {header[:200]}"
+    if len(lines) < 2:
+        return "no data rows"
+    return None
+
+def sniff_csv(file_path):
+    """
+    Check that a file is a CSV price table before parsing it.
+
+    Parameters:
+    file_path (str): Path to the file.
+
+    Returns:
+    list: Column names of the header.
+    """
+    with open(file_path, 'rb') as file:
+        head = file.read(SNIFF_BYTES)
+    problem = payload_problem(head)
+    if problem:
+        raise PayloadError(f"{file_path} is not a CSV price table: {problem}")
+    header = head.lstrip(b'\xef\xbb\xbf').strip().splitlines()[0].decode()
+    return [name.strip().strip('"') for name in header.split(',')]
+
+def _date_parser(sample):
+    """
+    Function converting a column of date strings like `sample` to timestamps.
+    """
+    sample = sample.strip()
+    if sample.isdigit():
+        return lambda values: pd.to_datetime(values.astype(np.int64), unit='s')
+    date_format = pd.tseries.api.guess_datetime_format(sample)
+    if date_format is None:
+        return lambda values: pd.to_datetime(values, format='mixed')
+    # pandas parses ISO 8601 dates on a faster path than an equivalent strptime format
+    if date_format.startswith('%Y-%m-%d'):
+        date_format = 'ISO8601'
+    return lambda values: pd.to_datetime(values, format=date_format)
+
+def iter_price_chunks(file_path, chunksize=100000, float_dtype='float64', dtype=None, usecols=None):
+    """
+    Read a CSV price file in chunks with explicit column types.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    chunksize (int): Rows per chunk.
+    float_dtype (str): dtype of the price and volume columns, 'float64' or 'float32'.
+    dtype (dict): Additional or overriding column dtypes; other columns are inferred.
+    usecols (list): Columns to read (defaults to all of them).
+
+    Yields:
+    pd.DataFrame: Chunks with the date column as datetime64 and pinned numeric columns.
+    """
+    columns = sniff_csv(file_path)
+    date_column = next(name for name in columns if name.lower() in DATE_COLUMNS)
+    dtypes = {name: float_dtype for name in columns if name in PRICE_COLUMNS}
+    dtypes.update(dtype or {})
+    dtypes[date_column] = str
+
+    parse_dates = None
+    rows = 0
+    reader = pd.read_csv(file_path, dtype=dtypes, usecols=usecols, chunksize=chunksize)
+    while True:
+        try:
+            chunk = next(reader)
+        except StopIteration:
+            return
+        except ValueError as e:
+            raise PayloadError(f"{file_path}: bad value after row {rows}: {e}") from e
+
+        if date_column in chunk.columns:
+            dates = chunk[date_column]
+            if parse_dates is None and len(dates):
+                parse_dates = _date_parser(dates.iloc[0])
+            try:
+                chunk[date_column] = parse_dates(dates) if parse_dates else pd.to_datetime(dates)
+            except (ValueError, TypeError) as e:
+                raise PayloadError(f"{file_path}: bad date after row {rows}: {e}") from e
+        rows += len(chunk)
+        yield chunk
+
+def load_price_csv(file_path, chunksize=100000, float_dtype='float64', dtype=None, usecols=None):
+    """
+    Read a whole CSV price file with explicit column types.
+
+    Parameters:
+    file_path (str): Path to the CSV file.
+    chunksize (int): Rows parsed at a time.
+    float_dtype (str): dtype of the price and volume columns, 'float64' or 'float32'.
+    dtype (dict): Additional or overriding column dtypes; other columns are inferred.
+    usecols (list): Columns to read (defaults to all of them).
+
+    Returns:
+    pd.DataFrame: The file's data.
+    """
+    start = time.perf_counter()
+    chunks = list(iter_price_chunks(file_path, chunksize, float_dtype, dtype, usecols))
+    data = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+    seconds = time.perf_counter() - start
+    logger.info(f"Loaded {len(data)} rows from {file_path} in {seconds:.3f}s "
+                f"({len(data) / max(seconds, 1e-9):,.0f} rows/s)")
+    return data
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for file_path in ['data/cleaned_data/BTC_cleaned.csv', 'data/historical_data/SOL-USD.csv',
+                      'data/historical_data/btc_usd.csv']:
+        try:
+            load_price_csv(file_path)
+        except PayloadError as e:
+            logger.error(e)
@@ -0,0 +1,157 @@
+"""
+metrics.py
+
+## Purpose
+The `metrics.py` file computes the performance metrics of equity curves: CAGR, volatility, Sharpe and Sortino ratios, maximum drawdown and its duration, hit rate and turnover. It works on a 2-D array holding many curves at once (strategies × time, or sweep configurations × time) and computes every metric for all curves in one vectorized pass.
+
+## Importance
+Performance metrics are how strategies are compared and chosen:
+1. **Beyond Summary Statistics**: `backtest_results.describe()` says little about risk; drawdowns, risk-adjusted returns and trading activity do.
+2. **Consistency**: Parameter sweeps, walk-forward optimization and reports all score curves with the same definitions.
+3. **Scale**: Scoring thousands of curves is a handful of array operations rather than a Python loop per curve.
+
+## Functionality
+1. **Metric Arrays**:
+   - `equity_metrics` returns a dict of metric name to a 1-D array with one value per curve.
+
+2. **Metric Tables**:
+   - `compute_metrics` returns the same metrics as a DataFrame with one row per curve.
+
+3. **Exposure**:
+   - `exposure_from_positions` turns positions, prices and portfolio values into the invested fraction of each curve, which is what turnover is measured on.
+
+## Metric Definitions
+- `total_return`: last value / first value - 1.
+- `cagr`: total growth annualised over the length of the curve.
+- `volatility`: standard deviation of per-bar returns, annualised.
+- `sharpe_ratio`: mean over standard deviation of per-bar returns, annualised (zero risk-free rate).
+- `sortino_ratio`: mean per-bar return over downside deviation, annualised.
+- `max_drawdown`: largest fall from a running peak, as a negative fraction.
+- `max_drawdown_duration`: longest stretch of bars spent below a previous peak.
+- `hit_rate`: share of bars with a positive return among bars where the value changed.
+- `turnover`: sum of absolute changes in the invested fraction per year (NaN when no exposure is given).
+
+## Example Usage
+```python
+import pandas as pd
+from scripts.metrics import compute_metrics
+
+curves = pd.DataFrame({
+    strategy: pd.read_csv(f'results/BTC_{strategy}_backtest_results.csv')['Portfolio Value']
+    for strategy in ['example_strategy', 'momentum_strategy', 'mean_reversion_strategy']
+})
+print(compute_metrics(curves))
+
+"""
+
+
+
+import numpy as np
+import pandas as pd
+
+def exposure_from_positions(position, close, portfolio_value):
+    """
+    Fraction of each portfolio held in the asset on every bar.
+
+    Parameters:
+    position (np.ndarray): Units held, one row per curve (or 1-D for a single curve).
+    close (np.ndarray): Close prices, broadcastable against `position`.
+    portfolio_value (np.ndarray): Portfolio values with the same shape as `position`.
+
+    Returns:
+    np.ndarray: Invested fraction with the same shape as `position`.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exposure = np.asarray(position) * np.asarray(close) / np.asarray(portfolio_value)
+    return np.nan_to_num(exposure, nan=0.0, posinf=0.0, neginf=0.0)
+
+def equity_metrics(equity, periods_per_year=365, exposure=None):
+    """
+    Compute performance metrics for many equity curves at once.
+
+    Parameters:
+    equity (np.ndarray): Equity curves, one row per curve and one column per bar. A 1-D array is treated as a single curve.
+    periods_per_year (int): Bars per year, used to annualise metrics.
+    exposure (np.ndarray): Optional invested fraction with the same shape as `equity`, used for turnover.
+
+    Returns:
+    dict: Metric name mapped to an array with one value per curve.
+    """
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    n_curves, n_bars = equity.shape
+    if n_bars < 2:
+        raise ValueError("Equity curves need at least two bars")
+    bars = np.arange(n_bars)
+    first = equity[:, 0]
+    last = equity[:, -1]
+    years = (n_bars - 1) / periods_per_year
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        returns = np.diff(equity, axis=1) / equity[:, :-1]
+        total_return = last / first - 1
+        cagr = np.where(last > 0, (last / first) ** (1 / years) - 1, -1.0)
+
+        mean_return = returns.mean(axis=1)
+        std_return = returns.std(axis=1, ddof=1) if n_bars > 2 else np.full(n_curves, np.nan)
+        downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2, axis=1))
+        sharpe_ratio = np.where(std_return > 0, mean_return / std_return * np.sqrt(periods_per_year), np.nan)
+        sortino_ratio = np.where(downside > 0, mean_return / downside * np.sqrt(periods_per_year), np.nan)
+
+        peak = np.maximum.accumulate(equity, axis=1)
+        max_drawdown = (equity / peak).min(axis=1) - 1
+
+        changed = returns != 0
+        hit_rate = (returns > 0).sum(axis=1) / changed.sum(axis=1)
+
+    # Bars since the last time each curve stood at its running peak
+    last_peak = np.where(equity >= peak, bars, 0)
+    np.maximum.accumulate(last_peak, axis=1, out=last_peak)
+    max_drawdown_duration = (bars - last_peak).max(axis=1)
+
+    if exposure is None:
+        turnover = np.full(n_curves, np.nan)
+    else:
+        exposure = np.atleast_2d(np.asarray(exposure, dtype=np.float64))
+        turnover = (np.abs(exposure[:, 0]) + np.abs(np.diff(exposure, axis=1)).sum(axis=1)) / years
+
+    return {
+        'final_value': last,
+        'total_return': total_return,
+        'cagr': cagr,
+        'volatility': std_return * np.sqrt(periods_per_year),
+        'sharpe_ratio': sharpe_ratio,
+        'sortino_ratio': sortino_ratio,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': max_drawdown_duration,
+        'hit_rate': hit_rate,
+        'turnover': turnover
+    }
+
+def compute_metrics(equity, periods_per_year=365, exposure=None, names=None):
+    """
+    Compute performance metrics for many equity curves as a table.
+
+    Parameters:
+    equity (np.ndarray or pd.DataFrame): Equity curves, one row per curve; a DataFrame is read as one column per curve (the layout of a results file).
+    periods_per_year (int): Bars per year, used to annualise metrics.
+    exposure (np.ndarray or pd.DataFrame): Optional invested fraction in the same layout as `equity`.
+    names (list): Optional curve names used as the index of the result.
+
+    Returns:
+    pd.DataFrame: One row per curve and one column per metric.
+    """
+    if isinstance(equity, pd.DataFrame):
+        names = list(equity.columns) if names is None else names
+        equity = equity.to_numpy(dtype=np.float64).T
+    if isinstance(exposure, pd.DataFrame):
+        exposure = exposure.to_numpy(dtype=np.float64).T
+    return pd.DataFrame(equity_metrics(equity, periods_per_year, exposure), index=names)
+
+if __name__ == "__main__":
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        curves = pd.DataFrame({
+            strategy: pd.read_csv(f'results/{crypto}_{strategy}_backtest_results.csv')['Portfolio Value']
+            for strategy in ['example_strategy', 'momentum_strategy', 'mean_reversion_strategy']
+        })
+        print(f"Performance metrics for {crypto}:")
+        print(compute_metrics(curves))
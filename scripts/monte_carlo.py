@@ -0,0 +1,145 @@
+"""
+monte_carlo.py
+
+## Purpose
+The `monte_carlo.py` file stress tests backtest results. It takes the portfolio value series produced by `run_backtest`, resamples its daily returns into thousands of alternative return paths and measures the final value, maximum drawdown and Sharpe ratio of every path. The spread of these metrics shows how much of a backtest's result is down to the particular order in which returns happened.
+
+## Importance
+A single backtest is one draw from many histories that could have happened:
+1. **Robustness**: Distributions of final value and drawdown show whether a strategy's edge survives when the same returns arrive in a different order.
+2. **Risk Assessment**: Tail quantiles (e.g. the 5th percentile of final value or the worst drawdowns) are a better guide to risk than the single realised path.
+3. **Speed**: All paths of a batch are generated as one 2-D NumPy array and their metrics are computed with array operations, so tens of thousands of paths take seconds. Batches are sized to a memory budget, so the path count is not limited by RAM.
+
+## Functionality
+1. **Resampling Methods**:
+   - `'block'`: circular block bootstrap, drawing blocks of consecutive returns to preserve short-term autocorrelation and volatility clustering.
+   - `'bootstrap'`: independent draws of single returns with replacement.
+   - `'shuffle'`: random permutations of the realised returns, which keep the final value fixed but reorder the path.
+
+2. **Monte Carlo Run**:
+   - `run_monte_carlo` returns one row of metrics per simulated path.
+
+3. **Summary**:
+   - `summarize_monte_carlo` reduces the per-path metrics to a table of quantiles.
+
+## Example Usage
+```python
+import pandas as pd
+from scripts.monte_carlo import run_monte_carlo, summarize_monte_carlo
+
+results = pd.read_csv('results/BTC_example_strategy_backtest_results.csv')
+paths = run_monte_carlo(results['Portfolio Value'], n_paths=10000, method='block', block_size=20, seed=42)
+print(summarize_monte_carlo(paths))
+
+"""
+
+
+
+import numpy as np
+import pandas as pd
+
+RESAMPLING_METHODS = ('block', 'bootstrap', 'shuffle')
+
+def _resample_indices(rng, n_paths, n_periods, method, block_size):
+    """
+    Positions of the realised returns that make up each simulated path.
+    """
+    if method == 'bootstrap':
+        return rng.integers(0, n_periods, size=(n_paths, n_periods))
+    if method == 'shuffle':
+        return rng.permuted(np.broadcast_to(np.arange(n_periods), (n_paths, n_periods)), axis=1)
+    n_blocks = -(-n_periods // block_size)
+    starts = rng.integers(0, n_periods, size=(n_paths, n_blocks, 1))
+    indices = (starts + np.arange(block_size)) % n_periods
+    return indices.reshape(n_paths, n_blocks * block_size)[:, :n_periods]
+
+def _path_metrics(returns, initial_value, periods_per_year):
+    """
+    Final value, maximum drawdown and Sharpe ratio of every row of a return matrix.
+
+    The matrix is overwritten with the growth of each path to save memory.
+    """
+    volatility = returns.std(axis=1, ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe_ratio = np.where(volatility > 0, returns.mean(axis=1) / volatility * np.sqrt(periods_per_year), np.nan)
+
+    growth = returns
+    growth += 1.0
+    np.cumprod(growth, axis=1, out=growth)
+    peak = np.maximum.accumulate(growth, axis=1)
+    np.maximum(peak, 1.0, out=peak)
+    np.divide(growth, peak, out=peak)
+    max_drawdown = peak.min(axis=1) - 1.0
+    return initial_value * growth[:, -1], max_drawdown, sharpe_ratio
+
+def run_monte_carlo(portfolio_value, n_paths=10000, method='block', block_size=20, seed=None,
+                    periods_per_year=365, memory_budget=256 * 1024 ** 2):
+    """
+    Simulate resampled return paths of a backtest and measure each path.
+
+    Parameters:
+    portfolio_value (array-like): Portfolio value series of a backtest, e.g. the 'Portfolio Value' column of `run_backtest` results.
+    n_paths (int): Number of paths to simulate.
+    method (str): Resampling method: 'block', 'bootstrap' or 'shuffle'.
+    block_size (int): Length of the blocks drawn by the block bootstrap.
+    seed (int): Seed of the random number generator, for reproducible runs.
+    periods_per_year (int): Bars per year, used to annualise the Sharpe ratio.
+    memory_budget (int): Approximate number of bytes used for the paths of one batch.
+
+    Returns:
+    pd.DataFrame: One row per path with 'final_value', 'max_drawdown' and 'sharpe_ratio'.
+    """
+    if method not in RESAMPLING_METHODS:
+        raise ValueError(f"Unknown method '{method}'. Choose from {list(RESAMPLING_METHODS)}")
+
+    portfolio_value = np.asarray(portfolio_value, dtype=np.float64)
+    returns = portfolio_value[1:] / portfolio_value[:-1] - 1.0
+    returns = returns[np.isfinite(returns)]
+    n_periods = len(returns)
+    if n_periods < 2:
+        raise ValueError("At least three finite portfolio values are needed")
+    block_size = max(1, min(block_size, n_periods))
+
+    # Index, return and drawdown arrays of a batch take about 24 bytes per path and period
+    batch_size = int(max(1, min(n_paths, memory_budget // (24 * n_periods))))
+    rng = np.random.default_rng(seed)
+    final_value = np.empty(n_paths)
+    max_drawdown = np.empty(n_paths)
+    sharpe_ratio = np.empty(n_paths)
+
+    for start in range(0, n_paths, batch_size):
+        stop = min(start + batch_size, n_paths)
+        indices = _resample_indices(rng, stop - start, n_periods, method, block_size)
+        batch = returns[indices]
+        del indices
+        final_value[start:stop], max_drawdown[start:stop], sharpe_ratio[start:stop] = _path_metrics(
+            batch, portfolio_value[0], periods_per_year
+        )
+
+    return pd.DataFrame({
+        'final_value': final_value,
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': sharpe_ratio
+    })
+
+def summarize_monte_carlo(paths, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Summarize the distribution of Monte Carlo path metrics.
+
+    Parameters:
+    paths (pd.DataFrame): Per-path metrics returned by `run_monte_carlo`.
+    quantiles (tuple): Quantiles to report.
+
+    Returns:
+    pd.DataFrame: Mean and quantiles of each metric.
+    """
+    summary = paths.quantile(list(quantiles))
+    summary.index = [f'{int(q * 100)}%' for q in quantiles]
+    return pd.concat([paths.mean().to_frame('mean').T, summary])
+
+if __name__ == "__main__":
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        results = pd.read_csv(f'results/{crypto}_example_strategy_backtest_results.csv')
+        paths = run_monte_carlo(results['Portfolio Value'], n_paths=10000, seed=42)
+        print(f"Monte Carlo summary for {crypto}:")
+        print(summarize_monte_carlo(paths))
@@ -0,0 +1,281 @@
+"""
+parameter_sweep.py
+
+## Purpose
+The `parameter_sweep.py` file tunes the parameters of our trading strategies. The moving average windows of the crossover strategy, the z-score window and entry levels of the mean reversion strategy and the return threshold of the momentum strategy are swept over grids of candidate values, and every combination is backtested on every selected cryptocurrency in parallel.
+
+## Importance
+Hand-picked parameters such as the 40/100 day moving averages or the ±1 z-score levels are rarely the best choice for every asset:
+1. **Systematic Tuning**: Every combination in a grid is evaluated the same way, instead of re-running `backtesting.py` by hand with edited constants.
+2. **Speed**: Combinations are spread across a process pool and simulated with the vectorized backtest engine, so thousands of runs finish in minutes.
+3. **Memory**: Each symbol's close prices are copied once into shared memory, or mapped straight from the binary price store, and read in place by every worker, rather than being pickled into each task.
+4. **Comparability**: Results come back as one tidy table ranked by a chosen metric, ready for filtering and plotting.
+
+## Functionality
+1. **Strategy Registry**:
+   - `SWEEP_STRATEGIES` maps strategy names to the parameterised signal functions in `backtesting.py`.
+
+2. **Parameter Grids**:
+   - `parameter_grid` expands a dict of candidate values into the list of all parameter combinations.
+
+3. **Shared Price Arrays**:
+   - `share_array` copies a NumPy array into a named shared memory block, and `attach_shared_array` maps it back as a read-only array in a worker process.
+   - Arrays memory-mapped from a price store (see `price_store.open_store`) are not copied; workers map the same file instead.
+
+4. **Sweep Execution**:
+   - `run_parameter_sweep` backtests every (symbol, parameter combination) pair across a process pool and returns the results ranked by the chosen metric.
+   - `load_close_prices` reads the close prices of the cleaned datasets, or maps them from their price stores with `mapped=True`.
+   - `score_equity_curve` computes the metrics reported for each run with `metrics.py`.
+
+## Example Usage
+```python
+from scripts.parameter_sweep import load_close_prices, run_parameter_sweep
+
+prices = load_close_prices(['BTC', 'ETH', 'SOL'])
+results = run_parameter_sweep(
+    prices,
+    'example_strategy',
+    {'short_window': range(10, 60, 5), 'long_window': range(50, 250, 10)},
+    metric='sharpe_ratio',
+    constraint=lambda params: params['short_window'] < params['long_window']
+)
+print(results.head(10))
+
+"""
+
+
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+from multiprocessing import shared_memory
+import os
+import numpy as np
+import pandas as pd
+
+from metrics import equity_metrics, exposure_from_positions
+from price_store import ensure_store, open_store
+from backtesting import (
+    simulate_signals,
+    moving_average_crossover_signals,
+    momentum_signals,
+    mean_reversion_signals
+)
+
+SWEEP_STRATEGIES = {
+    'example_strategy': moving_average_crossover_signals,
+    'momentum_strategy': momentum_signals,
+    'mean_reversion_strategy': mean_reversion_signals
+}
+
+# Shared memory blocks and price arrays attached by each worker process
+_worker_blocks = []
+_worker_prices = {}
+
+def parameter_grid(grid):
+    """
+    Expand a parameter grid into all parameter combinations.
+
+    Parameters:
+    grid (dict): Parameter name mapped to a list of candidate values.
+
+    Returns:
+    list: One dict per combination of parameter values.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def _mapped_file(array):
+    """
+    File and byte offset of an array that views a whole memory-mapped file, else None.
+    """
+    base = array
+    while isinstance(base, np.ndarray) and not isinstance(base.base, mmap.mmap):
+        base = base.base
+    if not isinstance(base, np.memmap) or not array.flags.c_contiguous:
+        return None
+    if array.ctypes.data != base.ctypes.data or array.nbytes != base.nbytes:
+        return None
+    return base.filename, base.offset
+
+def share_array(array):
+    """
+    Make an array available to worker processes without pickling it.
+
+    Arrays that view a whole memory-mapped file (e.g. a column from
+    `price_store.open_store`) are shared by file name and need no block.
+    Anything else is copied into a new named shared memory block; the
+    caller owns the block and must `close()` and `unlink()` it once all
+    workers are done.
+
+    Parameters:
+    array (np.ndarray): Array to share.
+
+    Returns:
+    tuple: The SharedMemory block (None for a mapped file) and a picklable (source, shape, dtype, offset) spec.
+    """
+    mapped = _mapped_file(array)
+    if mapped is not None:
+        filename, offset = mapped
+        return None, (filename, array.shape, array.dtype.str, offset)
+
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block, (block.name, array.shape, array.dtype.str, None)
+
+def attach_shared_array(spec):
+    """
+    Map an array shared by `share_array` as a read-only array.
+
+    Parameters:
+    spec (tuple): The (source, shape, dtype, offset) spec returned by `share_array`.
+
+    Returns:
+    tuple: The SharedMemory block (None for a mapped file) and the array
+    viewing it. Keep the block referenced for as long as the array is in use.
+    """
+    source, shape, dtype, offset = spec
+    if offset is not None:
+        return None, np.memmap(source, dtype=np.dtype(dtype), mode='r', offset=offset, shape=shape)
+    block = shared_memory.SharedMemory(name=source)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return block, array
+
+def load_close_prices(cryptos, data_dir='data/cleaned_data', mapped=False):
+    """
+    Load the close prices of the cleaned datasets.
+
+    Parameters:
+    cryptos (list): Cryptocurrency symbols (e.g., ['BTC', 'ETH']).
+    data_dir (str): Directory holding the `{crypto}_cleaned.csv` files.
+    mapped (bool): Map the prices read-only from each file's price store (built if missing or stale) instead of reading them into memory.
+
+    Returns:
+    dict: Symbol mapped to a float64 array of close prices.
+    """
+    prices = {}
+    for crypto in cryptos:
+        csv_path = os.path.join(data_dir, f'{crypto}_cleaned.csv')
+        if mapped:
+            prices[crypto] = open_store(ensure_store(csv_path), columns=['Close'])['Close']
+        else:
+            data = pd.read_csv(csv_path, usecols=['Date', 'Close'])
+            prices[crypto] = data['Close'].to_numpy(dtype=np.float64)
+    return prices
+
+def _init_worker(specs):
+    """
+    Attach the shared price arrays in a freshly started worker process.
+    """
+    for symbol, spec in specs.items():
+        block, array = attach_shared_array(spec)
+        _worker_blocks.append(block)
+        _worker_prices[symbol] = array
+
+def score_equity_curve(portfolio_value, position, periods_per_year=365, close=None):
+    """
+    Summary metrics for one simulated equity curve.
+
+    Parameters:
+    portfolio_value (np.ndarray): Portfolio value on each bar.
+    position (np.ndarray): Position held on each bar.
+    periods_per_year (int): Bars per year, used to annualise metrics.
+    close (np.ndarray): Close prices, needed to report turnover.
+
+    Returns:
+    dict: The metrics of `metrics.equity_metrics` plus the number of trades.
+    """
+    exposure = None if close is None else exposure_from_positions(position, close, portfolio_value)
+    scores = {name: values[0] for name, values in equity_metrics(portfolio_value, periods_per_year, exposure).items()}
+    invested = position > 0
+    scores['trades'] = int(np.count_nonzero(invested[1:] != invested[:-1]) + invested[0])
+    return scores
+
+def _evaluate(task):
+    """
+    Backtest one (symbol, strategy, parameters) combination inside a worker.
+    """
+    symbol, strategy_name, params, initial_cash, periods_per_year = task
+    close = _worker_prices[symbol]
+    signals = SWEEP_STRATEGIES[strategy_name](close, **params)
+    _, position, portfolio_value = simulate_signals(close, signals, initial_cash)
+    return score_equity_curve(portfolio_value, position, periods_per_year, close)
+
+def run_parameter_sweep(prices, strategy, param_grid, metric='total_return', ascending=False,
+                        constraint=None, initial_cash=10000, periods_per_year=365,
+                        processes=None, chunksize=None):
+    """
+    Backtest every parameter combination of a strategy on every symbol.
+
+    Parameters:
+    prices (dict): Symbol mapped to an array of close prices.
+    strategy (str): Name of a strategy in `SWEEP_STRATEGIES`.
+    param_grid (dict): Parameter name mapped to a list of candidate values.
+    metric (str): Result column to rank by: any metric of `metrics.equity_metrics` (e.g. 'sharpe_ratio', 'cagr', 'max_drawdown') or 'trades'.
+    ascending (bool): Rank smaller metric values first.
+    constraint (function): Optional filter; combinations for which it returns False are skipped.
+    initial_cash (float): Initial amount of cash for each backtest.
+    periods_per_year (int): Bars per year, used to annualise metrics.
+    processes (int): Number of worker processes (defaults to the CPU count).
+    chunksize (int): Tasks sent to a worker at a time (chosen automatically if omitted).
+
+    Returns:
+    pd.DataFrame: One row per (symbol, combination) with the parameters, the
+    metrics and the rank of the combination within its symbol, sorted by the
+    chosen metric.
+    """
+    if strategy not in SWEEP_STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {list(SWEEP_STRATEGIES)}")
+
+    combinations = parameter_grid(param_grid)
+    if constraint is not None:
+        combinations = [params for params in combinations if constraint(params)]
+    tasks = [
+        (symbol, strategy, params, initial_cash, periods_per_year)
+        for symbol in prices
+        for params in combinations
+    ]
+    if not tasks:
+        return pd.DataFrame()
+
+    processes = processes or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (processes * 4))
+
+    blocks = []
+    try:
+        specs = {}
+        for symbol, close in prices.items():
+            block, spec = share_array(np.asarray(close, dtype=np.float64))
+            if block is not None:
+                blocks.append(block)
+            specs[symbol] = spec
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(specs,)) as executor:
+            scores = list(executor.map(_evaluate, tasks, chunksize=chunksize))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    results = pd.DataFrame([
+        {'symbol': symbol, 'strategy': strategy_name, **params, **score}
+        for (symbol, strategy_name, params, _, _), score in zip(tasks, scores)
+    ])
+    results['rank'] = results.groupby('symbol')[metric].rank(ascending=ascending, method='min', na_option='bottom').astype(int)
+    return results.sort_values(metric, ascending=ascending, ignore_index=True)
+
+if __name__ == "__main__":
+    prices = load_close_prices(['BTC', 'ETH', 'SOL'], mapped=True)
+    results = run_parameter_sweep(
+        prices,
+        'example_strategy',
+        {'short_window': range(10, 60, 5), 'long_window': range(50, 250, 10)},
+        metric='sharpe_ratio',
+        constraint=lambda params: params['short_window'] < params['long_window']
+    )
+    results.to_csv('results/parameter_sweep_results.csv', index=False)
+    print(results.head(10))
@@ -0,0 +1,200 @@
+"""
+portfolio_backtesting.py
+
+## Purpose
+The `portfolio_backtesting.py` file backtests a trading strategy across several cryptocurrencies at once. Where `backtesting.py` simulates one instrument at a time, this script puts BTC, ETH, SOL (or any other set of symbols) onto a single calendar and tracks one shared pool of cash together with a position in every asset.
+
+## Importance
+Evaluating the universe as one portfolio matters because:
+1. **Allocation**: Capital is split between assets by target weights, so different allocations can be compared directly.
+2. **Aligned Calendars**: Our datasets cover different date ranges (SOL starts years after BTC). Aligning them onto one index means each asset only takes part once it actually has prices.
+3. **Efficiency**: Per-asset signals are applied to the whole price matrix in one vectorized pass instead of N separate backtests stitched together afterwards.
+
+## Functionality
+1. **Calendar Alignment**:
+   - `align_prices` joins the close prices of every symbol onto one sorted date index. Missing bars after an asset's first price are forward filled, and bars before it are left empty.
+
+2. **Signal Generation**:
+   - `generate_portfolio_signals` runs a strategy (columnar or row-wise) on each asset's own history and aligns the resulting signals onto the common index, holding wherever an asset has no data.
+
+3. **Portfolio Backtest**:
+   - `run_portfolio_backtest` applies the all-in/all-out rules of `run_backtest` to every asset at once. An asset that is "in" holds its target weight of the portfolio, an asset that is "out" leaves its share in cash.
+   - The portfolio is rebalanced back to the target weights whenever any asset enters or leaves the market, and optionally every `rebalance_every` bars in between.
+
+## Example Usage
+```python
+import pandas as pd
+from scripts.backtesting import add_strategy_columns, example_strategy_columnar
+from scripts.portfolio_backtesting import align_prices, generate_portfolio_signals, run_portfolio_backtest
+
+crypto_data = {
+    crypto: add_strategy_columns(pd.read_csv(f'data/cleaned_data/{crypto}_cleaned.csv', parse_dates=['Date'], index_col='Date'))
+    for crypto in ['BTC', 'ETH', 'SOL']
+}
+prices = align_prices(crypto_data)
+signals = generate_portfolio_signals(crypto_data, example_strategy_columnar, prices.index)
+results = run_portfolio_backtest(prices, signals, weights={'BTC': 0.5, 'ETH': 0.3, 'SOL': 0.2}, rebalance_every=30)
+results.to_csv('results/portfolio_backtest_results.csv', index=False)
+
+"""
+
+
+
+import numpy as np
+import pandas as pd
+
+from backtesting import BUY, HOLD, SELL, generate_signals
+
+def align_prices(price_data):
+    """
+    Align the close prices of several assets onto one date index.
+
+    Non-positive prices (such as the placeholder zero rows in the cleaned SOL
+    data) are treated as missing. Gaps after an asset's first valid price are
+    forward filled; bars before it stay NaN, which marks the asset as not yet
+    tradable.
+
+    Parameters:
+    price_data (dict): Symbol mapped to a DataFrame with a 'Close' column, or a Series of close prices, indexed by date.
+
+    Returns:
+    pd.DataFrame: Close prices with one column per symbol, indexed by date.
+    """
+    columns = {}
+    for symbol, data in price_data.items():
+        close = data['Close'] if isinstance(data, pd.DataFrame) else data
+        close = close[~close.index.duplicated(keep='last')].astype(np.float64)
+        columns[symbol] = close.where(close > 0)
+    prices = pd.DataFrame(columns).sort_index()
+    return prices.ffill()
+
+def generate_portfolio_signals(price_data, strategy, index):
+    """
+    Generate per-asset signals and align them onto a common index.
+
+    Each asset's signals are computed on its own history, so indicators are
+    never polluted by the gaps of the aligned calendar.
+
+    Parameters:
+    price_data (dict): Symbol mapped to a DataFrame of that asset's price and indicator data.
+    strategy (function): Columnar or row-wise trading strategy function.
+    index (pd.Index): Common date index, usually `align_prices(price_data).index`.
+
+    Returns:
+    pd.DataFrame: int8 signal codes with one column per symbol; 'hold' where an asset has no data.
+    """
+    signals = {}
+    for symbol, data in price_data.items():
+        codes = pd.Series(generate_signals(data, strategy), index=data.index)
+        codes = codes[~codes.index.duplicated(keep='last')]
+        signals[symbol] = codes.reindex(index, fill_value=HOLD).astype(np.int8)
+    return pd.DataFrame(signals, index=index)
+
+def run_portfolio_backtest(prices, signals, weights=None, initial_cash=10000, rebalance_every=None, normalize=False):
+    """
+    Run a backtest over several assets sharing one pool of cash.
+
+    Each asset is either in the market or out of it, following the last buy
+    or sell signal for that asset. On every rebalance bar the portfolio value
+    is redistributed so that each asset in the market holds its target weight
+    and the rest is held as cash; positions are then left to drift with
+    prices until the next rebalance. Rebalancing happens on the first bar,
+    whenever an asset enters or leaves the market and, if `rebalance_every`
+    is set, every `rebalance_every` bars.
+
+    Because the positions are fixed between rebalances, the portfolio value
+    only needs to be carried forward from one rebalance to the next, so the
+    whole simulation is a handful of array operations over the price matrix.
+
+    Parameters:
+    prices (pd.DataFrame): Close prices, one column per symbol (see `align_prices`). NaN marks bars where an asset cannot be traded.
+    signals (pd.DataFrame or np.ndarray): Signal codes or labels with the same shape and column order as `prices`.
+    weights (dict): Symbol mapped to its target weight. Defaults to equal weights; weights must sum to at most 1.
+    initial_cash (float): Initial amount of cash for backtesting.
+    rebalance_every (int): Also rebalance every this many bars.
+    normalize (bool): Spread the full target weight over the assets currently in the market instead of holding the weight of assets that are out in cash.
+
+    Returns:
+    pd.DataFrame: DataFrame with the date, cash, the position in each asset and the portfolio value.
+    """
+    symbols = list(prices.columns)
+    price_matrix = prices.to_numpy(dtype=np.float64)
+    n_bars, n_assets = price_matrix.shape
+    if isinstance(signals, pd.DataFrame):
+        signals = signals[symbols].to_numpy()
+    signals = np.asarray(signals)
+    if signals.dtype.kind in 'OUS':
+        signals = np.where(signals == 'buy', BUY, np.where(signals == 'sell', SELL, HOLD))
+    signals = np.sign(signals).astype(np.int8)
+    if signals.shape != price_matrix.shape:
+        raise ValueError("signals must have one entry per bar and asset")
+
+    if weights is None:
+        target = np.full(n_assets, 1.0 / n_assets)
+    else:
+        target = np.array([weights.get(symbol, 0.0) for symbol in symbols], dtype=np.float64)
+    if (target < 0).any() or target.sum() > 1 + 1e-12:
+        raise ValueError("weights must be non-negative and sum to at most 1")
+
+    # Invested/flat state per bar and asset: the last non-hold signal wins
+    available = np.isfinite(price_matrix)
+    signals = np.where(available, signals, HOLD)
+    last = np.where(signals != HOLD, np.arange(n_bars)[:, None], -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    last_signal = np.take_along_axis(signals, np.maximum(last, 0), axis=0)
+    in_market = (last >= 0) & (last_signal == BUY) & available
+
+    # Weight held in each asset on every bar
+    active = np.where(in_market, target, 0.0)
+    if normalize:
+        total = active.sum(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            active = np.where(total > 0, active * (target.sum() / total), 0.0)
+
+    rebalance = np.zeros(n_bars, dtype=bool)
+    rebalance[0] = True
+    rebalance[1:] = (active[1:] != active[:-1]).any(axis=1)
+    if rebalance_every:
+        rebalance[::rebalance_every] = True
+    starts = np.flatnonzero(rebalance)
+    segment = np.cumsum(rebalance) - 1
+
+    # Growth of a rebalanced portfolio relative to its value at the last rebalance
+    segment_weights = active[starts]
+    segment_prices = np.where(segment_weights > 0, price_matrix[starts], 1.0)
+
+    def growth(bars, segments):
+        weights_held = segment_weights[segments]
+        with np.errstate(invalid='ignore'):
+            relative = np.where(weights_held > 0, price_matrix[bars] / segment_prices[segments], 0.0)
+        return 1.0 - weights_held.sum(axis=1) + (weights_held * relative).sum(axis=1)
+
+    segment_values = np.empty(len(starts))
+    segment_values[0] = initial_cash
+    segment_values[1:] = growth(starts[1:], np.arange(len(starts) - 1))
+    np.multiply.accumulate(segment_values, out=segment_values)
+
+    portfolio_value = segment_values[segment] * growth(np.arange(n_bars), segment)
+    units = segment_weights * segment_values[:, None] / segment_prices
+    positions = units[segment]
+    cash = segment_values[segment] * (1.0 - segment_weights.sum(axis=1)[segment])
+
+    results = {'Date': prices.index, 'Cash': cash}
+    for column, symbol in enumerate(symbols):
+        results[f'{symbol} Position'] = positions[:, column]
+    results['Portfolio Value'] = portfolio_value
+    return pd.DataFrame(results)
+
+if __name__ == "__main__":
+    from backtesting import add_strategy_columns, example_strategy_columnar
+
+    crypto_data = {}
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        data = pd.read_csv(f'data/cleaned_data/{crypto}_cleaned.csv', parse_dates=['Date'], index_col='Date')
+        crypto_data[crypto] = add_strategy_columns(data)
+
+    prices = align_prices(crypto_data)
+    signals = generate_portfolio_signals(crypto_data, example_strategy_columnar, prices.index)
+    results = run_portfolio_backtest(prices, signals, rebalance_every=30)
+    results.to_csv('results/portfolio_backtest_results.csv', index=False)
+    print(results.tail())
@@ -0,0 +1,223 @@
+"""
+price_store.py
+
+## Purpose
+The `price_store.py` file keeps binary, columnar copies of our price CSV files. A store is a directory next to the CSV (`BTC_cleaned.csv` → `BTC_cleaned.store/`) holding one NumPy `.npy` file per column, with dates as int64 timestamps, and a `meta.json` file describing the columns and the CSV the store was built from.
+
+## Importance
+Loading text CSVs is slow, and parsing date strings such as `2013-07-10 00:00:00.000000` takes most of that time:
+1. **Fast Loads**: Reading a store is a handful of binary reads with no parsing, so multi-million-row histories load in milliseconds instead of seconds.
+2. **Transparent**: `utils.load_data` uses a store when it is up to date with its CSV and falls back to the CSV otherwise, so callers do not change.
+3. **Safe**: A store records the size and modification time of its CSV; once the CSV changes the store is ignored until it is rebuilt.
+
+## Functionality
+1. **Conversion**:
+   - `convert_csv` builds a store from a CSV with a 'Date' column and numeric price and volume columns, optionally storing them as float32 to halve the size.
+
+2. **Freshness**:
+   - `store_path` gives the store directory of a CSV file, and `is_fresh` tells whether the store matches the CSV's current contents.
+
+3. **Loading**:
+   - `load_store` reads a store back into a DataFrame laid out like `ingestion.load_price_csv(file_path)`.
+
+4. **Memory-Mapped Columns**:
+   - `open_store` maps the columns of a store as read-only NumPy arrays without reading them. Every process that maps the same store shares one copy of it in the operating system's page cache, so worker pools do not each hold a private copy of the prices.
+   - `ensure_store` builds or refreshes the store of a CSV only when needed and returns its directory.
+
+## Example Usage
+```python
+from scripts.price_store import convert_csv
+from scripts.utils import load_data
+
+for crypto in ['BTC', 'ETH', 'SOL']:
+    convert_csv(f'data/cleaned_data/{crypto}_cleaned.csv')
+
+# Served from data/cleaned_data/BTC_cleaned.store/ while the CSV is unchanged
+data = load_data('data/cleaned_data/BTC_cleaned.csv')
+
+# Zero-copy, read-only views, e.g. inside worker processes
+from scripts.price_store import ensure_store, open_store
+close = open_store(ensure_store('data/cleaned_data/BTC_cleaned.csv'))['Close']
+
+"""
+
+
+
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from ingestion import load_price_csv
+
+STORE_VERSION = 1
+
+def store_path(csv_path):
+    """
+    Directory of the binary store belonging to a CSV file.
+
+    Parameters:
+    csv_path (str): Path to the CSV file.
+
+    Returns:
+    str: Path of the store directory.
+    """
+    return os.path.splitext(csv_path)[0] + '.store'
+
+def _source_signature(csv_path):
+    """
+    Size and modification time identifying the current contents of a CSV file.
+    """
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def _read_meta(store_dir):
+    try:
+        with open(os.path.join(store_dir, 'meta.json')) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def convert_csv(csv_path, store_dir=None, float_dtype='float64'):
+    """
+    Build the binary columnar store of a price CSV file.
+
+    Parameters:
+    csv_path (str): Path to a CSV file with a 'Date' column and numeric columns.
+    store_dir (str): Directory of the store (defaults to `store_path(csv_path)`); it is replaced if it exists.
+    float_dtype (str): 'float64', or 'float32' to store prices and volumes at half the size.
+
+    Returns:
+    str: Path of the store directory.
+    """
+    store_dir = store_dir or store_path(csv_path)
+    signature = _source_signature(csv_path)
+    data = load_price_csv(csv_path)
+
+    non_numeric = [column for column in data.columns
+                   if column != 'Date' and not pd.api.types.is_numeric_dtype(data[column])]
+    if non_numeric:
+        raise ValueError(f"Only numeric columns can be stored, got {non_numeric}")
+
+    # Columns are written to a temporary directory first, so a failed conversion never leaves a partial store
+    temporary = store_dir + '.tmp'
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+
+    columns = []
+    for column in data.columns:
+        values = data[column].to_numpy()
+        if column == 'Date':
+            dtype = str(values.dtype)
+            values = values.view(np.int64)
+        else:
+            dtype = float_dtype if values.dtype.kind == 'f' else str(values.dtype)
+            values = values.astype(dtype, copy=False)
+        np.save(os.path.join(temporary, f'{len(columns)}.npy'), values)
+        columns.append({'name': column, 'file': f'{len(columns)}.npy', 'dtype': dtype})
+
+    with open(os.path.join(temporary, 'meta.json'), 'w') as file:
+        json.dump({
+            'version': STORE_VERSION,
+            'source': os.path.basename(csv_path),
+            'source_signature': signature,
+            'rows': len(data),
+            'columns': columns
+        }, file, indent=2)
+
+    shutil.rmtree(store_dir, ignore_errors=True)
+    os.replace(temporary, store_dir)
+    return store_dir
+
+def is_fresh(csv_path, store_dir=None):
+    """
+    Tell whether a store exists and was built from the CSV file's current contents.
+
+    Parameters:
+    csv_path (str): Path to the CSV file.
+    store_dir (str): Directory of the store (defaults to `store_path(csv_path)`).
+
+    Returns:
+    bool: True if the store can be used in place of the CSV.
+    """
+    meta = _read_meta(store_dir or store_path(csv_path))
+    if meta is None or meta.get('version') != STORE_VERSION:
+        return False
+    try:
+        return meta['source_signature'] == _source_signature(csv_path)
+    except OSError:
+        return False
+
+def load_store(store_dir, columns=None):
+    """
+    Read a binary store into a DataFrame.
+
+    Parameters:
+    store_dir (str): Directory of the store.
+    columns (list): Columns to read (defaults to all of them).
+
+    Returns:
+    pd.DataFrame: The stored data, with 'Date' as a datetime column, as returned by `ingestion.load_price_csv`.
+    """
+    meta = _read_meta(store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No price store found at {store_dir}")
+
+    data = {}
+    for column in meta['columns']:
+        if columns is not None and column['name'] not in columns:
+            continue
+        values = np.load(os.path.join(store_dir, column['file']))
+        if column['name'] == 'Date':
+            values = values.view(column['dtype'])
+        data[column['name']] = values
+    return pd.DataFrame(data, copy=False)
+
+def ensure_store(csv_path, float_dtype='float64'):
+    """
+    Build the store of a CSV file unless an up-to-date one exists.
+
+    Parameters:
+    csv_path (str): Path to the CSV file.
+    float_dtype (str): Float dtype used if the store has to be built.
+
+    Returns:
+    str: Path of the store directory.
+    """
+    if not is_fresh(csv_path):
+        convert_csv(csv_path, float_dtype=float_dtype)
+    return store_path(csv_path)
+
+def open_store(store_dir, columns=None):
+    """
+    Memory-map the columns of a store as read-only arrays.
+
+    Nothing is read up front; pages are loaded on first access and shared
+    with every other process mapping the same files.
+
+    Parameters:
+    store_dir (str): Directory of the store.
+    columns (list): Columns to map (defaults to all of them).
+
+    Returns:
+    dict: Column name mapped to a read-only array ('Date' as datetime64).
+    """
+    meta = _read_meta(store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No price store found at {store_dir}")
+
+    arrays = {}
+    for column in meta['columns']:
+        if columns is not None and column['name'] not in columns:
+            continue
+        values = np.load(os.path.join(store_dir, column['file']), mmap_mode='r')
+        if column['name'] == 'Date':
+            values = values.view(column['dtype'])
+        arrays[column['name']] = values
+    return arrays
+
+if __name__ == "__main__":
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        csv_path = f'data/cleaned_data/{crypto}_cleaned.csv'
+        print(f"Built {convert_csv(csv_path)} from {csv_path}")
@@ -0,0 +1,543 @@
+"""
+quote_stream.py
+
+## Purpose
+The `quote_stream.py` file turns live trade and quote streams into OHLCV bars. A long-lived `StreamingClient` reads messages from a pluggable transport (a websocket, a chunked HTTP stream, or a recorded file replayed for tests), parses them into ticks and feeds them to a `BarAggregator`. The aggregator builds 1-minute, 5-minute and 1-hour bars at once, keeps the most recent completed bars in fixed-size ring buffers and passes every completed bar to its subscribers.
+
+## Importance
+`fetch_real_time_data` returns one snapshot per call, so "live" data used to mean polling in a loop and missing every trade between polls:
+1. **Every Tick Counts**: Bars are built from the full stream of trades, so highs, lows and volumes are exact instead of sampled.
+2. **Low Latency**: A bar is emitted as soon as its interval is over, on the first later tick or on the client's clock, without waiting for a polling interval.
+3. **Bounded Memory**: Each symbol and frequency keeps one open bar and a ring buffer of completed bars, however long the stream runs.
+4. **Testable**: The replay transport plays recorded messages through the same code path as a live connection, so the whole pipeline can be tested offline and deterministically.
+
+## Functionality
+1. **Transports**:
+   - `WebSocketTransport` connects to a websocket feed (e.g. Coinbase or Alpaca) and sends subscription messages; it needs the `websocket-client` package.
+   - `ChunkedHTTPTransport` reads newline-delimited JSON from a streaming HTTP response.
+   - `ReplayTransport` plays messages from a list or a JSON-lines file, e.g. one written by `record_messages`.
+
+2. **Parsing**:
+   - `parse_coinbase` and `parse_alpaca` turn provider messages into `(symbol, timestamp in ns, price, size)` ticks; heartbeats and other messages give no ticks.
+
+3. **Bar Aggregation**:
+   - `BarAggregator.update` adds a tick and returns the bars it completes, and `BarAggregator.flush` closes the bars whose interval has ended by a given time.
+   - `BarAggregator.subscribe` registers a callback for completed bars, optionally for one symbol and frequency, and `BarAggregator.bars` returns the buffered bars as a DataFrame.
+   - `RingBuffer` holds the completed bars of one symbol and frequency in preallocated arrays.
+
+4. **Client**:
+   - `StreamingClient.run` reads the transport, reconnecting with backoff when the connection drops, and `StreamingClient.iter_bars` yields completed bars, e.g. into `streaming_backtest.stream_backtest`.
+
+## Example Usage
+```python
+from scripts.backtesting import example_strategy
+from scripts.quote_stream import COINBASE_WEBSOCKET_URL, BarAggregator, StreamingClient, WebSocketTransport, coinbase_subscription, parse_coinbase
+from scripts.streaming_backtest import stream_backtest
+
+transport = WebSocketTransport(COINBASE_WEBSOCKET_URL, [coinbase_subscription(['BTC-USD'])])
+client = StreamingClient(transport, parse_coinbase, BarAggregator(frequencies=('1min', '5min', '1h')))
+client.aggregator.subscribe(lambda bar: print(bar), frequency='1min')
+
+for state in stream_backtest(client.iter_bars('BTC-USD', '1min'), example_strategy):
+    print(state['Date'], state['Signal'], state['Portfolio Value'])
+
+```
+
+"""
+
+
+
+import json
+import logging
+import queue
+import threading
+import time
+import numpy as np
+import pandas as pd
+import requests
+
+from rate_limit import RetryPolicy
+
+COINBASE_WEBSOCKET_URL = "wss://ws-feed.exchange.coinbase.com"
+ALPACA_CRYPTO_STREAM_URL = "wss://stream.data.alpaca.markets/v1beta3/crypto/us"
+
+BAR_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Trades']
+
+logger = logging.getLogger(__name__)
+
+class WebSocketTransport:
+    """
+    Messages from a websocket feed.
+
+    Parameters:
+    url (str): URL of the feed.
+    subscriptions (list): Messages (dicts) sent after connecting, e.g. subscriptions or authentication.
+    timeout (float): Seconds without a message after which the connection is considered dead.
+    """
+
+    def __init__(self, url, subscriptions=(), timeout=30):
+        try:
+            import websocket
+        except ImportError as e:
+            raise ImportError("WebSocketTransport needs the websocket-client package: pip install websocket-client") from e
+        self._websocket = websocket
+        self.url = url
+        self.subscriptions = list(subscriptions)
+        self.timeout = timeout
+        self._connection = None
+
+    def messages(self):
+        """
+        Connect and yield the decoded messages until the connection closes.
+
+        Yields:
+        object: Each message decoded from JSON.
+        """
+        try:
+            self._connection = self._websocket.create_connection(self.url, timeout=self.timeout)
+            for subscription in self.subscriptions:
+                self._connection.send(json.dumps(subscription))
+            while True:
+                text = self._connection.recv()
+                if not text:
+                    return
+                yield json.loads(text)
+        except self._websocket.WebSocketException as e:
+            # Reported as a connection error, so the client reconnects
+            raise ConnectionError(f"Websocket {self.url} failed: {e}") from e
+        finally:
+            self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+class ChunkedHTTPTransport:
+    """
+    Messages from a streaming HTTP response of newline-delimited JSON.
+
+    Parameters:
+    url (str): URL of the stream.
+    params (dict): Query parameters of the request.
+    headers (dict): Headers of the request (e.g., API keys).
+    timeout (float): Seconds without data after which the connection is considered dead.
+    """
+
+    def __init__(self, url, params=None, headers=None, timeout=30):
+        self.url = url
+        self.params = params
+        self.headers = headers
+        self.timeout = timeout
+        self._response = None
+
+    def messages(self):
+        """
+        Open the stream and yield the decoded messages until it ends.
+
+        Yields:
+        object: Each non-empty line decoded from JSON.
+        """
+        self._response = requests.get(self.url, params=self.params, headers=self.headers, stream=True, timeout=(5, self.timeout))
+        try:
+            self._response.raise_for_status()
+            for line in self._response.iter_lines():
+                if line:
+                    yield json.loads(line)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+class ReplayTransport:
+    """
+    Recorded messages played back as if they came from a live feed.
+
+    Parameters:
+    messages (list or str): Messages, or the path of a JSON-lines file holding one message per line.
+    """
+
+    def __init__(self, messages):
+        self.source = messages
+
+    def messages(self):
+        """
+        Yield the recorded messages in order.
+
+        Yields:
+        object: Each recorded message.
+        """
+        if isinstance(self.source, str):
+            with open(self.source) as file:
+                for line in file:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            yield from self.source
+
+    def close(self):
+        pass
+
+def record_messages(transport, file_path, max_messages=None):
+    """
+    Save the messages of a transport to a JSON-lines file for `ReplayTransport`.
+
+    Parameters:
+    transport (object): Transport to read.
+    file_path (str): Path of the file written.
+    max_messages (int): Number of messages to record (None until the transport ends).
+
+    Returns:
+    int: Number of messages recorded.
+    """
+    count = 0
+    with open(file_path, 'w') as file:
+        for message in transport.messages():
+            file.write(json.dumps(message) + '\n')
+            count += 1
+            if max_messages is not None and count >= max_messages:
+                transport.close()
+                break
+    return count
+
+def coinbase_subscription(product_ids):
+    """
+    Coinbase subscription message for the trades of some products (e.g., ['BTC-USD']), with heartbeats.
+    """
+    return {'type': 'subscribe', 'product_ids': list(product_ids), 'channels': ['matches', 'heartbeat']}
+
+def _timestamp_ns(value):
+    """
+    Nanoseconds since the epoch (UTC) of an ISO 8601 time string.
+    """
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp.value
+
+def parse_coinbase(message):
+    """
+    Ticks in a Coinbase websocket message.
+
+    Parameters:
+    message (dict): Message of the 'matches' channel (trades); other messages give no ticks.
+
+    Returns:
+    list: (symbol, timestamp in ns, price, size) tuples.
+    """
+    if not isinstance(message, dict) or message.get('type') not in ('match', 'last_match'):
+        return []
+    return [(message['product_id'], _timestamp_ns(message['time']), float(message['price']), float(message['size']))]
+
+def parse_alpaca(message):
+    """
+    Ticks in an Alpaca market data stream message.
+
+    Parameters:
+    message (list or dict): Message holding trade ('T': 't') events; other events give no ticks.
+
+    Returns:
+    list: (symbol, timestamp in ns, price, size) tuples.
+    """
+    events = message if isinstance(message, list) else [message]
+    return [(event['S'], _timestamp_ns(event['t']), float(event['p']), float(event['s']))
+            for event in events if isinstance(event, dict) and event.get('T') == 't']
+
+class RingBuffer:
+    """
+    Fixed-size buffer of the most recent completed bars of one symbol and frequency.
+
+    Parameters:
+    capacity (int): Number of bars kept; the oldest bar is overwritten when the buffer is full.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.dates = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(BAR_FIELDS)), dtype=np.float64)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, date, values):
+        position = self.count % self.capacity
+        self.dates[position] = date
+        self.values[position] = values
+        self.count += 1
+
+    def to_frame(self):
+        """
+        The buffered bars, oldest first.
+
+        Returns:
+        pd.DataFrame: 'Date', 'Open', 'High', 'Low', 'Close', 'Volume' and 'Trades' columns.
+        """
+        order = np.arange(self.count - len(self), self.count) % self.capacity
+        frame = pd.DataFrame(self.values[order], columns=BAR_FIELDS)
+        frame.insert(0, 'Date', self.dates[order].view('datetime64[ns]'))
+        return frame
+
+class BarAggregator:
+    """
+    Builds OHLCV bars of several frequencies from a stream of ticks.
+
+    Bars are labelled with the start of their interval, like the daily bars
+    in `data/cleaned_data/`. Intervals without ticks produce no bar, and
+    ticks older than the bar currently being built, or inside an interval
+    already completed (e.g. by `flush` before a late tick arrived), are
+    dropped and counted in `stats`.
+
+    Parameters:
+    frequencies (tuple): Bar frequencies, e.g. ('1min', '5min', '1h').
+    capacity (int): Completed bars kept per symbol and frequency.
+    """
+
+    def __init__(self, frequencies=('1min', '5min', '1h'), capacity=1000):
+        self.frequencies = {frequency: pd.Timedelta(frequency).value for frequency in frequencies}
+        self.capacity = capacity
+        # (symbol, frequency) -> [start, open, high, low, close, volume, trades] of the open bar
+        self._open = {}
+        # (symbol, frequency) -> start of the last completed bar
+        self._closed = {}
+        self._buffers = {}
+        self._subscribers = []
+        self.stats = {'ticks': 0, 'late_ticks': 0, 'bars': 0}
+
+    def subscribe(self, callback, symbol=None, frequency=None):
+        """
+        Call a function with every completed bar.
+
+        Parameters:
+        callback (function): Called with each completed bar as a dict.
+        symbol (str): Only bars of this symbol (None for all).
+        frequency (str): Only bars of this frequency (None for all).
+
+        Returns:
+        tuple: Subscription to pass to `unsubscribe`.
+        """
+        subscription = (callback, symbol, frequency)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Stop calling a subscribed function.
+
+        Parameters:
+        subscription (tuple): Value returned by `subscribe`.
+        """
+        self._subscribers.remove(subscription)
+
+    def _close(self, key, bar):
+        symbol, frequency = key
+        if key not in self._buffers:
+            self._buffers[key] = RingBuffer(self.capacity)
+        self._buffers[key].append(bar[0], bar[1:])
+        self._closed[key] = bar[0]
+        self.stats['bars'] += 1
+        completed = {
+            'Symbol': symbol,
+            'Frequency': frequency,
+            'Date': pd.Timestamp(bar[0]),
+            'Open': bar[1], 'High': bar[2], 'Low': bar[3], 'Close': bar[4], 'Volume': bar[5], 'Trades': bar[6]
+        }
+        for callback, wanted_symbol, wanted_frequency in self._subscribers:
+            if wanted_symbol in (None, symbol) and wanted_frequency in (None, frequency):
+                callback(completed)
+        return completed
+
+    def update(self, symbol, timestamp, price, size=0.0):
+        """
+        Add a tick.
+
+        Parameters:
+        symbol (str): Symbol traded (e.g., 'BTC-USD').
+        timestamp (int): Time of the tick in nanoseconds since the epoch (UTC).
+        price (float): Trade price.
+        size (float): Trade size.
+
+        Returns:
+        list: Bars completed by the tick, as dicts.
+        """
+        self.stats['ticks'] += 1
+        completed = []
+        for frequency, step in self.frequencies.items():
+            key = (symbol, frequency)
+            start = timestamp - timestamp % step
+            bar = self._open.get(key)
+            if (bar is not None and start < bar[0]) or start <= self._closed.get(key, start - 1):
+                self.stats['late_ticks'] += 1
+                continue
+            if bar is not None and start > bar[0]:
+                completed.append(self._close(key, bar))
+                bar = None
+            if bar is None:
+                self._open[key] = [start, price, price, price, price, size, 1]
+            else:
+                if price > bar[2]:
+                    bar[2] = price
+                if price < bar[3]:
+                    bar[3] = price
+                bar[4] = price
+                bar[5] += size
+                bar[6] += 1
+        return completed
+
+    def flush(self, until):
+        """
+        Close the open bars whose interval has ended.
+
+        Parameters:
+        until (int): Current time in nanoseconds since the epoch; bars ending at or before it are completed.
+
+        Returns:
+        list: Bars completed, as dicts.
+        """
+        completed = []
+        for key, bar in list(self._open.items()):
+            if bar[0] + self.frequencies[key[1]] <= until:
+                completed.append(self._close(key, bar))
+                del self._open[key]
+        return completed
+
+    def bars(self, symbol, frequency):
+        """
+        Completed bars kept for a symbol and frequency.
+
+        Parameters:
+        symbol (str): Symbol (e.g., 'BTC-USD').
+        frequency (str): One of the aggregator's frequencies.
+
+        Returns:
+        pd.DataFrame: The most recent completed bars, oldest first.
+        """
+        buffer = self._buffers.get((symbol, frequency))
+        if buffer is None:
+            return pd.DataFrame(columns=['Date'] + BAR_FIELDS)
+        return buffer.to_frame()
+
+class StreamingClient:
+    """
+    Long-lived client feeding a transport's ticks into a bar aggregator.
+
+    Parameters:
+    transport (object): Transport with `messages()` and `close()` (WebSocketTransport, ChunkedHTTPTransport or ReplayTransport).
+    parse (function): Turns a message into a list of (symbol, timestamp in ns, price, size) ticks.
+    aggregator (BarAggregator): Aggregator the ticks are fed to (defaults to 1m/5m/1h bars).
+    clock (function): Returns the current time in seconds; when given, bars are also closed on the clock after every message (e.g., on heartbeats), not only by later ticks. Leave None for replays.
+    max_reconnects (int): Reconnections after the connection drops before giving up.
+    retry (RetryPolicy): Backoff between reconnections.
+    """
+
+    def __init__(self, transport, parse, aggregator=None, clock=None, max_reconnects=10, retry=None):
+        self.transport = transport
+        self.parse = parse
+        self.aggregator = aggregator or BarAggregator()
+        self.clock = clock
+        self.max_reconnects = max_reconnects
+        self.retry = retry or RetryPolicy()
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """
+        Stop `run` after the current message.
+        """
+        self._stopped.set()
+        self.transport.close()
+
+    def run(self, max_messages=None):
+        """
+        Read messages until the transport ends, `stop` is called or `max_messages` have been read.
+
+        Parameters:
+        max_messages (int): Number of messages to read (None for no limit).
+
+        Returns:
+        int: Number of messages read.
+        """
+        count = 0
+        attempt = 0
+        while not self._stopped.is_set():
+            try:
+                for message in self.transport.messages():
+                    attempt = 0
+                    for symbol, timestamp, price, size in self.parse(message):
+                        self.aggregator.update(symbol, timestamp, price, size)
+                    if self.clock is not None:
+                        self.aggregator.flush(int(self.clock() * 1e9))
+                    count += 1
+                    if self._stopped.is_set() or (max_messages is not None and count >= max_messages):
+                        self.transport.close()
+                        return count
+                # The transport ended normally (e.g., the end of a replay)
+                return count
+            except (OSError, requests.exceptions.RequestException) as e:
+                if self._stopped.is_set() or attempt >= self.max_reconnects:
+                    raise
+                delay = self.retry.delay(attempt)
+                logger.warning(f"Stream connection lost ({e}), reconnecting in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+        return count
+
+    def iter_bars(self, symbol=None, frequency=None, max_messages=None):
+        """
+        Run the client in a background thread and yield completed bars as they arrive.
+
+        An error that stops the client, e.g. a connection error once
+        reconnections run out, is raised here after the bars completed before it.
+
+        Parameters:
+        symbol (str): Only bars of this symbol (None for all).
+        frequency (str): Only bars of this frequency (None for all).
+        max_messages (int): Number of messages to read (None for no limit).
+
+        Yields:
+        dict: Completed bars with 'Symbol', 'Frequency', 'Date', 'Open', 'High', 'Low', 'Close', 'Volume' and 'Trades'.
+        """
+        # Bounded, so a fast replay waits for a slow consumer instead of queueing every bar
+        bars = queue.Queue(maxsize=self.aggregator.capacity)
+        done = object()
+        errors = []
+        subscription = self.aggregator.subscribe(bars.put, symbol, frequency)
+
+        def run():
+            try:
+                self.run(max_messages)
+            except Exception as e:
+                # Raised again in the consumer, so a failure does not look like the end of the stream
+                errors.append(e)
+            finally:
+                bars.put(done)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                bar = bars.get()
+                if bar is done:
+                    if errors and not self._stopped.is_set():
+                        raise errors[0]
+                    return
+                yield bar
+        finally:
+            self.aggregator.unsubscribe(subscription)
+            self.stop()
+
+if __name__ == "__main__":
+    # Replay a synthetic minute of trades every 10 seconds over three hours
+    start = pd.Timestamp('2024-07-15').value
+    rng = np.random.default_rng(0)
+    prices = 64000 * np.exp(np.cumsum(rng.normal(0, 1e-4, 3 * 360)))
+    messages = [{'type': 'match', 'product_id': 'BTC-USD', 'time': pd.Timestamp(start + i * 10 ** 10).isoformat() + 'Z',
+                 'price': str(price), 'size': '0.01'} for i, price in enumerate(prices)]
+
+    aggregator = BarAggregator(frequencies=('1min', '5min', '1h'))
+    StreamingClient(ReplayTransport(messages), parse_coinbase, aggregator).run()
+    for frequency in ('1min', '5min', '1h'):
+        print(f"{frequency}: {len(aggregator.bars('BTC-USD', frequency))} bars")
+    print(aggregator.bars('BTC-USD', '1h'))
@@ -0,0 +1,280 @@
+"""
+rate_limit.py
+
+## Purpose
+The `rate_limit.py` file throttles and retries the HTTP requests we send to data providers. Each provider has one shared limiter combining a token bucket (the provider's allowed request rate), a cap on requests in flight and a retry policy. The retry policy honours `Retry-After` and otherwise backs off exponentially with random jitter.
+
+## Importance
+Our fetchers used to fire requests as fast as they could and give up on the first error:
+1. **No Throttling Errors**: Requests leave at most at the rate a provider allows, so concurrent fetches run at full allowed speed without tripping 429 responses or Alpha Vantage's "call frequency" notes. Those notes are how error payloads used to end up on disk.
+2. **Recovery**: Rate-limit responses, server errors and dropped connections are retried, waiting as long as the provider asks through `Retry-After`. A throttled response pauses the whole provider, not only the thread that received it.
+3. **No Thundering Herd**: Backoff delays are jittered, so many workers that failed together do not retry together.
+
+## Functionality
+1. **Token Bucket**:
+   - `TokenBucket.acquire` blocks until a request may be sent at the configured rate and burst, and `TokenBucket.pause` holds every caller back, e.g. for the duration of a `Retry-After`.
+
+2. **Retry Policy**:
+   - `RetryPolicy.delay` gives the wait before the next attempt: the `Retry-After` of the response if it has one, otherwise a random delay up to an exponentially growing bound.
+
+3. **Rate Limiter**:
+   - `RateLimiter.request` sends a request through the bucket and the concurrency cap, retries it according to the policy and returns the final response.
+   - `get_limiter` returns the process-wide limiter of a provider, configured from `PROVIDER_LIMITS`, so every module fetching from one provider shares its budget.
+
+## Example Usage
+```python
+import requests
+from scripts.rate_limit import get_limiter
+
+limiter = get_limiter('cryptocompare')
+response = limiter.request(lambda: requests.get('https://min-api.cryptocompare.com/data/price', params={'fsym': 'BTC', 'tsyms': 'USD'}, timeout=30))
+response.raise_for_status()
+print(limiter.stats)
+
+```
+
+"""
+
+
+
+import email.utils
+import logging
+import random
+import threading
+import time
+import requests
+
+logger = logging.getLogger(__name__)
+
+def alpha_vantage_throttled(response):
+    """
+    Tell whether an Alpha Vantage response is a rate-limit note.
+
+    Alpha Vantage answers calls over its limits with status 200 and a JSON
+    'Note' or 'Information' message instead of data.
+    """
+    if response.status_code != 200 or not response.content.lstrip().startswith(b'{'):
+        return False
+    try:
+        payload = response.json()
+    except ValueError:
+        return False
+    message = str(payload.get('Note', '') or payload.get('Information', '')).lower()
+    return 'call frequency' in message or 'rate limit' in message
+
+# Requests per second, burst size and requests in flight allowed per provider.
+# A bucket can admit `burst + rate * window` requests within any window, so
+# that sum is kept within each provider's published limit for its window.
+PROVIDER_LIMITS = {
+    # 5 calls per minute on the free tier
+    'alpha_vantage': {'rate': 4 / 60, 'burst': 1, 'max_concurrent': 1, 'throttled': alpha_vantage_throttled},
+    # 50 calls per second
+    'cryptocompare': {'rate': 25, 'burst': 20, 'max_concurrent': 8},
+    # 10 calls per second for public endpoints
+    'coinbase': {'rate': 5, 'burst': 4, 'max_concurrent': 4},
+    # 200 calls per minute
+    'alpaca': {'rate': 3, 'burst': 10, 'max_concurrent': 4},
+    'yahoo': {'rate': 2, 'burst': 5, 'max_concurrent': 4}
+}
+
+# Used for providers missing from PROVIDER_LIMITS
+DEFAULT_LIMITS = {'rate': 5, 'burst': 5, 'max_concurrent': 4}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: requests are admitted at `rate` per second with bursts of up to `capacity`.
+
+    Parameters:
+    rate (float): Tokens added per second.
+    capacity (float): Maximum number of tokens held, i.e. the largest burst.
+    """
+
+    def __init__(self, rate, capacity):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        # Time the token count refers to; in the future while the bucket is paused
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self):
+        """
+        Take a token, sleeping until one is available.
+
+        Returns:
+        float: Seconds waited.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Tokens are reserved even when the count goes negative, so waiting callers are served in order
+            self._tokens -= 1
+            wait = (self._updated - now) + max(0.0, -self._tokens / self.rate)
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def pause(self, seconds):
+        """
+        Admit no requests for the next `seconds`, and none from the current burst afterwards.
+
+        Parameters:
+        seconds (float): Length of the pause.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + seconds)
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a request.
+
+    Parameters:
+    max_retries (int): Retries after the first attempt.
+    backoff (float): Upper bound in seconds of the first jittered delay; it doubles on every retry.
+    max_backoff (float): Largest delay in seconds, including delays asked for by `Retry-After`.
+    retry_statuses (tuple): HTTP statuses that are retried.
+    """
+
+    def __init__(self, max_retries=5, backoff=1.0, max_backoff=120.0, retry_statuses=(429, 500, 502, 503, 504)):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_statuses = tuple(retry_statuses)
+
+    @staticmethod
+    def retry_after(response):
+        """
+        Seconds asked for by a response's `Retry-After` header, or None.
+        """
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt, response=None):
+        """
+        Seconds to wait before retrying.
+
+        Parameters:
+        attempt (int): Number of the failed attempt, starting at 0.
+        response (requests.Response): The failed response, or None if the request raised.
+
+        Returns:
+        float: Delay before the next attempt.
+        """
+        retry_after = self.retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        # "Full jitter": uniformly random up to the exponential bound
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+class RateLimiter:
+    """
+    Rate limit, concurrency cap and retries for the requests to one provider.
+
+    Parameters:
+    name (str): Name of the provider, used in log messages.
+    rate (float): Requests per second.
+    burst (float): Largest burst of requests.
+    max_concurrent (int): Requests in flight at once.
+    retry (RetryPolicy): Retry policy (defaults to `RetryPolicy()`).
+    throttled (function): Called with a successful response; True marks it as a rate-limit response to retry.
+    """
+
+    def __init__(self, name, rate, burst, max_concurrent, retry=None, throttled=None):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+        self.retry = retry or RetryPolicy()
+        self.throttled = throttled
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'waited': 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def request(self, send):
+        """
+        Send a request within the provider's limits, retrying it when needed.
+
+        Parameters:
+        send (function): Called without arguments to send the request, returns a `requests.Response`.
+
+        Returns:
+        requests.Response: The first successful response, or the last one if retries run out.
+        """
+        attempt = 0
+        while True:
+            self._count('waited', self.bucket.acquire())
+            self._count('requests')
+            with self.semaphore:
+                try:
+                    response = send()
+                    error = None
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    response = None
+                    error = e
+
+            throttled = response is not None and (
+                response.status_code == 429 or (self.throttled is not None and self.throttled(response)))
+            retryable = error is not None or throttled or response.status_code in self.retry.retry_statuses
+            if not retryable:
+                return response
+            if attempt >= self.retry.max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self.retry.delay(attempt, response)
+            if throttled:
+                # Hold back every thread using this provider, not only this one
+                self._count('throttled')
+                self.bucket.pause(delay)
+            reason = error if error is not None else f"status {response.status_code}"
+            logger.warning(f"{self.name}: {reason}, retry {attempt + 1}/{self.retry.max_retries} in {delay:.1f}s")
+            self._count('retries')
+            time.sleep(delay)
+            attempt += 1
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(provider):
+    """
+    The process-wide rate limiter of a provider.
+
+    Parameters:
+    provider (str): Name of the provider (e.g., 'alpha_vantage').
+
+    Returns:
+    RateLimiter: The same limiter for every caller in the process.
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = RateLimiter(provider, **PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS))
+        return _limiters[provider]
+
+if __name__ == "__main__":
+    bucket = TokenBucket(rate=10, capacity=5)
+    start = time.monotonic()
+    for _ in range(25):
+        bucket.acquire()
+    print(f"25 tokens at 10/s with a burst of 5 took {time.monotonic() - start:.2f}s (expected 2.00s)")
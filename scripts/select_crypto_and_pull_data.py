@@ -19,9 +19,13 @@ This script is essential for several reasons:
 2. **Data Fetching**:
    - The script calls the `fetch_data` function from `api_integration.py` to retrieve historical data for the selected cryptocurrency.
    - The fetched data is saved to a CSV file in the `data/historical_data/` folder.
+   - With `--crypto ALL`, the downloads run concurrently over one pooled keep-alive session; `fetcher.py` does the same for every provider.
 
 3. **Error Handling**:
    - The script includes basic error handling to manage invalid user inputs and failed data fetch attempts.
+   - Requests are throttled to Alpha Vantage's rate limit, and rate-limit notes are retried after a backoff (see `rate_limit.py`).
+   - Responses that are not CSV price tables (such as Alpha Vantage's JSON error messages) are rejected, and files are replaced atomically, so existing data is never overwritten by a failed call.
+   - For daily updates of existing histories, `data_refresh.py` appends only the new bars instead of downloading everything again.
 
 ## Example Usage
 ```python
@@ -80,33 +84,59 @@ import os
 import requests
 from dotenv import load_dotenv
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from fetcher import BASE_URLS, Provider
+from http_cache import OPEN_RANGE_TTL, get_cache, holds_data
+from ingestion import payload_problem
+from rate_limit import get_limiter
 
 # Load environment variables from .env file
 load_dotenv()
 
 ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY')
 
-def fetch_data(symbol, output_file):
+def fetch_data(symbol, output_file, session=None):
     """
     Fetch historical data for a given cryptocurrency symbol from Alpha Vantage API and save to CSV.
     
+    The file is only replaced when the response is a CSV table, and is
+    written to a temporary file first, so a failed call never destroys the
+    data already saved.
+    
     Parameters:
     symbol (str): Cryptocurrency symbol (e.g., 'BTC-USD').
     output_file (str): Path to the output CSV file.
+    session (requests.Session): Pooled session to send the request through (a new connection is made if None).
+    
+    Returns:
+    bool: True if the data was saved.
     """
-    url = f"https://www.alphavantage.co/query?function=DIGITAL_CURRENCY_DAILY&symbol={symbol}&market=USD&apikey={ALPHA_VANTAGE_API_KEY}&datatype=csv"
-    response = requests.get(url)
+    url = f"{BASE_URLS['alpha_vantage']}/query?function=DIGITAL_CURRENCY_DAILY&symbol={symbol}&market=USD&apikey={ALPHA_VANTAGE_API_KEY}&datatype=csv"
+    response = get_cache().get(session or requests, url, ttl=OPEN_RANGE_TTL, limiter=get_limiter('alpha_vantage'),
+                               validate=lambda response: holds_data(response) and payload_problem(response.content) is None)
     
-    if response.status_code == 200:
-        with open(output_file, 'wb') as file:
-            file.write(response.content)
-        print(f"Data for {symbol} saved to {output_file}")
-    else:
+    if response.status_code != 200:
         print(f"Failed to fetch data for {symbol}. Status code: {response.status_code}")
+        return False
+
+    problem = payload_problem(response.content)
+    if problem:
+        print(f"Not saving data for {symbol}, keeping {output_file} unchanged: {problem}")
+        return False
+
+    temporary = output_file + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(response.content)
+    os.replace(temporary, output_file)
+    print(f"Data for {symbol} saved to {output_file}")
+    return True
 
 def handle_all():
     """
     Fetch data for all cryptocurrencies and save to respective CSV files.
+    
+    The downloads run concurrently over one pooled keep-alive session.
     """
     crypto_map = {
         "BTC": ("BTC-USD", "data/historical_data/btc_usd.csv"),
@@ -114,9 +144,18 @@ def handle_all():
         "SOL": ("SOL-USD", "data/historical_data/sol_usd.csv")
     }
     
-    for symbol, (api_symbol, output_file) in crypto_map.items():
-        print(f"Fetching data for {api_symbol}...")
-        fetch_data(api_symbol, output_file)
+    provider = Provider('alpha_vantage', BASE_URLS['alpha_vantage'], pool_size=len(crypto_map))
+    with ThreadPoolExecutor(max_workers=len(crypto_map)) as executor:
+        jobs = {}
+        for api_symbol, output_file in crypto_map.values():
+            print(f"Fetching data for {api_symbol}...")
+            jobs[api_symbol] = executor.submit(fetch_data, api_symbol, output_file, provider.session)
+        for api_symbol, job in jobs.items():
+            try:
+                job.result()
+            except requests.exceptions.RequestException as e:
+                print(f"Failed to fetch data for {api_symbol}: {e}")
+    provider.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Fetch cryptocurrency data.')
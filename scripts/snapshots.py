@@ -0,0 +1,299 @@
+"""
+snapshots.py
+
+## Purpose
+The `snapshots.py` file records exactly which data a run used. A snapshot is an immutable, compressed copy of a set of input files (e.g. `data/cleaned_data/*_cleaned.csv`) identified by a hash of their contents. Each run folder in `results/` gets a `manifest.json` naming the snapshot it was computed from, and pipeline stages derive cache keys from the snapshot so work on byte-identical inputs is done once.
+
+## Importance
+`results/` holds many timestamped `*_analysis` folders, but nothing said which version of the data produced them:
+1. **Reproducibility**: A manifest links a run's results to the snapshot of its inputs, and the snapshot can be restored byte for byte at any later time.
+2. **Skipping Unchanged Work**: Indicators, models and reports computed from the same snapshot with the same parameters share a stage key, so a run can look up and reuse an earlier result instead of recomputing it.
+3. **Cheap Storage**: Files are stored gzip-compressed under their content hash, so a file that did not change between snapshots is stored once, and an unchanged file is not even re-hashed unless its size or modification time changed.
+
+## Functionality
+1. **Hashing**:
+   - `file_digest` computes the SHA-256 of a file in blocks; the digests are remembered by size and modification time in `data/snapshots/digests.json`.
+
+2. **Snapshots**:
+   - `create_snapshot` stores the files that are not in the store yet and writes the snapshot's file list to `data/snapshots/<snapshot_id>.json`. The snapshot id is the hash of the file names and their digests, so the same inputs always give the same id.
+   - `load_snapshot` returns a snapshot's file list, `open_snapshot_file` reads one of its files and `restore_snapshot` writes all of them back out.
+   - Files are recorded under relative names, by default their paths relative to the working directory. Absolute names and names leading out through `..` are rejected, so `restore_snapshot` only writes below its target directory.
+
+3. **Manifests and Stage Keys**:
+   - `stage_key` combines a stage name, the snapshot id or upstream stage keys, and the stage parameters into a cache key.
+   - `write_manifest` writes `manifest.json` into a run folder, and `find_run` finds an earlier run folder whose manifest has a given stage key.
+
+## Example Usage
+```python
+import glob
+from scripts.snapshots import create_snapshot, find_run, stage_key, write_manifest
+
+snapshot_id = create_snapshot(sorted(glob.glob('data/cleaned_data/*_cleaned.csv')))
+key = stage_key('analysis', snapshot_id, {'windows': [20, 50]})
+
+run_dir = find_run(key)
+if run_dir is None:
+    run_dir = 'results/20240715_193002_analysis'
+    # ... compute and save the analysis into run_dir ...
+    write_manifest(run_dir, snapshot_id, 'analysis', key, {'windows': [20, 50]})
+
+```
+
+"""
+
+
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+
+SNAPSHOT_DIR = 'data/snapshots'
+
+# Bytes hashed or copied at a time
+BLOCK_SIZE = 1024 ** 2
+
+def _write_json(path, content):
+    """
+    Write a JSON file atomically.
+    """
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(content, file, indent=2, sort_keys=True, default=str)
+    os.replace(temporary, path)
+
+def _read_json(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+def file_digest(file_path, snapshot_dir=SNAPSHOT_DIR):
+    """
+    SHA-256 of a file's contents.
+
+    Digests are remembered together with the file's size and modification
+    time, so an unchanged file is only hashed once.
+
+    Parameters:
+    file_path (str): Path to the file.
+    snapshot_dir (str): Directory of the snapshot store holding the remembered digests.
+
+    Returns:
+    str: Hex digest of the file's contents.
+    """
+    stat = os.stat(file_path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    index_path = os.path.join(snapshot_dir, 'digests.json')
+    index = _read_json(index_path) or {}
+    key = os.path.abspath(file_path)
+    if key in index and index[key]['signature'] == signature:
+        return index[key]['digest']
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    digest = digest.hexdigest()
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    index[key] = {'signature': signature, 'digest': digest}
+    _write_json(index_path, index)
+    return digest
+
+def _object_path(snapshot_dir, digest):
+    return os.path.join(snapshot_dir, 'objects', digest[:2], digest + '.gz')
+
+def _store_object(snapshot_dir, file_path, digest):
+    """
+    Store a compressed copy of a file under its digest, unless it is stored already.
+    """
+    object_path = _object_path(snapshot_dir, digest)
+    if os.path.exists(object_path):
+        return
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    temporary = object_path + '.tmp'
+    with open(file_path, 'rb') as source, gzip.open(temporary, 'wb', compresslevel=6) as target:
+        shutil.copyfileobj(source, target, BLOCK_SIZE)
+    os.replace(temporary, object_path)
+    os.chmod(object_path, 0o444)
+
+def _check_name(name):
+    """
+    Normalised file name of a snapshot, rejecting names that would be restored outside the target directory.
+    """
+    normalised = os.path.normpath(name)
+    if os.path.isabs(normalised) or normalised == '..' or normalised.startswith('..' + os.sep):
+        raise ValueError(f"Snapshot file names must be relative paths inside the snapshot, not {name!r}")
+    return normalised
+
+def create_snapshot(file_paths, snapshot_dir=SNAPSHOT_DIR, names=None, root='.'):
+    """
+    Snapshot a set of files.
+
+    Parameters:
+    file_paths (list): Paths of the files to include.
+    snapshot_dir (str): Directory of the snapshot store.
+    names (list): Relative names the files are recorded under (defaults to their paths relative to `root`).
+    root (str): Directory the default names are relative to; every file must lie below it.
+
+    Returns:
+    str: Snapshot id, the same for the same file names and contents.
+    """
+    if names is None:
+        names = [os.path.relpath(os.path.abspath(path), os.path.abspath(root)) for path in file_paths]
+    names = [_check_name(name) for name in names]
+    if len(names) != len(file_paths):
+        raise ValueError("names must have one entry per file")
+    if len(set(names)) != len(names):
+        raise ValueError("File names in a snapshot must be unique")
+
+    files = {}
+    for name, path in zip(names, file_paths):
+        digest = file_digest(path, snapshot_dir)
+        _store_object(snapshot_dir, path, digest)
+        files[name] = {'digest': digest, 'size': os.path.getsize(path)}
+
+    listing = json.dumps({name: files[name]['digest'] for name in sorted(files)}, sort_keys=True)
+    snapshot_id = hashlib.sha256(listing.encode()).hexdigest()
+
+    snapshot_path = os.path.join(snapshot_dir, f'{snapshot_id}.json')
+    if not os.path.exists(snapshot_path):
+        _write_json(snapshot_path, {
+            'id': snapshot_id,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'files': files
+        })
+    return snapshot_id
+
+def load_snapshot(snapshot_id, snapshot_dir=SNAPSHOT_DIR):
+    """
+    File list of a snapshot.
+
+    Parameters:
+    snapshot_id (str): Id returned by `create_snapshot`.
+    snapshot_dir (str): Directory of the snapshot store.
+
+    Returns:
+    dict: File name mapped to its 'digest' and 'size'.
+    """
+    snapshot = _read_json(os.path.join(snapshot_dir, f'{snapshot_id}.json'))
+    if snapshot is None:
+        raise FileNotFoundError(f"No snapshot {snapshot_id} in {snapshot_dir}")
+    return snapshot['files']
+
+def open_snapshot_file(snapshot_id, name, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Open one file of a snapshot for reading.
+
+    Parameters:
+    snapshot_id (str): Id returned by `create_snapshot`.
+    name (str): Name the file was recorded under.
+    snapshot_dir (str): Directory of the snapshot store.
+
+    Returns:
+    file: Binary file object with the file's original contents, usable with `pd.read_csv`.
+    """
+    files = load_snapshot(snapshot_id, snapshot_dir)
+    if name not in files:
+        raise KeyError(f"Snapshot {snapshot_id} has no file {name}")
+    return gzip.open(_object_path(snapshot_dir, files[name]['digest']), 'rb')
+
+def restore_snapshot(snapshot_id, target_dir, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Write the files of a snapshot out under a directory.
+
+    Parameters:
+    snapshot_id (str): Id returned by `create_snapshot`.
+    target_dir (str): Directory the files are written to, under the names they were recorded with; names leading outside it are rejected.
+    snapshot_dir (str): Directory of the snapshot store.
+
+    Returns:
+    list: Paths of the restored files.
+    """
+    paths = []
+    root = os.path.realpath(target_dir)
+    for name, entry in load_snapshot(snapshot_id, snapshot_dir).items():
+        path = os.path.join(target_dir, _check_name(name))
+        # Also catches symbolic links inside the target directory that lead out of it
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            raise ValueError(f"Snapshot file {name!r} would be restored outside {target_dir}")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with gzip.open(_object_path(snapshot_dir, entry['digest']), 'rb') as source, open(path, 'wb') as out:
+            shutil.copyfileobj(source, out, BLOCK_SIZE)
+        paths.append(path)
+    return paths
+
+def stage_key(stage, inputs, params=None):
+    """
+    Cache key of a pipeline stage.
+
+    Parameters:
+    stage (str): Name of the stage (e.g., 'indicators', 'model', 'report').
+    inputs (str or list): Snapshot id, or the keys of the upstream stages the stage reads.
+    params (dict): Parameters that change the stage's output.
+
+    Returns:
+    str: Hex digest, equal for equal stage names, inputs and parameters.
+    """
+    inputs = [inputs] if isinstance(inputs, str) else sorted(inputs)
+    text = json.dumps({'stage': stage, 'inputs': inputs, 'params': params or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def write_manifest(run_dir, snapshot_id, stage=None, key=None, params=None):
+    """
+    Link a run folder to the snapshot it was computed from.
+
+    Parameters:
+    run_dir (str): Folder holding the run's results (e.g., 'results/20240715_193002_analysis').
+    snapshot_id (str): Id of the input snapshot.
+    stage (str): Name of the stage that produced the results.
+    key (str): Stage key of the results, as returned by `stage_key`.
+    params (dict): Parameters of the run.
+
+    Returns:
+    str: Path of the manifest file.
+    """
+    os.makedirs(run_dir, exist_ok=True)
+    path = os.path.join(run_dir, 'manifest.json')
+    _write_json(path, {
+        'snapshot': snapshot_id,
+        'stage': stage,
+        'stage_key': key,
+        'params': params or {},
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'outputs': sorted(name for name in os.listdir(run_dir) if name != 'manifest.json')
+    })
+    return path
+
+def find_run(key, results_dir='results'):
+    """
+    Find an earlier run folder with the given stage key.
+
+    Parameters:
+    key (str): Stage key, as returned by `stage_key`.
+    results_dir (str): Directory holding the run folders.
+
+    Returns:
+    str: Path of the most recent matching run folder whose outputs all still exist, or None.
+    """
+    if not os.path.isdir(results_dir):
+        return None
+    for name in sorted(os.listdir(results_dir), reverse=True):
+        run_dir = os.path.join(results_dir, name)
+        manifest = _read_json(os.path.join(run_dir, 'manifest.json'))
+        if manifest is None or manifest.get('stage_key') != key:
+            continue
+        if all(os.path.exists(os.path.join(run_dir, output)) for output in manifest.get('outputs', [])):
+            return run_dir
+    return None
+
+if __name__ == "__main__":
+    file_paths = [f'data/cleaned_data/{crypto}_cleaned.csv' for crypto in ['BTC', 'ETH', 'SOL']]
+    snapshot_id = create_snapshot(file_paths)
+    print(f"Snapshot {snapshot_id}:")
+    for name, entry in load_snapshot(snapshot_id).items():
+        print(f"  {name}: {entry['digest'][:16]} ({entry['size']} bytes)")
@@ -0,0 +1,188 @@
+"""
+streaming_backtest.py
+
+## Purpose
+The `streaming_backtest.py` file runs backtests one bar at a time. Instead of loading a whole history into a DataFrame and adding `rolling()` indicator columns up front, it consumes bars from any iterator (a CSV reader, a replay file or a live feed), updates the indicators our strategies rely on incrementally and yields fills and portfolio state as it goes.
+
+## Importance
+Processing bars as a stream brings backtesting closer to live trading:
+1. **Live-Trading Parity**: The same strategy functions and the same indicator code run in backtests and in production, bar by bar.
+2. **Constant Memory**: Only the bars inside the longest indicator window are kept, so months of tick-derived bars can be replayed without holding them in memory.
+3. **Constant Work per Bar**: Moving averages, returns and the rolling z-score are updated in O(1) per bar rather than recomputed over the history.
+
+## Functionality
+1. **Incremental Indicators**:
+   - `StreamingIndicators` maintains the 'short_mavg', 'long_mavg', 'returns', 'rolling_mean', 'rolling_std' and 'z_score' values that `add_strategy_columns` computes for a full DataFrame.
+
+2. **Bar Sources**:
+   - `iter_csv_bars` reads bars lazily from a CSV file such as `data/cleaned_data/BTC_cleaned.csv`.
+
+3. **Streaming Backtest**:
+   - `stream_backtest` is a generator that applies a row-wise or columnar strategy to every bar with the all-in/all-out rules of `run_backtest`, yielding the fill (if any) and the cash, position and portfolio value after each bar.
+
+## Example Usage
+```python
+from scripts.backtesting import example_strategy
+from scripts.streaming_backtest import iter_csv_bars, stream_backtest
+
+for state in stream_backtest(iter_csv_bars('data/cleaned_data/BTC_cleaned.csv'), example_strategy):
+    if state['Fill'] is not None:
+        print(state['Date'], state['Fill'])
+
+"""
+
+
+
+import csv
+import numpy as np
+
+from backtesting import BUY, SELL, is_columnar_strategy
+from utils import RollingWindow
+
+class StreamingBar(dict):
+    """
+    One bar of data with its indicator values.
+
+    Behaves like a dict, and like the `pd.Series` rows produced by
+    `data.iterrows()` as far as the bundled strategies are concerned:
+    `row['Close']` and `'z_score' in row.index` both work.
+    """
+
+    @property
+    def index(self):
+        return self.keys()
+
+class StreamingIndicators:
+    """
+    Incrementally updated indicators used by the bundled strategies.
+
+    Parameters:
+    short_window (int): Window of the short moving average.
+    long_window (int): Window of the long moving average.
+    z_window (int): Window of the rolling mean and standard deviation behind the z-score.
+    """
+
+    def __init__(self, short_window=40, long_window=100, z_window=20):
+        self.short_mavg = RollingWindow(short_window, min_periods=1)
+        self.long_mavg = RollingWindow(long_window, min_periods=1)
+        self.z_window = RollingWindow(z_window)
+        self.previous_close = None
+
+    def update(self, bar):
+        """
+        Add a bar and return it together with the current indicator values.
+
+        Parameters:
+        bar (dict): Bar data with at least a 'Close' value.
+
+        Returns:
+        StreamingBar: The bar's fields plus 'short_mavg', 'long_mavg', 'returns', 'rolling_mean', 'rolling_std' and 'z_score'.
+        """
+        close = np.float64(bar['Close'])
+        self.short_mavg.update(close)
+        self.long_mavg.update(close)
+        self.z_window.update(close)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.previous_close is None:
+                returns = np.float64(0.0)
+            else:
+                returns = close / self.previous_close - 1
+                if np.isnan(returns):
+                    returns = np.float64(0.0)
+            rolling_mean = np.float64(self.z_window.mean())
+            rolling_std = np.float64(self.z_window.std())
+            z_score = (close - rolling_mean) / rolling_std
+        self.previous_close = close
+
+        row = StreamingBar(bar)
+        row['Close'] = close
+        row['short_mavg'] = self.short_mavg.mean()
+        row['long_mavg'] = self.long_mavg.mean()
+        row['returns'] = returns
+        row['rolling_mean'] = rolling_mean
+        row['rolling_std'] = rolling_std
+        row['z_score'] = z_score
+        return row
+
+def iter_csv_bars(file_path):
+    """
+    Read bars lazily from a CSV file of historical prices.
+
+    Parameters:
+    file_path (str): Path to a CSV file with 'Date' and 'Close' columns.
+
+    Yields:
+    dict: One bar per row, with the numeric columns converted to float.
+    """
+    with open(file_path, newline='') as file:
+        for record in csv.DictReader(file):
+            bar = {'Date': record.pop('Date')}
+            for column, value in record.items():
+                bar[column] = float(value) if value else np.nan
+            yield bar
+
+def _signal_for_bar(strategy, row):
+    """
+    Evaluate a row-wise or columnar strategy on a single bar.
+    """
+    if not is_columnar_strategy(strategy):
+        return strategy(row)
+    code = strategy({column: np.array([value]) for column, value in row.items()})[0]
+    return 'buy' if code == BUY else 'sell' if code == SELL else 'hold'
+
+def stream_backtest(bars, strategy, initial_cash=10000, indicators=None):
+    """
+    Run a backtest over a stream of bars, yielding the state after each bar.
+
+    Trades follow the same rules as `run_backtest`, so running this over the
+    rows of a history gives the same cash, position and portfolio value on
+    every bar.
+
+    Parameters:
+    bars (iterable): Bars as dicts with at least 'Date' and 'Close'.
+    strategy (function): Row-wise or columnar trading strategy function.
+    initial_cash (float): Initial amount of cash for backtesting.
+    indicators (StreamingIndicators): Indicator state to use, e.g. one already warmed up on history.
+
+    Yields:
+    dict: 'Date', 'Close', 'Signal', 'Fill' (None, or the side, price and quantity of the trade), 'Cash', 'Position' and 'Portfolio Value'.
+    """
+    indicators = indicators or StreamingIndicators()
+    cash = initial_cash
+    position = 0
+
+    for bar in bars:
+        row = indicators.update(bar)
+        close = row['Close']
+        signal = _signal_for_bar(strategy, row)
+
+        fill = None
+        if signal == 'buy' and cash > 0:
+            position = cash / close
+            cash = 0
+            fill = {'Side': 'buy', 'Price': close, 'Quantity': position}
+        elif signal == 'sell' and position > 0:
+            cash = position * close
+            fill = {'Side': 'sell', 'Price': close, 'Quantity': position}
+            position = 0
+
+        yield {
+            'Date': row.get('Date'),
+            'Close': close,
+            'Signal': signal,
+            'Fill': fill,
+            'Cash': cash,
+            'Position': position,
+            'Portfolio Value': cash + (position * close)
+        }
+
+if __name__ == "__main__":
+    from backtesting import example_strategy
+
+    fills = 0
+    state = None
+    for state in stream_backtest(iter_csv_bars('data/cleaned_data/BTC_cleaned.csv'), example_strategy):
+        if state['Fill'] is not None:
+            fills += 1
+    print(f"{fills} fills, final portfolio value: {state['Portfolio Value']:.2f}")
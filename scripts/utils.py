@@ -14,15 +14,27 @@ Having a dedicated utility script is essential for several reasons:
 ## Functionality
 1. **Load Data**:
    - The `load_data` function reads historical price data from a CSV file and returns it as a pandas DataFrame.
+   - When the CSV has an up-to-date binary copy built by `price_store.py`, the copy is read instead, which avoids parsing text and dates.
 
 2. **Preprocess Data**:
    - The `preprocess_data` function cleans and preprocesses the data, handling missing values and sorting by date.
 
 3. **Calculate Indicators**:
-   - The `calculate_indicators` function adds technical indicators (e.g., SMA, EMA, RSI) to the data, which are used for analysis and model training.
+   - The `calculate_indicators` function adds technical indicators (e.g., SMA, EMA, RSI) to the data, which are used for analysis and model training. The indicators are defined once, in `feature_pipeline.py`.
+   - Given a `FeatureCache` from `feature_cache.py`, it loads indicators whose input prices are unchanged from disk and only computes the new tail after an append; exponential moving averages continue from their last cached value.
 
 4. **Calculate RSI**:
-   - The `calculate_rsi` function calculates the Relative Strength Index (RSI) for a given time series, providing insights into market momentum.
+   - The `calculate_rsi` function calculates the Relative Strength Index (RSI) for a given time series, providing insights into market momentum. It is defined in `feature_pipeline.py` and importable from here.
+
+5. **Rolling Window State**:
+   - The `RollingWindow` class keeps the mean and standard deviation of the last N values of a stream and updates them in constant time as each new value arrives. It is used to compute indicators bar by bar when the full history is not available up front.
+
+6. **Incremental Indicators**:
+   - The `SMA`, `EMA` and `RSI` classes hold the state of one indicator and update it in constant time per bar, following the definitions used by `calculate_indicators` and `calculate_rsi`.
+   - `IncrementalIndicators` bundles the SMA_20, SMA_50, EMA_20, EMA_50 and RSI columns of `calculate_indicators`. It is seeded once from history, then updated one bar at a time; `snapshot` and `restore` save and reload its state, so appending a day does not mean re-scanning years of data.
+
+7. **Batched Rolling Statistics**:
+   - The `rolling_statistics` function computes rolling means, standard deviations and z-scores for many window lengths at once, as (windows × time) matrices, from a single pass of cumulative sums. Computing dozens of windows costs little more than computing one.
 
 ## Example Usage
 ### Load Data
@@ -36,24 +48,54 @@ data = load_data(data_path)
 
 # Display the first few rows of the data
 data.head()
+```
+
+### Incremental Indicators
+```python
+import json
+from scripts.utils import IncrementalIndicators
+
+indicators = IncrementalIndicators()
+indicators.seed(data['Close'])
+with open('data/BTC_indicator_state.json', 'w') as file:
+    json.dump(indicators.snapshot(), file)
+
+# Later, e.g. in the daily job
+with open('data/BTC_indicator_state.json') as file:
+    indicators = IncrementalIndicators.from_snapshot(json.load(file))
+print(indicators.update(new_close))
 
 """
 
 
 
+from collections import deque
+import math
+import numpy as np
 import pandas as pd
 
+from feature_pipeline import INDICATORS, add_features, calculate_rsi
+from ingestion import load_price_csv
+from price_store import is_fresh, load_store, store_path
+
 def load_data(file_path):
     """
     Load historical price data from a CSV file.
     
+    The binary copy built by `price_store.convert_csv` is read instead of
+    the CSV when it is up to date with it. CSV files are checked and parsed
+    with explicit column types by `ingestion.load_price_csv`, so a saved API
+    error message raises `ingestion.PayloadError` straight away.
+    
     Parameters:
     file_path (str): Path to the CSV file.
     
     Returns:
     pd.DataFrame: Loaded data.
     """
-    return pd.read_csv(file_path, parse_dates=['Date'])
+    if is_fresh(file_path):
+        return load_store(store_path(file_path))
+    return load_price_csv(file_path)
 
 def preprocess_data(data):
     """
@@ -70,40 +112,467 @@ def preprocess_data(data):
     data.fillna(method='ffill', inplace=True)
     return data
 
-def calculate_indicators(data):
+def calculate_indicators(data, cache=None, symbol=None):
     """
     Calculate technical indicators for the data.
     
+    The indicators are defined in `feature_pipeline.py`.
+    
     Parameters:
     data (pd.DataFrame): Historical price data.
+    cache (FeatureCache): Optional feature cache; indicators whose inputs are unchanged are loaded from it instead of recomputed.
+    symbol (str): Symbol of the data, required with `cache`.
     
     Returns:
     pd.DataFrame: Data with technical indicators.
     """
-    data['SMA_20'] = data['Close'].rolling(window=20).mean()
-    data['SMA_50'] = data['Close'].rolling(window=50).mean()
-    data['EMA_20'] = data['Close'].ewm(span=20, adjust=False).mean()
-    data['EMA_50'] = data['Close'].ewm(span=50, adjust=False).mean()
-    data['RSI'] = calculate_rsi(data['Close'])
-    return data
+    return add_features(data, INDICATORS, cache=cache, symbol=symbol)
 
-def calculate_rsi(series, period=14):
+def rolling_statistics(values, windows, ddof=1, block_size=None):
     """
-    Calculate the Relative Strength Index (RSI) for a series.
+    Rolling mean, standard deviation and z-score for many windows at once.
+    
+    All windows are derived from cumulative sums and cumulative sums of
+    squares, so each extra window costs a few array operations instead of
+    another pass over the data. To keep the sums accurate, the series is
+    processed in blocks that are each centred on their own mean (so sums
+    never grow across the whole history), negative variances left by
+    rounding are clamped to zero, and windows holding a single repeated
+    value get a standard deviation of exactly zero (NaN if the window is
+    not longer than `ddof`, as in pandas). Windows containing NaN,
+    and the first `window - 1` positions, are NaN, as with
+    `Series.rolling(window).mean()` and `.std()`.
     
     Parameters:
-    series (pd.Series): Time series data.
-    period (int): Lookback period for RSI calculation.
+    values (array-like): Series of values, e.g. closing prices.
+    windows (iterable): Window lengths, e.g. `range(5, 201)`.
+    ddof (int): Delta degrees of freedom of the standard deviation.
+    block_size (int): Positions computed per block (defaults to four times the longest window, at least 2048); smaller blocks are more accurate, larger ones faster.
     
     Returns:
-    pd.Series: RSI values.
-    """
-    delta = series.diff(1)
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    dict: 'mean', 'std' and 'z_score' arrays of shape (len(windows), len(values)).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = np.asarray(list(windows), dtype=np.int64)
+    if values.ndim != 1 or windows.ndim != 1:
+        raise ValueError("values and windows must be one-dimensional")
+    if len(windows) == 0 or np.any(windows < 1):
+        raise ValueError("Window lengths must be positive")
+    n = len(values)
+    longest = int(windows.max())
+    block_size = block_size or max(4 * longest, 2048)
+
+    mean = np.full((len(windows), n), np.nan)
+    std = np.full((len(windows), n), np.nan)
+
+    for block_start in range(0, n, block_size):
+        block_end = min(block_start + block_size, n)
+        # The block plus the history its longest window reaches back into
+        segment_start = max(block_start - longest + 1, 0)
+        segment = values[segment_start:block_end]
+        missing = np.isnan(segment)
+        center = segment[~missing].mean() if not missing.all() else 0.0
+        centered = np.where(missing, 0.0, segment - center)
+        sums = np.concatenate(([0.0], np.cumsum(centered)))
+        squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
+        missing_counts = np.concatenate(([0], np.cumsum(missing)))
+
+        # Length of the run of repeated values ending at each position
+        changed = np.ones(len(segment), dtype=bool)
+        changed[1:] = segment[1:] != segment[:-1]
+        run_starts = np.maximum.accumulate(np.where(changed, np.arange(len(segment)), 0))
+        run_lengths = np.arange(len(segment)) - run_starts + 1
+        longest_run = run_lengths.max()
+        has_missing = missing.any()
+
+        for row, window in enumerate(windows):
+            # Window ends from `first` to `last` (segment positions), each covering `window` values
+            first = max(block_start - segment_start, window - 1)
+            last = block_end - segment_start
+            if first >= last:
+                continue
+            ends = slice(first + 1, last + 1)
+            starts = slice(first + 1 - window, last + 1 - window)
+            columns = slice(segment_start + first, segment_start + last)
+            window_mean = mean[row, columns]
+            variance = std[row, columns]
+
+            np.subtract(sums[ends], sums[starts], out=window_mean)
+            np.subtract(squares[ends], squares[starts], out=variance)
+            variance -= window_mean * window_mean / window
+            window_mean /= window
+            if window > ddof:
+                variance /= window - ddof
+                np.maximum(variance, 0.0, out=variance)
+            else:
+                variance[:] = np.nan
+
+            if window <= longest_run:
+                constant = run_lengths[first:last] >= window
+                np.copyto(window_mean, centered[first:last], where=constant)
+                if window > ddof:
+                    np.copyto(variance, 0.0, where=constant)
+            window_mean += center
+            np.sqrt(variance, out=variance)
+
+            if has_missing:
+                incomplete = missing_counts[ends] != missing_counts[starts]
+                np.copyto(window_mean, np.nan, where=incomplete)
+                np.copyto(variance, np.nan, where=incomplete)
+
+    z_score = values - mean
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z_score /= std
+
+    return {'mean': mean, 'std': std, 'z_score': z_score}
+
+class RollingWindow:
+    """
+    Mean and standard deviation over the last `window` values of a stream.
+    
+    Each update adds the newest value and drops the oldest one using
+    Welford's running mean and sum of squared deviations, so the cost per
+    value is constant however long the stream is. The results follow
+    `Series.rolling(window, min_periods).mean()` and `.std()`; like pandas,
+    NaN values are left out of the moments and do not count towards
+    `min_periods`, and a window holding one repeated value reports it
+    exactly, with a standard deviation of zero, instead of accumulated
+    rounding error.
+    
+    Parameters:
+    window (int): Number of values in the window.
+    min_periods (int): Values needed before a result is reported (defaults to `window`).
+    """
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque(maxlen=window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._repeats = 0
+        # NaN values in the window, which are kept out of the moments
+        self._nans = 0
+
+    def update(self, value):
+        """
+        Add a value to the window, dropping the oldest one when it is full.
+        
+        Parameters:
+        value (float): Newest value of the stream.
+        """
+        if len(self.values) == self.window:
+            oldest = self.values[0]
+            if math.isnan(oldest):
+                self._nans -= 1
+            else:
+                count = self._count() - 1
+                if count == 0:
+                    self._mean, self._m2 = 0.0, 0.0
+                else:
+                    delta = oldest - self._mean
+                    self._mean -= delta / count
+                    self._m2 = max(self._m2 - delta * (oldest - self._mean), 0.0)
+        if math.isnan(value):
+            self._nans += 1
+            self._repeats = 0
+            self.values.append(value)
+            return
+        self._repeats = self._repeats + 1 if self.values and value == self.values[-1] else 1
+        self.values.append(value)
+        if self._repeats >= len(self.values):
+            self._mean, self._m2 = value, 0.0
+            return
+        delta = value - self._mean
+        self._mean += delta / self._count()
+        self._m2 += delta * (value - self._mean)
+
+    def _count(self):
+        # Values in the window that are not NaN
+        return len(self.values) - self._nans
+
+    def mean(self):
+        """
+        Mean of the values in the window, or NaN before `min_periods` values.
+        """
+        if self._count() < max(self.min_periods, 1):
+            return math.nan
+        return self._mean
+
+    def std(self, ddof=1):
+        """
+        Standard deviation of the values in the window, or NaN before `min_periods` values.
+        """
+        count = self._count()
+        if count < max(self.min_periods, 1) or count <= ddof:
+            return math.nan
+        return math.sqrt(self._m2 / (count - ddof))
+
+    def snapshot(self):
+        """
+        State of the window as plain, JSON-serialisable values.
+        
+        Returns:
+        dict: Window settings, the values in the window and the running moments.
+        """
+        return {
+            'window': self.window,
+            'min_periods': self.min_periods,
+            'values': list(self.values),
+            'mean': self._mean,
+            'm2': self._m2,
+            'repeats': self._repeats,
+            'nans': self._nans
+        }
+
+    @classmethod
+    def from_snapshot(cls, state):
+        """
+        Rebuild a window from the output of `snapshot`.
+        
+        Parameters:
+        state (dict): Saved window state.
+        
+        Returns:
+        RollingWindow: Window that continues exactly where the saved one stopped.
+        """
+        rolling = cls(state['window'], state['min_periods'])
+        rolling.values.extend(state['values'])
+        rolling._mean = state['mean']
+        rolling._m2 = state['m2']
+        rolling._repeats = state['repeats']
+        rolling._nans = state.get('nans', sum(math.isnan(value) for value in rolling.values))
+        return rolling
+
+class SMA:
+    """
+    Simple moving average updated one value at a time.
+    
+    Follows `Series.rolling(window).mean()`: NaN until `window` values have been seen.
+    
+    Parameters:
+    window (int): Number of values averaged.
+    """
+
+    def __init__(self, window):
+        self.rolling = RollingWindow(window)
+
+    def update(self, value):
+        """
+        Add a value and return the current average.
+        
+        Parameters:
+        value (float): Newest value of the series.
+        
+        Returns:
+        float: Simple moving average.
+        """
+        self.rolling.update(value)
+        return self.value
+
+    @property
+    def value(self):
+        return self.rolling.mean()
+
+    def snapshot(self):
+        return {'rolling': self.rolling.snapshot()}
+
+    @classmethod
+    def from_snapshot(cls, state):
+        sma = cls(state['rolling']['window'])
+        sma.rolling = RollingWindow.from_snapshot(state['rolling'])
+        return sma
+
+class EMA:
+    """
+    Exponential moving average updated one value at a time.
+    
+    Follows `Series.ewm(span=span, adjust=False).mean()`: the first value
+    seeds the average and every later value moves it by `2 / (span + 1)`.
+    NaN values leave the average unchanged, but, as in pandas, the old
+    average keeps decaying over them, so the next value weighs more.
+    
+    Parameters:
+    span (int): Span of the average.
+    """
+
+    def __init__(self, span):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.value = math.nan
+        # NaN values since the last value
+        self.gap = 0
+
+    def update(self, value):
+        """
+        Add a value and return the current average.
+        
+        Parameters:
+        value (float): Newest value of the series.
+        
+        Returns:
+        float: Exponential moving average.
+        """
+        if math.isnan(value):
+            if not math.isnan(self.value):
+                self.gap += 1
+        elif math.isnan(self.value):
+            self.value = value
+        else:
+            old_weight = (1 - self.alpha) ** (self.gap + 1)
+            self.value = (old_weight * self.value + self.alpha * value) / (old_weight + self.alpha)
+            self.gap = 0
+        return self.value
+
+    def snapshot(self):
+        return {'span': self.span, 'value': self.value, 'gap': self.gap}
+
+    @classmethod
+    def from_snapshot(cls, state):
+        ema = cls(state['span'])
+        ema.value = state['value']
+        ema.gap = state.get('gap', 0)
+        return ema
+
+class RSI:
+    """
+    Relative Strength Index updated one value at a time.
+    
+    Follows `calculate_rsi`: average gains and losses are simple means over
+    the last `period` price changes, and the first value is reported once
+    `period` prices have been seen.
+    
+    Parameters:
+    period (int): Lookback period for RSI calculation.
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.previous = None
+
+    def update(self, value):
+        """
+        Add a price and return the current RSI.
+        
+        Parameters:
+        value (float): Newest price of the series.
+        
+        Returns:
+        float: RSI value, or NaN during warm-up.
+        """
+        # The first price, and changes from or to a missing price, count as unchanged ones, as in `calculate_rsi`
+        delta = 0.0 if self.previous is None else value - self.previous
+        if math.isnan(delta):
+            delta = 0.0
+        self.gains.update(max(delta, 0.0))
+        self.losses.update(max(-delta, 0.0))
+        self.previous = value
+        return self.value
+
+    @property
+    def value(self):
+        gain = self.gains.mean()
+        loss = self.losses.mean()
+        if math.isnan(gain) or (gain == 0 and loss == 0):
+            return math.nan
+        if loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + gain / loss))
+
+    def snapshot(self):
+        return {
+            'period': self.period,
+            'gains': self.gains.snapshot(),
+            'losses': self.losses.snapshot(),
+            'previous': self.previous
+        }
+
+    @classmethod
+    def from_snapshot(cls, state):
+        rsi = cls(state['period'])
+        rsi.gains = RollingWindow.from_snapshot(state['gains'])
+        rsi.losses = RollingWindow.from_snapshot(state['losses'])
+        rsi.previous = state['previous']
+        return rsi
+
+class IncrementalIndicators:
+    """
+    The indicator columns of `calculate_indicators`, updated one bar at a time.
+    
+    Parameters:
+    sma_windows (tuple): Windows of the simple moving averages.
+    ema_spans (tuple): Spans of the exponential moving averages.
+    rsi_period (int): Lookback period of the RSI.
+    """
+
+    def __init__(self, sma_windows=(20, 50), ema_spans=(20, 50), rsi_period=14):
+        self.indicators = {}
+        for window in sma_windows:
+            self.indicators[f'SMA_{window}'] = SMA(window)
+        for span in ema_spans:
+            self.indicators[f'EMA_{span}'] = EMA(span)
+        self.indicators['RSI'] = RSI(rsi_period)
+
+    def update(self, close):
+        """
+        Add a closing price and return the current indicator values.
+        
+        Parameters:
+        close (float): Newest closing price.
+        
+        Returns:
+        dict: Column name mapped to the indicator value.
+        """
+        close = float(close)
+        return {name: indicator.update(close) for name, indicator in self.indicators.items()}
+
+    def seed(self, series):
+        """
+        Bring the indicators up to date with a history of closing prices.
+        
+        Parameters:
+        series (iterable): Closing prices, oldest first.
+        
+        Returns:
+        dict: Indicator values after the last price.
+        """
+        values = {}
+        for close in series:
+            values = self.update(close)
+        return values
+
+    def snapshot(self):
+        """
+        State of every indicator as plain, JSON-serialisable values.
+        
+        Returns:
+        dict: Column name mapped to the indicator's saved state.
+        """
+        return {
+            name: {'type': type(indicator).__name__, 'state': indicator.snapshot()}
+            for name, indicator in self.indicators.items()
+        }
+
+    @classmethod
+    def from_snapshot(cls, state):
+        """
+        Rebuild the indicators from the output of `snapshot`.
+        
+        Parameters:
+        state (dict): Saved indicator state.
+        
+        Returns:
+        IncrementalIndicators: Indicators that continue exactly where the saved ones stopped.
+        """
+        indicators = cls(sma_windows=(), ema_spans=())
+        types = {'SMA': SMA, 'EMA': EMA, 'RSI': RSI}
+        indicators.indicators = {
+            name: types[saved['type']].from_snapshot(saved['state'])
+            for name, saved in state.items()
+        }
+        return indicators
 
 if __name__ == "__main__":
     data = load_data('data/historical_data/btc_usd.csv')
@@ -0,0 +1,224 @@
+"""
+walk_forward.py
+
+## Purpose
+The `walk_forward.py` file runs walk-forward optimization of our trading strategies. The history is cut into rolling train/test windows; in each window the strategy parameters are optimized on the training (in-sample) period and then traded, unchanged, on the following test (out-of-sample) period. The out-of-sample results of all windows are chained into one equity curve.
+
+## Importance
+A single full-period backtest with tuned parameters always looks better than reality, because the parameters were chosen with knowledge of the whole history:
+1. **Honest Performance**: Every out-of-sample bar is traded with parameters chosen only from data that came before it.
+2. **Parameter Stability**: The parameters picked in each window show whether a strategy's optimum is stable or drifts over time.
+3. **Practical Run Time**: Signals for every parameter combination are computed once over the full history and shared by all windows, and the windows are optimized in parallel, so a 50-window run stays practical.
+
+## Functionality
+1. **Window Generation**:
+   - `walk_forward_windows` splits a history into rolling (or anchored) train/test windows.
+
+2. **Cached Signals**:
+   - Indicators only look backwards, so the signals of each parameter combination are computed once on the full history and sliced per window instead of being recomputed for every window.
+   - The close prices and the signal matrix are placed in shared memory and read in place by the worker processes.
+
+3. **Walk-Forward Run**:
+   - `run_walk_forward` optimizes each window in parallel, backtests the winning parameters on the test period and chains the out-of-sample equity segments, each starting flat with the value the previous one ended with.
+
+## Example Usage
+```python
+from scripts.parameter_sweep import load_close_prices
+from scripts.walk_forward import run_walk_forward
+
+close = load_close_prices(['BTC'])['BTC']
+windows, equity = run_walk_forward(
+    close,
+    'example_strategy',
+    {'short_window': [10, 20, 40], 'long_window': [50, 100, 200]},
+    train_size=730,
+    test_size=90,
+    metric='sharpe_ratio'
+)
+print(windows)
+print(equity.tail())
+
+"""
+
+
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+
+from backtesting import simulate_signals
+from parameter_sweep import (
+    SWEEP_STRATEGIES,
+    attach_shared_array,
+    parameter_grid,
+    share_array
+)
+from metrics import equity_metrics
+
+# Shared memory blocks and arrays attached by each worker process
+_worker_blocks = []
+_worker_arrays = {}
+
+def walk_forward_windows(n_bars, train_size, test_size, step=None, anchored=False):
+    """
+    Split a history into consecutive train/test windows.
+
+    Parameters:
+    n_bars (int): Number of bars in the history.
+    train_size (int): Bars in each training period.
+    test_size (int): Bars in each test period.
+    step (int): Bars between the starts of consecutive windows (defaults to `test_size`, so test periods do not overlap).
+    anchored (bool): Start every training period at the first bar instead of rolling it forward.
+
+    Returns:
+    list: (train_start, train_end, test_start, test_end) bar positions, with exclusive ends.
+    """
+    step = step or test_size
+    windows = []
+    train_start = 0
+    while train_start + train_size + test_size <= n_bars:
+        train_end = train_start + train_size
+        windows.append((0 if anchored else train_start, train_end, train_end, train_end + test_size))
+        train_start += step
+    return windows
+
+def _init_worker(specs):
+    """
+    Attach the shared close prices and signal matrix in a worker process.
+    """
+    for name, spec in specs.items():
+        block, array = attach_shared_array(spec)
+        _worker_blocks.append(block)
+        _worker_arrays[name] = array
+
+def _optimize_window(task):
+    """
+    Pick the best parameters on one training period and trade them on the test period.
+    """
+    train_start, train_end, test_start, test_end, metric, ascending, periods_per_year = task
+    close = _worker_arrays['close']
+    signals = _worker_arrays['signals']
+
+    # In-sample equity curves of every combination, scored in one pass
+    curves = np.empty((len(signals), train_end - train_start))
+    for combination, combination_signals in enumerate(signals):
+        curves[combination] = simulate_signals(
+            close[train_start:train_end], combination_signals[train_start:train_end], 1.0
+        )[2]
+    scores = equity_metrics(curves, periods_per_year)[metric]
+
+    ranked = np.where(np.isnan(scores), np.inf if ascending else -np.inf, scores)
+    best = int(np.argmin(ranked) if ascending else np.argmax(ranked))
+
+    # Out-of-sample curve per unit of starting cash; the caller scales it
+    _, _, portfolio_value = simulate_signals(
+        close[test_start:test_end], signals[best, test_start:test_end], 1.0
+    )
+    return best, scores[best], portfolio_value
+
+def run_walk_forward(close, strategy, param_grid, train_size, test_size, step=None, anchored=False,
+                     metric='sharpe_ratio', ascending=False, constraint=None, initial_cash=10000,
+                     periods_per_year=365, dates=None, processes=None):
+    """
+    Run a walk-forward optimization of a strategy on one price history.
+
+    Parameters:
+    close (np.ndarray): Close prices.
+    strategy (str): Name of a strategy in `SWEEP_STRATEGIES`.
+    param_grid (dict): Parameter name mapped to a list of candidate values.
+    train_size (int): Bars in each training period.
+    test_size (int): Bars in each test period.
+    step (int): Bars between the starts of consecutive windows (defaults to `test_size`).
+    anchored (bool): Start every training period at the first bar.
+    metric (str): In-sample metric to optimize, any metric of `metrics.equity_metrics`.
+    ascending (bool): Prefer smaller metric values.
+    constraint (function): Optional filter; combinations for which it returns False are skipped.
+    initial_cash (float): Initial amount of cash for the first test period.
+    periods_per_year (int): Bars per year, used to annualise metrics.
+    dates (pd.Index): Optional dates of the bars, used to label windows and the equity curve.
+    processes (int): Number of worker processes (defaults to the CPU count).
+
+    Returns:
+    tuple: A DataFrame with one row per window ('window_number', periods,
+    chosen parameters, in-sample metric and out-of-sample return) and a DataFrame with the
+    chained out-of-sample equity curve.
+    """
+    if strategy not in SWEEP_STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {list(SWEEP_STRATEGIES)}")
+    if step is not None and step < test_size:
+        raise ValueError("step must be at least test_size so test periods do not overlap")
+    close = np.asarray(close, dtype=np.float64)
+    windows = walk_forward_windows(len(close), train_size, test_size, step, anchored)
+    if not windows:
+        raise ValueError("The history is shorter than one train/test window")
+
+    combinations = parameter_grid(param_grid)
+    if constraint is not None:
+        combinations = [params for params in combinations if constraint(params)]
+    if not combinations:
+        raise ValueError("The parameter grid is empty")
+
+    # Signals of every combination over the whole history, computed once
+    signal_function = SWEEP_STRATEGIES[strategy]
+    signals = np.vstack([signal_function(close, **params) for params in combinations])
+
+    tasks = [window + (metric, ascending, periods_per_year) for window in windows]
+    processes = min(processes or os.cpu_count() or 1, len(tasks))
+    blocks = []
+    try:
+        specs = {}
+        for name, array in (('close', close), ('signals', signals)):
+            block, spec = share_array(array)
+            if block is not None:
+                blocks.append(block)
+            specs[name] = spec
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(specs,)) as executor:
+            outcomes = list(executor.map(_optimize_window, tasks))
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    if dates is None:
+        dates = pd.RangeIndex(len(close))
+
+    window_rows = []
+    segments = []
+    value = initial_cash
+    for number, ((train_start, train_end, test_start, test_end), (best, in_sample, curve)) in enumerate(zip(windows, outcomes)):
+        segment = value * curve
+        window_rows.append({
+            'window_number': number,
+            'train_start': dates[train_start],
+            'train_end': dates[train_end - 1],
+            'test_start': dates[test_start],
+            'test_end': dates[test_end - 1],
+            **combinations[best],
+            f'in_sample_{metric}': in_sample,
+            'out_of_sample_return': curve[-1] - 1
+        })
+        segments.append(pd.DataFrame({
+            'Date': dates[test_start:test_end],
+            'Window': number,
+            'Portfolio Value': segment
+        }))
+        value = segment[-1]
+
+    return pd.DataFrame(window_rows), pd.concat(segments, ignore_index=True)
+
+if __name__ == "__main__":
+    for crypto in ['BTC', 'ETH', 'SOL']:
+        data = pd.read_csv(f'data/cleaned_data/{crypto}_cleaned.csv', parse_dates=['Date'], index_col='Date')
+        windows, equity = run_walk_forward(
+            data['Close'].to_numpy(),
+            'example_strategy',
+            {'short_window': [10, 20, 40], 'long_window': [50, 100, 200]},
+            train_size=730,
+            test_size=90,
+            dates=data.index
+        )
+        equity.to_csv(f'results/{crypto}_walk_forward_equity.csv', index=False)
+        print(f"Walk-forward windows for {crypto}:")
+        print(windows)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import generate_signals, run_backtest, run_vectorized_backtest, simulate_signals, simulate_signals_loop
+
+COLUMNS = ['Cash', 'Position', 'Portfolio Value']
+
+def signal_strategy(row):
+    # Reads the precomputed random signal of the row
+    return row['Signal']
+
+def random_data(seed, n=500, hold_share=0.8):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    signals = rng.choice(['buy', 'sell', 'hold'], size=n, p=[(1 - hold_share) / 2, (1 - hold_share) / 2, hold_share])
+    index = pd.date_range('2020-01-01', periods=n, freq='D', name='Date')
+    return pd.DataFrame({'Close': close, 'Signal': signals}, index=index)
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('hold_share', [0.0, 0.8, 0.99])
+def test_vectorized_engine_matches_loop(seed, hold_share):
+    data = random_data(seed, hold_share=hold_share)
+    expected = run_backtest(data, signal_strategy)
+    result = run_vectorized_backtest(data, generate_signals(data, signal_strategy))
+
+    # Multiplying by reciprocal prices differs from the loop's division in the last bits
+    for column in COLUMNS:
+        np.testing.assert_allclose(result[column], expected[column], rtol=1e-9)
+
+@pytest.mark.filterwarnings('ignore:invalid value encountered')
+@pytest.mark.parametrize('price', [np.nan, 0.0, np.inf])
+def test_bars_without_a_valid_price_are_not_traded(price):
+    data = random_data(0, hold_share=0.0)
+    # A buy while flat, a sell while invested, and a hold
+    bad = [10, 11, 12]
+    data.iloc[bad, data.columns.get_loc('Close')] = price
+    data.iloc[bad, data.columns.get_loc('Signal')] = ['buy', 'sell', 'hold']
+    data.iloc[9, data.columns.get_loc('Signal')] = 'sell'
+    expected = run_backtest(data, signal_strategy)
+    signals = generate_signals(data, signal_strategy)
+    result = run_vectorized_backtest(data, signals)
+    loop = simulate_signals_loop(data['Close'].to_numpy(), signals)
+
+    for column, values in zip(COLUMNS, loop):
+        np.testing.assert_allclose(result[column], expected[column], rtol=1e-9)
+        np.testing.assert_array_equal(values, expected[column])
+    # Only the portfolio value of those bars depends on the price; the account is unchanged
+    unpriced = ~np.isfinite(expected['Portfolio Value'].to_numpy())
+    assert set(np.flatnonzero(unpriced)) <= set(bad)
+    assert (expected['Cash'].iloc[9:13] == expected['Cash'].iloc[9]).all()
+    assert np.isfinite(expected['Cash']).all() and np.isfinite(expected['Position']).all()
+
+def test_empty_input():
+    data = random_data(0).iloc[:0]
+    expected = run_backtest(data, signal_strategy)
+    result = run_vectorized_backtest(data, data['Signal'].to_numpy())
+    assert len(expected) == len(result) == 0
+    assert all(len(values) == 0 for values in simulate_signals([], []))
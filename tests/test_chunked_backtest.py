@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import add_strategy_columns, example_strategy, example_strategy_columnar, run_backtest
+from chunked_backtest import run_chunked_backtest
+
+COLUMNS = ['Cash', 'Position', 'Portfolio Value']
+
+@pytest.fixture
+def price_file(tmp_path):
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, 2000)))
+    data = pd.DataFrame({'Date': pd.date_range('2018-01-01', periods=len(close), freq='D'), 'Close': close})
+    path = tmp_path / 'prices.csv'
+    data.to_csv(path, index=False)
+    return path
+
+@pytest.mark.parametrize('strategy', [example_strategy, example_strategy_columnar])
+def test_chunked_backtest_matches_in_memory_run(price_file, tmp_path, strategy):
+    output_path = tmp_path / 'results.csv'
+    run_chunked_backtest(str(price_file), strategy, output_path=str(output_path), chunksize=300)
+
+    data = add_strategy_columns(pd.read_csv(price_file, index_col='Date'))
+    expected = run_backtest(data, strategy)
+    result = pd.read_csv(output_path, float_precision='round_trip')
+    for column in COLUMNS:
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy())
+
+def test_failed_run_keeps_previous_results(price_file, tmp_path):
+    output_path = tmp_path / 'results.csv'
+    output_path.write_text('previous results\n')
+
+    def failing_prepare(frame):
+        raise RuntimeError("indicator failure")
+
+    with pytest.raises(RuntimeError):
+        run_chunked_backtest(str(price_file), example_strategy, output_path=str(output_path), prepare=failing_prepare)
+    assert output_path.read_text() == 'previous results\n'
+    assert not (tmp_path / 'results.csv.tmp').exists()
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_cache import FeatureCache
+from feature_pipeline import add_features
+
+def random_close(seed=0, n=300):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2020-01-01', periods=n, freq='D', name='Date')
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), index=index, name='Close')
+
+class Counted:
+    """
+    Feature function that records the length of every series it is called on.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        self.lengths = []
+
+    def __call__(self, series, **params):
+        self.lengths.append(len(series))
+        return self.function(series, **params)
+
+def rolling_mean(close, window):
+    return close.rolling(window=window).mean()
+
+def ema(close, span):
+    return close.ewm(span=span, adjust=False).mean()
+
+def entry_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith('.json'))
+
+@pytest.fixture
+def cache(tmp_path):
+    return FeatureCache(str(tmp_path / 'features'))
+
+def test_unchanged_series_is_a_hit(cache):
+    close = random_close()
+    function = Counted(rolling_mean)
+    first = cache.get('BTC', close, 'rolling_mean', function, {'window': 20}, lookback=20)
+    second = cache.get('BTC', close, 'rolling_mean', function, {'window': 20}, lookback=20)
+
+    pd.testing.assert_series_equal(first, second)
+    assert function.lengths == [len(close)]
+    assert cache.stats == {'hits': 1, 'appends': 0, 'misses': 1}
+
+@pytest.mark.parametrize('function, params, options', [
+    (rolling_mean, {'window': 20}, {'lookback': 20}),
+    (ema, {'span': 20}, {'seed': True})
+])
+def test_append_extends_the_cached_prefix(cache, function, params, options):
+    close = random_close()
+    counted = Counted(function)
+    cache.get('BTC', close.iloc[:-30], 'feature', counted, params, **options)
+    result = cache.get('BTC', close, 'feature', counted, params, **options)
+
+    np.testing.assert_allclose(result, function(close, **params), rtol=1e-12)
+    assert cache.stats['appends'] == 1
+    # Only the new rows, plus the lookback window or the seed, are computed
+    assert counted.lengths[1] == 30 + options.get('lookback', 1)
+    # The prefix version is superseded by the extended one
+    assert len(entry_files(cache)) == 1
+
+def test_edited_history_is_recomputed(cache):
+    close = random_close()
+    cache.get('BTC', close, 'rolling_mean', rolling_mean, {'window': 20}, lookback=20)
+    edited = close.copy()
+    edited.iloc[10] *= 1.5
+    result = cache.get('BTC', edited, 'rolling_mean', rolling_mean, {'window': 20}, lookback=20)
+
+    np.testing.assert_array_equal(result, rolling_mean(edited, 20))
+    assert cache.stats == {'hits': 0, 'appends': 0, 'misses': 2}
+    # The original series is not a prefix of the edited one, so its version stays until evicted
+    assert len(entry_files(cache)) == 2
+    cache.get('BTC', close, 'rolling_mean', rolling_mean, {'window': 20}, lookback=20)
+    assert cache.stats['hits'] == 1
+
+def test_least_recently_used_features_are_evicted(cache):
+    close = random_close()
+    cache.get('BTC', close, 'first', rolling_mean, {'window': 20}, lookback=20)
+    entry_size = cache.size()
+    cache.max_bytes = int(2.5 * entry_size)
+    cache.get('BTC', close, 'second', rolling_mean, {'window': 20}, lookback=20)
+    # Make 'first' the oldest entry, then use it so that 'second' is the least recently used
+    for file_name in os.listdir(cache.cache_dir):
+        os.utime(os.path.join(cache.cache_dir, file_name), (0, 0))
+    cache.get('BTC', close, 'first', rolling_mean, {'window': 20}, lookback=20)
+    cache.get('BTC', close, 'third', rolling_mean, {'window': 20}, lookback=20)
+
+    names = [file_name.split('__')[1] for file_name in entry_files(cache)]
+    assert names == ['first', 'third']
+    assert cache.size() <= cache.max_bytes
+
+def test_cached_add_features_after_append_matches_full_recompute(cache):
+    data = random_close().to_frame()
+    columns = ['SMA_20', 'EMA_20', 'RSI', 'z_score', 'rolling_mean', 'Close_Lag3']
+    add_features(data.iloc[:-40].copy(), columns, cache=cache, symbol='BTC')
+    result = add_features(data.copy(), columns, cache=cache, symbol='BTC')
+    expected = add_features(data.copy(), columns)
+
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-12)
+    assert cache.stats['appends'] > 0
+    # The alias of SMA_20 is computed, not cached
+    assert not any(file_name.split('__')[1] == 'rolling_mean' for file_name in entry_files(cache))
@@ -0,0 +1,210 @@
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+import pandas as pd
+import pytest
+
+import fetcher
+from fetcher import fetch_all, fetch_cryptocompare_range, fetch_range, make_providers, page_ranges, save_frame
+from rate_limit import RateLimiter
+
+def days(*pairs):
+    return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in pairs]
+
+@pytest.mark.parametrize('start, end, frequency, page_bars, expected', [
+    # Exact multiple of the page size
+    ('2024-01-01', '2024-01-07', '1D', 3, days(('2024-01-01', '2024-01-04'), ('2024-01-04', '2024-01-07'))),
+    # One bar more and one bar less than a multiple
+    ('2024-01-01', '2024-01-08', '1D', 3,
+     days(('2024-01-01', '2024-01-04'), ('2024-01-04', '2024-01-07'), ('2024-01-07', '2024-01-08'))),
+    ('2024-01-01', '2024-01-06', '1D', 3, days(('2024-01-01', '2024-01-04'), ('2024-01-04', '2024-01-06'))),
+    # Single pages: one bar, and exactly one full page
+    ('2024-01-01', '2024-01-02', '1D', 3, days(('2024-01-01', '2024-01-02'))),
+    ('2024-01-01', '2024-01-04', '1D', 3, days(('2024-01-01', '2024-01-04'))),
+    # A start off the bar grid is floored to its bar; an end off the grid ends the last page
+    ('2024-01-01 06:00', '2024-01-03', '1D', 3, days(('2024-01-01', '2024-01-03'))),
+    ('2024-01-01', '2024-01-04 12:00', '1D', 3,
+     days(('2024-01-01', '2024-01-04'), ('2024-01-04', '2024-01-04 12:00'))),
+    ('2024-01-01 00:00', '2024-01-01 05:00', '1h', 2,
+     days(('2024-01-01 00:00', '2024-01-01 02:00'), ('2024-01-01 02:00', '2024-01-01 04:00'),
+          ('2024-01-01 04:00', '2024-01-01 05:00')))
+])
+def test_page_ranges(start, end, frequency, page_bars, expected):
+    assert page_ranges(start, end, frequency, page_bars) == expected
+
+@pytest.mark.parametrize('start, end', [('2024-01-02', '2024-01-01'), ('2024-01-01', '2024-01-01')])
+def test_empty_page_range_is_rejected(start, end):
+    with pytest.raises(ValueError):
+        page_ranges(start, end, '1D', 3)
+
+def test_fetch_range_removes_duplicates_and_bars_outside_the_range():
+    def fetch_page(page_start, page_end):
+        # Every page repeats the bar before it and the bar at its end, with its own close
+        dates = pd.date_range(page_start - pd.Timedelta('1D'), page_end, freq='1D')
+        return pd.DataFrame({'Date': dates, 'Close': float(page_start.day)})
+
+    bars = fetch_range(fetch_page, '2024-01-01', '2024-01-10', '1D', 3, max_workers=3)
+    assert list(bars['Date']) == list(pd.date_range('2024-01-01', '2024-01-09', freq='1D'))
+    # A repeated bar keeps the value of the earliest page
+    assert list(bars['Close']) == [1, 1, 1, 1, 4, 4, 4, 7, 7]
+
+def test_fetch_range_of_empty_pages():
+    bars = fetch_range(lambda page_start, page_end: pd.DataFrame(), '2024-01-01', '2024-01-10', '1D', 3)
+    assert bars.empty and list(bars.columns) == fetcher.BAR_COLUMNS
+
+class HistoryProvider:
+    """
+    Fake CryptoCompare provider answering like histoday: `limit + 1` bars ending at `toTs`.
+    """
+
+    def __init__(self, listed='2023-12-01'):
+        self.listed = pd.Timestamp(listed)
+        self.calls = []
+
+    def get(self, path, params=None, ttl=None):
+        self.calls.append(params)
+        last = pd.Timestamp(params['toTs'], unit='s')
+        dates = pd.date_range(end=last, periods=params['limit'] + 1, freq='1D')
+        bars = [{
+            'time': int(date.timestamp()),
+            'open': 0 if date < self.listed else 10, 'high': 0 if date < self.listed else 12,
+            'low': 0 if date < self.listed else 9, 'close': 0 if date < self.listed else 11,
+            'volumefrom': 1, 'volumeto': 11
+        } for date in dates]
+        return FakeResponse({'Response': 'Success', 'Data': {'Data': bars}})
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+@pytest.mark.parametrize('start, end, calls', [
+    ('2024-01-01', '2024-01-31', 3),
+    ('2024-01-01', '2024-01-02', 1),
+    ('2024-01-01', '2024-01-11', 1),
+    ('2024-01-01', '2024-01-12', 2),
+    ('2023-11-20', '2024-01-05 12:00', 5)
+])
+def test_cryptocompare_pages_cover_the_range_once(monkeypatch, start, end, calls):
+    monkeypatch.setattr(fetcher, 'CRYPTOCOMPARE_PAGE_BARS', 10)
+    provider = HistoryProvider()
+    bars = fetch_cryptocompare_range(provider, 'BTC', start, end)
+
+    # Bars before the listing date are dropped; the bar open at an off-grid end is included
+    first = max(pd.Timestamp(start), provider.listed)
+    last = pd.Timestamp(end).ceil('1D') - pd.Timedelta('1D')
+    assert list(bars['Date']) == list(pd.date_range(first, last, freq='1D'))
+    assert len(provider.calls) == calls
+    assert all(call['limit'] + 1 <= 10 for call in provider.calls)
+    assert (bars['Volume'] == 11).all()
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answers like the providers used by `SOURCES`, slowly, recording requests and connections.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    delay = 0.2
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.most_in_flight = max(server.most_in_flight, server.in_flight)
+            server.requests.append(self.path)
+            server.connections.add(self.client_address)
+        time.sleep(self.delay)
+
+        url = urllib.parse.urlparse(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        if url.path.startswith('/v2/prices/'):
+            payload = {'data': {'amount': '42000.5'}}
+        elif url.path == '/query':
+            payload = {'Time Series (Digital Currency Daily)': {
+                '2024-01-02': {'1. open': '1', '2. high': '2', '3. low': '1', '4. close': '2', '5. volume': '5'},
+                '2024-01-01': {'1. open': '1', '2. high': '1', '3. low': '1', '4. close': '1', '5. volume': '3'}
+            }}
+        else:
+            last = int(params['toTs'])
+            payload = {'Response': 'Success', 'Data': {'Data': [
+                {'time': last - 86400 * offset, 'open': 10, 'high': 12, 'low': 9, 'close': 11,
+                 'volumefrom': 1, 'volumeto': 11}
+                for offset in range(int(params['limit']), -1, -1)
+            ]}}
+
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.in_flight = server.most_in_flight = 0
+    server.requests = []
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def stub_providers(server):
+    url = f'http://127.0.0.1:{server.server_port}'
+    limiters = {name: RateLimiter(name, rate=1000, burst=100, max_concurrent=16) for name in fetcher.BASE_URLS}
+    return make_providers({name: url for name in fetcher.BASE_URLS}, pool_size=16, limiters=limiters, cache=False)
+
+def test_fetch_all_runs_jobs_concurrently_and_saves_every_result(stub, tmp_path):
+    providers = stub_providers(stub)
+    saved = []
+
+    def save(frame, path):
+        saved.append((threading.get_ident(), path))
+        return save_frame(frame, str(tmp_path / path))
+
+    symbols = ['BTC', 'ETH', 'SOL']
+    start = time.perf_counter()
+    results = fetch_all(symbols, providers=providers, save=save)
+    elapsed = time.perf_counter() - start
+
+    assert set(results) == {(symbol, source) for symbol in symbols for source in fetcher.SOURCES}
+    assert not [result for result in results.values() if isinstance(result, Exception)]
+    # Every result is written by the calling thread to its source's path
+    assert {ident for ident, _ in saved} == {threading.get_ident()}
+    for (symbol, source), path in results.items():
+        assert path == str(tmp_path / fetcher.SOURCES[source][2].format(symbol=symbol))
+    spot = pd.read_csv(results[('BTC', 'coinbase')])
+    assert spot['Close'].tolist() == [42000.5]
+    daily = pd.read_csv(results[('ETH', 'alpha_vantage')])
+    assert daily['Date'].tolist() == ['2024-01-02', '2024-01-01']
+    history = pd.read_csv(results[('SOL', 'cryptocompare')], parse_dates=['Date'])
+    assert history['Date'].iloc[0] == pd.Timestamp(fetcher.CRYPTOCOMPARE_HISTORY_START)
+    assert history['Date'].diff().iloc[1:].eq(pd.Timedelta('1D')).all()
+
+    # Requests overlap instead of running one after another
+    serial = len(stub.requests) * StubHandler.delay
+    assert stub.most_in_flight > 3
+    assert elapsed < serial / 2
+
+    # A second run reuses the pooled keep-alive connections instead of opening new ones
+    connections = set(stub.connections)
+    requests_sent = len(stub.requests)
+    fetch_all(symbols, providers=providers, save=lambda frame, path: path)
+    assert len(stub.requests) == 2 * requests_sent
+    assert stub.connections == connections
+    for provider in providers.values():
+        provider.close()
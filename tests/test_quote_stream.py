@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from quote_stream import (BAR_FIELDS, BarAggregator, ReplayTransport, RingBuffer, StreamingClient,
+                          parse_alpaca, parse_coinbase, record_messages)
+
+FREQUENCIES = ('1min', '5min', '1h')
+
+def random_ticks(seed=0, n=2000, hours=3):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-07-15 09:00')
+    offsets = np.sort(rng.uniform(0, hours * 3600, n))
+    # A quiet stretch with no trades, so some intervals have no bar
+    offsets = offsets[(offsets < 3000) | (offsets > 3900)]
+    times = start + pd.to_timedelta(offsets, unit='s')
+    prices = np.round(64000 * np.exp(np.cumsum(rng.normal(0, 1e-4, len(times)))), 2)
+    sizes = np.round(rng.uniform(0.001, 0.5, len(times)), 4)
+    return pd.DataFrame({'price': prices, 'size': sizes}, index=times)
+
+def expected_bars(ticks, frequency):
+    grouped = ticks.resample(frequency)
+    bars = pd.DataFrame({
+        'Open': grouped['price'].first(),
+        'High': grouped['price'].max(),
+        'Low': grouped['price'].min(),
+        'Close': grouped['price'].last(),
+        'Volume': grouped['size'].sum(),
+        'Trades': grouped['price'].count().astype(float)
+    })
+    bars = bars[bars['Trades'] > 0]
+    bars.index.name = 'Date'
+    return bars.reset_index()
+
+def coinbase_messages(ticks):
+    messages = [{'type': 'subscriptions', 'channels': [{'name': 'matches', 'product_ids': ['BTC-USD']}]}]
+    for i, (time, row) in enumerate(ticks.iterrows()):
+        messages.append({'type': 'match', 'product_id': 'BTC-USD', 'time': time.isoformat() + 'Z',
+                         'price': str(row['price']), 'size': str(row['size'])})
+        if i % 100 == 0:
+            messages.append({'type': 'heartbeat', 'product_id': 'BTC-USD', 'time': time.isoformat() + 'Z'})
+    return messages
+
+def alpaca_messages(ticks):
+    messages = [[{'T': 'success', 'msg': 'connected'}], [{'T': 'subscription', 'trades': ['BTC/USD']}]]
+    events = [{'T': 't', 'S': 'BTC/USD', 'p': row['price'], 's': row['size'], 't': time.isoformat() + 'Z'}
+              for time, row in ticks.iterrows()]
+    # Alpaca batches events; quotes are interleaved with the trades
+    for start in range(0, len(events), 7):
+        messages.append(events[start:start + 7] + [{'T': 'q', 'S': 'BTC/USD', 'bp': 1, 'ap': 2}])
+    return messages
+
+def test_replayed_coinbase_recording_builds_every_frequency(tmp_path):
+    ticks = random_ticks()
+    path = str(tmp_path / 'coinbase.jsonl')
+    messages = coinbase_messages(ticks)
+    assert record_messages(ReplayTransport(messages), path) == len(messages)
+
+    aggregator = BarAggregator(FREQUENCIES)
+    client = StreamingClient(ReplayTransport(path), parse_coinbase, aggregator)
+    assert client.run() == len(messages)
+    assert aggregator.stats['ticks'] == len(ticks)
+    assert aggregator.stats['late_ticks'] == 0
+
+    for frequency in FREQUENCIES:
+        expected = expected_bars(ticks, frequency)
+        # The last bar of each frequency is still open at the end of the replay
+        pd.testing.assert_frame_equal(aggregator.bars('BTC-USD', frequency), expected.iloc[:-1], check_dtype=False)
+    aggregator.flush(ticks.index[-1].value + pd.Timedelta('1h').value)
+    for frequency in FREQUENCIES:
+        pd.testing.assert_frame_equal(aggregator.bars('BTC-USD', frequency), expected_bars(ticks, frequency),
+                                      check_dtype=False)
+
+def test_replayed_alpaca_bars_are_yielded_in_order():
+    ticks = random_ticks(seed=1)
+    client = StreamingClient(ReplayTransport(alpaca_messages(ticks)), parse_alpaca, BarAggregator(FREQUENCIES))
+    bars = pd.DataFrame(list(client.iter_bars('BTC/USD', '5min')))
+
+    assert set(bars['Symbol']) == {'BTC/USD'} and set(bars['Frequency']) == {'5min'}
+    expected = expected_bars(ticks, '5min').iloc[:-1]
+    pd.testing.assert_frame_equal(bars[['Date'] + BAR_FIELDS], expected, check_dtype=False)
+
+def test_late_ticks_are_dropped():
+    aggregator = BarAggregator(('1min',))
+    minute = pd.Timedelta('1min').value
+    start = pd.Timestamp('2024-07-15 09:00').value
+
+    aggregator.update('BTC-USD', start + 10 * 10 ** 9, 100.0, 1.0)
+    completed = aggregator.update('BTC-USD', start + minute + 5 * 10 ** 9, 101.0, 1.0)
+    assert [bar['Close'] for bar in completed] == [100.0]
+    # Older than the open bar
+    assert aggregator.update('BTC-USD', start + 50 * 10 ** 9, 90.0, 1.0) == []
+    assert aggregator.stats['late_ticks'] == 1
+
+    completed = aggregator.flush(start + 2 * minute)
+    assert [bar['Date'] for bar in completed] == [pd.Timestamp(start + minute)]
+    # Inside the interval the flush has already completed
+    assert aggregator.update('BTC-USD', start + minute + 30 * 10 ** 9, 80.0, 1.0) == []
+    assert aggregator.stats == {'ticks': 4, 'late_ticks': 2, 'bars': 2}
+
+    bars = aggregator.bars('BTC-USD', '1min')
+    assert bars['Close'].tolist() == [100.0, 101.0]
+    assert bars['Volume'].tolist() == [1.0, 1.0]
+
+def test_ring_buffer_keeps_the_latest_bars_in_order():
+    buffer = RingBuffer(3)
+    assert len(buffer) == 0 and buffer.to_frame().empty
+    for i in range(7):
+        buffer.append(i * 60 * 10 ** 9, [i] * len(BAR_FIELDS))
+        assert len(buffer) == min(i + 1, 3)
+
+    frame = buffer.to_frame()
+    assert frame['Open'].tolist() == [4.0, 5.0, 6.0]
+    assert frame['Date'].tolist() == [pd.Timestamp(i * 60 * 10 ** 9) for i in (4, 5, 6)]
+
+def test_aggregator_capacity_bounds_the_buffered_bars():
+    ticks = random_ticks(seed=2)
+    aggregator = BarAggregator(('1min',), capacity=5)
+    StreamingClient(ReplayTransport(coinbase_messages(ticks)), parse_coinbase, aggregator).run()
+    expected = expected_bars(ticks, '1min').iloc[:-1]
+    pd.testing.assert_frame_equal(aggregator.bars('BTC-USD', '1min'), expected.iloc[-5:].reset_index(drop=True),
+                                  check_dtype=False)
+
+class FailingTransport(ReplayTransport):
+    """
+    Replays its messages, then drops the connection.
+    """
+
+    def messages(self):
+        yield from super().messages()
+        raise requests.exceptions.ConnectionError('connection reset')
+
+def test_iter_bars_raises_the_transport_error_after_the_completed_bars():
+    ticks = random_ticks(seed=3, n=200, hours=1)
+    client = StreamingClient(FailingTransport(coinbase_messages(ticks)), parse_coinbase,
+                             BarAggregator(('5min',)), max_reconnects=0)
+    bars = []
+    with pytest.raises(requests.exceptions.ConnectionError):
+        for bar in client.iter_bars():
+            bars.append(bar)
+    assert len(bars) == len(expected_bars(ticks, '5min')) - 1
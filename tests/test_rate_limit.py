@@ -0,0 +1,139 @@
+import email.utils
+import threading
+
+import pytest
+import requests
+
+import rate_limit
+from rate_limit import RateLimiter, RetryPolicy, TokenBucket
+
+class FakeTime:
+    """
+    Stand-in for the `time` module whose clock only moves when slept on.
+    """
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(rate_limit, 'time', fake)
+    return fake
+
+def response(status_code, retry_after=None):
+    result = requests.Response()
+    result.status_code = status_code
+    result._content = b''
+    if retry_after is not None:
+        result.headers['Retry-After'] = retry_after
+    return result
+
+def test_bucket_admits_a_burst_then_waits_for_refills(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    waits = [bucket.acquire() for _ in range(8)]
+    assert waits[:5] == [0.0] * 5
+    assert waits[5:] == pytest.approx([0.1, 0.1, 0.1])
+    assert clock.now - 1_700_000_000.0 == pytest.approx(0.3)
+
+def test_bucket_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    for _ in range(5):
+        bucket.acquire()
+    clock.now += 60
+    waits = [bucket.acquire() for _ in range(6)]
+    assert waits[:5] == [0.0] * 5
+    assert waits[5] == pytest.approx(0.1)
+
+def test_paused_bucket_waits_out_the_pause(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.pause(3)
+    assert bucket.acquire() == pytest.approx(3.1)
+
+@pytest.mark.parametrize('header, expected', [
+    ('7', 7.0),
+    ('0', 0.0),
+    ('-5', 0.0),
+    ('not a date', None),
+    (None, None)
+])
+def test_retry_after_seconds(clock, header, expected):
+    assert RetryPolicy.retry_after(response(429, header)) == expected
+
+def test_retry_after_http_date(clock):
+    header = email.utils.formatdate(clock.now + 30, usegmt=True)
+    assert RetryPolicy.retry_after(response(503, header)) == pytest.approx(30)
+    past = email.utils.formatdate(clock.now - 30, usegmt=True)
+    assert RetryPolicy.retry_after(response(503, past)) == 0.0
+
+def test_retry_after_is_capped_by_max_backoff(clock):
+    policy = RetryPolicy(max_backoff=10)
+    assert policy.delay(0, response(429, '600')) == 10
+
+def test_backoff_without_retry_after_is_bounded(clock):
+    policy = RetryPolicy(backoff=1, max_backoff=5)
+    for attempt in range(6):
+        assert 0 <= policy.delay(attempt, response(503)) <= min(5, 2 ** attempt)
+
+def test_throttled_request_is_retried_after_retry_after(clock):
+    replies = iter([response(429, '2'), response(429, '3'), response(200)])
+    limiter = RateLimiter('test', rate=100, burst=10, max_concurrent=1)
+    assert limiter.request(lambda: next(replies)).status_code == 200
+    assert limiter.stats['retries'] == limiter.stats['throttled'] == 2
+    # Each retry sleeps for Retry-After, after which the paused bucket has no burst left
+    assert clock.sleeps == pytest.approx([2.0, 0.01, 3.0, 0.01])
+
+def test_retries_run_out(clock):
+    limiter = RateLimiter('test', rate=100, burst=10, max_concurrent=1, retry=RetryPolicy(max_retries=2))
+    assert limiter.request(lambda: response(503, '1')).status_code == 503
+    assert limiter.stats['requests'] == 3
+
+    def fail():
+        raise requests.exceptions.ConnectionError('refused')
+    with pytest.raises(requests.exceptions.ConnectionError):
+        limiter.request(fail)
+
+def test_concurrency_is_capped(clock):
+    limiter = RateLimiter('test', rate=1000, burst=100, max_concurrent=2)
+    lock = threading.Lock()
+    in_flight = [0]
+    most = [0]
+    two_in_flight = threading.Event()
+    release = threading.Event()
+
+    def send():
+        with lock:
+            in_flight[0] += 1
+            most[0] = max(most[0], in_flight[0])
+            if in_flight[0] == 2:
+                two_in_flight.set()
+        release.wait(5)
+        with lock:
+            in_flight[0] -= 1
+        return response(200)
+
+    threads = [threading.Thread(target=limiter.request, args=(send,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    assert two_in_flight.wait(5)
+    # The other four requests stay queued while two are in flight
+    release.wait(0.2)
+    assert most[0] == 2
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert most[0] == 2
+    assert limiter.stats['requests'] == 6
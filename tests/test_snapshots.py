@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from snapshots import create_snapshot, load_snapshot, open_snapshot_file, restore_snapshot
+
+FILES = {
+    'BTC_cleaned.csv': b'Date,Close\n2024-01-01,42000.5\n',
+    'alts/ETH_cleaned.csv': b'Date,Close\n2024-01-01,2300.25\n',
+    'alts/deep/SOL_cleaned.csv': b'Date,Close\n2024-01-01,101.75\n'
+}
+
+@pytest.fixture
+def inputs(tmp_path):
+    root = tmp_path / 'inputs'
+    for name, content in FILES.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return root
+
+def test_restore_writes_every_file(inputs, tmp_path):
+    store = str(tmp_path / 'store')
+    snapshot_id = create_snapshot([str(inputs / name) for name in FILES], store, root=str(inputs))
+    assert set(load_snapshot(snapshot_id, store)) == {os.path.normpath(name) for name in FILES}
+
+    target = tmp_path / 'restored'
+    paths = restore_snapshot(snapshot_id, str(target), store)
+    assert len(paths) == len(FILES)
+    for name, content in FILES.items():
+        assert (target / name).read_bytes() == content
+        with open_snapshot_file(snapshot_id, os.path.normpath(name), store) as file:
+            assert file.read() == content
+
+def test_snapshot_id_depends_on_contents(inputs, tmp_path):
+    store = str(tmp_path / 'store')
+    paths = [str(inputs / name) for name in FILES]
+    first = create_snapshot(paths, store, root=str(inputs))
+    assert create_snapshot(paths, store, root=str(inputs)) == first
+    (inputs / 'BTC_cleaned.csv').write_bytes(b'Date,Close\n2024-01-01,1.0\n')
+    assert create_snapshot(paths, store, root=str(inputs)) != first
+
+@pytest.mark.parametrize('name', ['../escape.csv', 'alts/../../escape.csv', '/tmp/escape.csv'])
+def test_names_leading_outside_are_rejected(inputs, tmp_path, name):
+    with pytest.raises(ValueError):
+        create_snapshot([str(inputs / 'BTC_cleaned.csv')], str(tmp_path / 'store'), names=[name])
+
+def test_files_outside_root_are_rejected(inputs, tmp_path):
+    with pytest.raises(ValueError):
+        create_snapshot([str(inputs / 'BTC_cleaned.csv')], str(tmp_path / 'store'), root=str(inputs / 'alts'))
+
+def test_restore_rejects_tampered_names(inputs, tmp_path):
+    store = tmp_path / 'store'
+    snapshot_id = create_snapshot([str(inputs / 'BTC_cleaned.csv')], str(store), root=str(inputs))
+    listing_path = store / f'{snapshot_id}.json'
+    listing = json.loads(listing_path.read_text())
+    listing['files'] = {'../escape.csv': listing['files']['BTC_cleaned.csv']}
+    listing_path.write_text(json.dumps(listing))
+
+    with pytest.raises(ValueError):
+        restore_snapshot(snapshot_id, str(tmp_path / 'restored'), str(store))
+    assert not (tmp_path / 'escape.csv').exists()
+
+def test_restore_rejects_symlink_leading_outside(inputs, tmp_path):
+    store = str(tmp_path / 'store')
+    snapshot_id = create_snapshot([str(inputs / 'BTC_cleaned.csv')], store, names=['link/escape.csv'])
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    target = tmp_path / 'restored'
+    target.mkdir()
+    os.symlink(outside, target / 'link')
+
+    with pytest.raises(ValueError):
+        restore_snapshot(snapshot_id, str(target), store)
+    assert not (outside / 'escape.csv').exists()
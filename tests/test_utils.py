@@ -0,0 +1,77 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import IncrementalIndicators, RollingWindow, calculate_indicators, rolling_statistics
+
+def close_with_gaps(seed=0, n=400, gaps=((30, 31), (120, 125), (300, 360))):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    for start, end in gaps:
+        close[start:end] = np.nan
+    return close
+
+CASES = {
+    'no_gaps': close_with_gaps(gaps=()),
+    'nan_gaps': close_with_gaps(),
+    'shorter_than_windows': close_with_gaps(n=35, gaps=((10, 12),)),
+    'repeated_values': np.repeat(close_with_gaps(n=40, gaps=((5, 8),)), 10)
+}
+
+def test_repeated_values_have_zero_std():
+    close = CASES['repeated_values']
+    result = rolling_statistics(close, [5])
+    rolling = RollingWindow(5)
+    for value in close[:10]:
+        rolling.update(value)
+    assert result['std'][0, 9] == rolling.std() == 0.0
+    assert result['mean'][0, 9] == rolling.mean() == close[9]
+
+@pytest.mark.parametrize('name', CASES)
+def test_incremental_indicators_match_calculate_indicators(name):
+    close = CASES[name]
+    index = pd.date_range('2020-01-01', periods=len(close), freq='D', name='Date')
+    expected = calculate_indicators(pd.DataFrame({'Close': close}, index=index))
+
+    # Half the history seeds the indicators, which are then saved, restored and fed the rest
+    split = len(close) // 2
+    indicators = IncrementalIndicators()
+    rows = [indicators.update(value) for value in close[:split]]
+    indicators = IncrementalIndicators.from_snapshot(json.loads(json.dumps(indicators.snapshot())))
+    rows += [indicators.update(value) for value in close[split:]]
+    result = pd.DataFrame(rows, index=index)
+
+    for column in ['SMA_20', 'SMA_50', 'EMA_20', 'EMA_50', 'RSI']:
+        np.testing.assert_allclose(result[column], expected[column], rtol=1e-9, atol=1e-9, err_msg=column)
+
+@pytest.mark.parametrize('name', CASES)
+def test_rolling_statistics_match_pandas(name):
+    close = CASES[name]
+    windows = [1, 2, 5, 20, 50]
+    result = rolling_statistics(close, windows, block_size=64)
+
+    for row, window in enumerate(windows):
+        rolling = pd.Series(close).rolling(window=window)
+        np.testing.assert_allclose(result['mean'][row], rolling.mean(), rtol=1e-9, atol=1e-9)
+        # pandas leaves rounding error of about 1e-7 where a window holds one repeated value; these are exactly 0
+        np.testing.assert_allclose(result['std'][row], rolling.std(), rtol=1e-7, atol=1e-6)
+
+@pytest.mark.parametrize('name', CASES)
+@pytest.mark.parametrize('window, min_periods', [(5, None), (20, 1), (50, 10)])
+def test_rolling_window_matches_pandas(name, window, min_periods):
+    close = CASES[name]
+    rolling = RollingWindow(window, min_periods)
+    means, stds = [], []
+    for position, value in enumerate(close):
+        if position == len(close) // 2:
+            rolling = RollingWindow.from_snapshot(json.loads(json.dumps(rolling.snapshot())))
+        rolling.update(value)
+        means.append(rolling.mean())
+        stds.append(rolling.std())
+
+    expected = pd.Series(close).rolling(window=window, min_periods=min_periods)
+    np.testing.assert_allclose(means, expected.mean(), rtol=1e-9, atol=1e-9)
+    # pandas leaves rounding error of about 1e-7 where a window holds one repeated value; these are exactly 0
+    np.testing.assert_allclose(stds, expected.std(), rtol=1e-7, atol=1e-6)